@@ -0,0 +1,45 @@
+#!/bin/sh
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+#
+# Adds a class data sharing archive to the deployment package, see P_APPCDS of the CDK app.
+# Runs after mvn install in the bundling image, whose JVM has to match the one of the Lambda
+# runtime, and writes appcds.jsa into the root of the package, i.e. /var/task/appcds.jsa.
+#
+# The training run AppCdsTraining invokes the handler once and records the loaded classes.
+# The classes of the function are loaded by the class loader of the Lambda runtime, which the
+# archives of Java 11 do not support, so the archive holds the JDK classes of the default CDS
+# archive plus the JDK classes loaded by the training run, e.g. TLS, SASL and NIO. Like the
+# default archive it does not depend on the class path of the runtime.
+#
+#   sh appcds.sh target/ApiGatewayLambdaProxy.zip
+set -e
+
+PACKAGE=$(readlink -f "${1:-target/ApiGatewayLambdaProxy.zip}")
+JAVA_HOME=${JAVA_HOME:-$(dirname "$(dirname "$(readlink -f "$(command -v java)")")")}
+TRAINING=software.amazon.samples.kafka.lambda.AppCdsTraining
+
+WORK=$(mktemp -d)
+trap 'rm -rf "$WORK"' EXIT
+mkdir "$WORK/task" "$WORK/empty"
+(cd "$WORK/task" && jar xf "$PACKAGE")
+CLASSPATH="$WORK/task:$WORK/task/lib/*"
+
+# same environment as the unit tests, the EMF documents are written to stdout
+export LAMBDA_TASK_ROOT=handler _X_AMZN_TRACE_ID=0 AWS_REGION=${AWS_REGION:-us-east-1}
+export POWERTOOLS_METRICS_NAMESPACE=ServerlessKafkaProducer AWS_EMF_ENVIRONMENT=Local
+
+java -Xshare:off -XX:DumpLoadedClassList="$WORK/training.lst" -cp "$CLASSPATH" $TRAINING > /dev/null
+
+grep -E '^(java|javax|jdk|sun|com/sun|org/ietf|org/w3c|org/xml)/' "$WORK/training.lst" \
+    | cat "$JAVA_HOME/lib/classlist" - | sort -u > "$WORK/classes.lst"
+
+# dumped without a class path like the default archive of the JDK
+(cd "$WORK/empty" && java -Xshare:dump -XX:SharedClassListFile="$WORK/classes.lst" \
+    -XX:SharedArchiveFile="$WORK/appcds.jsa" > "$WORK/dump.log")
+
+# fails the build if the archive can not be mapped
+echo "Default CDS archive: $(java -Xshare:auto -cp "$CLASSPATH" $TRAINING | tail -n 1)"
+echo "AppCDS archive:      $(java -Xshare:on -XX:SharedArchiveFile="$WORK/appcds.jsa" -cp "$CLASSPATH" $TRAINING | tail -n 1)"
+
+jar --update --no-manifest --file "$PACKAGE" -C "$WORK" appcds.jsa
@@ -0,0 +1,215 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.apache.kafka.clients.producer.KafkaProducer;
+import org.apache.kafka.clients.producer.ProducerRecord;
+import org.apache.kafka.clients.producer.RecordMetadata;
+import org.apache.kafka.common.errors.TimeoutException;
+import org.apache.logging.log4j.LogManager;
+import org.apache.logging.log4j.Logger;
+import org.crac.Core;
+import org.crac.Resource;
+import software.amazon.lambda.powertools.tracing.Tracing;
+
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.Iterator;
+import java.util.LinkedHashSet;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.Future;
+
+/**
+ * Owns the Kafka producers of a Lambda execution environment, one per cluster the records are
+ * spread over. A producer is created on first use and reused by all following invocations of the
+ * handler.
+ */
+public abstract class AbstractKafkaProxy implements Resource {
+
+    public static final String TOPIC_NAME = "messages";
+
+    private static final Logger log = LogManager.getLogger(AbstractKafkaProxy.class);
+    public KafkaProducerPropertiesFactory kafkaProducerProperties = new KafkaProducerPropertiesFactoryImpl();
+    public RecordKeyExtractor recordKeyExtractor = RecordKeyExtractor.fromEnvironment();
+    public TopicRouter topicRouter = TopicRouter.fromEnvironment();
+    public ClusterRouter clusterRouter = ClusterRouter.fromEnvironment();
+    public ProducerMetrics producerMetrics = new ProducerMetrics();
+    public ProducerClientMetrics clientMetrics = ProducerClientMetrics.fromEnvironment();
+    private final Map<Integer, KafkaProducer<String, byte[]>> producers = new HashMap<>();
+
+    protected AbstractKafkaProxy() {
+        // Only called back when the function runs with SnapStart
+        Core.getGlobalContext().register(this);
+    }
+
+    protected KafkaProducer<String, byte[]> createProducer() {
+        return createProducer(0);
+    }
+
+    @Tracing
+    protected KafkaProducer<String, byte[]> createProducer(int cluster) {
+        KafkaProducer<String, byte[]> producer = producers.get(cluster);
+        if (producer == null) {
+            log.info("Connecting to kafka cluster {}", clusterRouter.getClusterId(cluster));
+            producer = new KafkaProducer<String, byte[]>(producerProperties(cluster).getProducerProperties());
+            producers.put(cluster, producer);
+        }
+        return producer;
+    }
+
+    /**
+     * @return the producer of the cluster the record is routed to
+     */
+    protected KafkaProducer<String, byte[]> producerFor(ProducerRecord<String, byte[]> record) {
+        return createProducer(clusterRouter.route(record.key()));
+    }
+
+    private KafkaProducerPropertiesFactory producerProperties(int cluster) {
+        return clusterRouter.producerProperties(cluster, kafkaProducerProperties);
+    }
+
+    void closeProducer() {
+        for (KafkaProducer<String, byte[]> producer : producers.values()) {
+            producer.close(Duration.ofSeconds(5));
+        }
+        producers.clear();
+    }
+
+    /**
+     * Hands all records to the producer, flushes once and waits for the broker acknowledgements.
+     *
+     * @return the error of every record in the order of the records, null if the record was delivered
+     */
+    @Tracing
+    protected List<Exception> sendAll(List<ProducerRecord<String, byte[]>> records) {
+        ProducerMetrics.Batch batch = producerMetrics.startBatch();
+        Set<KafkaProducer<String, byte[]>> usedProducers = new LinkedHashSet<>();
+        List<Future<RecordMetadata>> sends = new ArrayList<>(records.size());
+        List<Exception> errors = new ArrayList<>(records.size());
+        for (ProducerRecord<String, byte[]> record : records) {
+            try {
+                KafkaProducer<String, byte[]> producer = producerFor(record);
+                usedProducers.add(producer);
+                long startedAt = System.nanoTime();
+                sends.add(producer.send(record));
+                batch.sent(startedAt, record.value().length);
+                errors.add(null);
+            } catch (Exception e) {
+                sends.add(null);
+                errors.add(e);
+            }
+        }
+        for (KafkaProducer<String, byte[]> producer : usedProducers) {
+            producer.flush();
+        }
+
+        for (int i = 0; i < sends.size(); i++) {
+            if (sends.get(i) == null) {
+                continue;
+            }
+            try {
+                sends.get(i).get();
+            } catch (ExecutionException e) {
+                errors.set(i, e.getCause() instanceof Exception ? (Exception) e.getCause() : e);
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+                errors.set(i, e);
+            }
+        }
+
+        int failed = 0;
+        for (Exception error : errors) {
+            if (error != null) {
+                failed++;
+            }
+        }
+        batch.finish(true, failed);
+        for (KafkaProducer<String, byte[]> producer : usedProducers) {
+            recordProducerMetrics(producer);
+        }
+        resetIfDisconnected(errors);
+        return errors;
+    }
+
+    /**
+     * Closes the producers which have no connection to any broker after records timed out, e.g.
+     * because the brokers were replaced since the bootstrap brokers were read. The next invocation
+     * creates a new producer with the current bootstrap brokers of the cluster.
+     */
+    protected void resetIfDisconnected(List<Exception> errors) {
+        for (Exception error : errors) {
+            if (error != null) {
+                resetIfDisconnected(error);
+                return;
+            }
+        }
+    }
+
+    protected void resetIfDisconnected(Exception error) {
+        Throwable cause = error instanceof ExecutionException ? error.getCause() : error;
+        if (!(cause instanceof TimeoutException)) {
+            return;
+        }
+        // the error does not name its cluster, only the producers without connections are replaced
+        for (Iterator<Map.Entry<Integer, KafkaProducer<String, byte[]>>> entries = producers.entrySet().iterator(); entries.hasNext(); ) {
+            Map.Entry<Integer, KafkaProducer<String, byte[]>> entry = entries.next();
+            if (ProducerMetrics.metricValue(entry.getValue().metrics(), "connection-count") > 0) {
+                // connected but slow, a new producer would not help
+                continue;
+            }
+            log.warn("Producer can not reach the brokers of {}, reading the bootstrap brokers again",
+                    clusterRouter.getClusterId(entry.getKey()));
+            entry.getValue().close(Duration.ofSeconds(5));
+            producerProperties(entry.getKey()).refreshBootstrapServers();
+            entries.remove();
+        }
+    }
+
+    /**
+     * Records the state of the producer at the end of an invocation, the buffer utilisation and
+     * retries as well as the chosen client metrics of the producer.
+     */
+    protected void recordProducerMetrics(KafkaProducer<String, byte[]> producer) {
+        producerMetrics.recordProducer(producer);
+        clientMetrics.publish(producer);
+    }
+
+    /**
+     * Loads the classes and warms the code paths used by every request before the SnapStart
+     * snapshot is taken.
+     */
+    protected void prime() throws Exception {
+        for (int cluster = 0; cluster < clusterRouter.size(); cluster++) {
+            for (String topic : topicRouter.getTopics()) {
+                createProducer(cluster).partitionsFor(topic);
+            }
+        }
+    }
+
+    /**
+     * Primes the execution environment before the SnapStart snapshot is taken. Connecting to the
+     * cluster once loads the Kafka client, TLS, IAM authentication and serializer classes and the
+     * JIT compiles the paths used by every request. The connections are closed afterwards because
+     * they would be stale once the snapshot is restored.
+     */
+    @Override
+    public void beforeCheckpoint(org.crac.Context<? extends Resource> context) {
+        log.info("Priming execution environment before snapshot");
+        try {
+            prime();
+        } catch (Exception e) {
+            log.warn("Priming failed, the first request will connect to the cluster", e);
+        } finally {
+            closeProducer();
+        }
+    }
+
+    @Override
+    public void afterRestore(org.crac.Context<? extends Resource> context) {
+        log.info("Execution environment restored from snapshot");
+    }
+}
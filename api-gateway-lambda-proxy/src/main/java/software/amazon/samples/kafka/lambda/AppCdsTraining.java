@@ -0,0 +1,129 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import com.amazonaws.services.lambda.runtime.ClientContext;
+import com.amazonaws.services.lambda.runtime.CognitoIdentity;
+import com.amazonaws.services.lambda.runtime.Context;
+import com.amazonaws.services.lambda.runtime.LambdaLogger;
+import com.amazonaws.services.lambda.runtime.events.APIGatewayProxyRequestEvent;
+
+import java.lang.management.ManagementFactory;
+import java.nio.charset.StandardCharsets;
+import java.util.List;
+import java.util.Map;
+import java.util.Properties;
+import java.util.concurrent.TimeUnit;
+
+/**
+ * Training run of the AppCDS archive built by appcds.sh. Invokes the handler with a single message
+ * and a batch, so the classes used by every request are loaded, e.g. for TLS, SASL, the Kafka
+ * network client and the JSON parser. No broker is needed, the sends time out after a second.
+ * <p>
+ * Prints the duration of the invocations and the number of loaded classes, appcds.sh runs the
+ * training once more with the archive to show the savings of the class loading.
+ */
+public class AppCdsTraining {
+
+    private static final String UNREACHABLE_BOOTSTRAP_SERVER = "localhost:9098";
+
+    public static void main(String[] args) {
+        long start = System.nanoTime();
+
+        SimpleApiGatewayKafkaProxy proxy = new SimpleApiGatewayKafkaProxy();
+        Properties properties = new KafkaProducerPropertiesFactoryImpl(Map.of(
+                "bootstrap_server", UNREACHABLE_BOOTSTRAP_SERVER,
+                "kafka_max_block_ms", "1000")).getProducerProperties();
+        proxy.kafkaProducerProperties = () -> properties;
+
+        Context context = new TrainingContext();
+        for (String resource : List.of("/", SimpleApiGatewayKafkaProxy.BATCH_RESOURCE)) {
+            String body = resource.equals("/") ? "{\"training\":true}" : "[{\"training\":true},{\"training\":false}]";
+            APIGatewayProxyRequestEvent event = new APIGatewayProxyRequestEvent()
+                    .withResource(resource)
+                    .withHeaders(Map.of("Content-Type", "application/json"))
+                    .withBody(body)
+                    .withIsBase64Encoded(false);
+            try {
+                proxy.handleRequest(event, context);
+            } catch (RuntimeException e) {
+                // the classes up to the failure are loaded all the same
+                System.err.println("Training invocation failed: " + e);
+            }
+        }
+        proxy.closeProducer();
+
+        System.out.printf("Training invocations took %d ms, JVM uptime %d ms, %d classes loaded%n",
+                TimeUnit.NANOSECONDS.toMillis(System.nanoTime() - start),
+                ManagementFactory.getRuntimeMXBean().getUptime(),
+                ManagementFactory.getClassLoadingMXBean().getTotalLoadedClassCount());
+    }
+
+    private static class TrainingContext implements Context {
+
+        @Override
+        public String getAwsRequestId() {
+            return "appcds-training";
+        }
+
+        @Override
+        public String getLogGroupName() {
+            return "appcds-training";
+        }
+
+        @Override
+        public String getLogStreamName() {
+            return "appcds-training";
+        }
+
+        @Override
+        public String getFunctionName() {
+            return "KafkaProducer";
+        }
+
+        @Override
+        public String getFunctionVersion() {
+            return "$LATEST";
+        }
+
+        @Override
+        public String getInvokedFunctionArn() {
+            return "arn:aws:lambda:us-east-1:123456789012:function:KafkaProducer";
+        }
+
+        @Override
+        public CognitoIdentity getIdentity() {
+            return null;
+        }
+
+        @Override
+        public ClientContext getClientContext() {
+            return null;
+        }
+
+        @Override
+        public int getRemainingTimeInMillis() {
+            return 30000;
+        }
+
+        @Override
+        public int getMemoryLimitInMB() {
+            return 1024;
+        }
+
+        @Override
+        public LambdaLogger getLogger() {
+            return new LambdaLogger() {
+                @Override
+                public void log(String message) {
+                    System.out.println(message);
+                }
+
+                @Override
+                public void log(byte[] message) {
+                    System.out.println(new String(message, StandardCharsets.UTF_8));
+                }
+            };
+        }
+    }
+}
@@ -0,0 +1,123 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.apache.logging.log4j.LogManager;
+import org.apache.logging.log4j.Logger;
+import software.amazon.awssdk.http.urlconnection.UrlConnectionHttpClient;
+import software.amazon.awssdk.services.kafka.KafkaClient;
+
+import java.util.Map;
+import java.util.concurrent.TimeUnit;
+import java.util.function.LongSupplier;
+
+/**
+ * Resolves the bootstrap brokers of the MSK cluster. The brokers read when the stack was deployed
+ * are used until they expire or until the producer can not reach them, then they are read again
+ * with GetBootstrapBrokers. The bootstrap brokers are only needed to create a producer, afterwards
+ * the producer follows the brokers of the cluster through the metadata. Configured with the
+ * environment variables:
+ * <ul>
+ *     <li>{@code bootstrap_server} the bootstrap brokers read by the stack</li>
+ *     <li>{@code msk_cluster_arn} the cluster whose brokers are read again, without it the brokers
+ *     of {@code bootstrap_server} are never refreshed</li>
+ *     <li>{@code bootstrap_refresh_seconds} time after which the brokers are read again when the
+ *     next producer is created, 0 only refreshes them on connection failures (default 3600)</li>
+ * </ul>
+ */
+public class BootstrapServerResolver {
+
+    public static final String BOOTSTRAP_SERVER_VARIABLE = "bootstrap_server";
+    public static final String CLUSTER_ARN_VARIABLE = "msk_cluster_arn";
+    public static final String REFRESH_VARIABLE = "bootstrap_refresh_seconds";
+
+    public static final int DEFAULT_REFRESH_SECONDS = 3600;
+
+    private static final Logger log = LogManager.getLogger(BootstrapServerResolver.class);
+
+    /**
+     * Reads the SASL/IAM bootstrap brokers of a cluster.
+     */
+    interface BrokerLookup {
+        String bootstrapBrokers(String clusterArn);
+    }
+
+    private final String clusterArn;
+    private final long refreshNanos;
+    private final BrokerLookup lookup;
+    private final LongSupplier clock;
+    private String bootstrapServers;
+    private long resolvedAt;
+    private boolean stale;
+
+    BootstrapServerResolver(String bootstrapServers, String clusterArn, long refreshSeconds,
+                            BrokerLookup lookup, LongSupplier clock) {
+        this.bootstrapServers = bootstrapServers;
+        this.clusterArn = clusterArn == null || clusterArn.isBlank() ? null : clusterArn.strip();
+        this.refreshNanos = TimeUnit.SECONDS.toNanos(refreshSeconds);
+        this.lookup = lookup;
+        this.clock = clock;
+        this.resolvedAt = clock.getAsLong();
+        this.stale = bootstrapServers == null || bootstrapServers.isBlank();
+    }
+
+    public static BootstrapServerResolver fromEnvironment(Map<String, String> environment) {
+        String refreshSeconds = environment.get(REFRESH_VARIABLE);
+        int refresh = refreshSeconds == null || refreshSeconds.isBlank()
+                ? DEFAULT_REFRESH_SECONDS : Integer.parseInt(refreshSeconds.strip());
+        if (refresh < 0) {
+            throw new IllegalArgumentException("Bootstrap refresh interval must not be negative, got " + refresh);
+        }
+        return new BootstrapServerResolver(environment.get(BOOTSTRAP_SERVER_VARIABLE),
+                environment.get(CLUSTER_ARN_VARIABLE), refresh, new MskBrokerLookup(), System::nanoTime);
+    }
+
+    /**
+     * @return the bootstrap brokers, read again from the cluster if they expired or failed
+     */
+    public synchronized String bootstrapServers() {
+        if (clusterArn == null) {
+            return bootstrapServers;
+        }
+        boolean expired = refreshNanos > 0 && clock.getAsLong() - resolvedAt >= refreshNanos;
+        if (stale || expired) {
+            try {
+                String brokers = lookup.bootstrapBrokers(clusterArn);
+                if (!brokers.equals(bootstrapServers)) {
+                    log.info("Bootstrap brokers of {} changed to {}", clusterArn, brokers);
+                }
+                bootstrapServers = brokers;
+            } catch (RuntimeException e) {
+                // the cluster stays reachable through the known brokers if only the API call fails
+                log.warn("Could not read the bootstrap brokers of {}, using {}", clusterArn, bootstrapServers, e);
+                if (bootstrapServers == null) {
+                    throw e;
+                }
+            }
+            resolvedAt = clock.getAsLong();
+            stale = false;
+        }
+        return bootstrapServers;
+    }
+
+    /**
+     * Reads the bootstrap brokers again when the next producer is created.
+     */
+    public synchronized void invalidate() {
+        stale = true;
+    }
+
+    private static class MskBrokerLookup implements BrokerLookup {
+
+        private KafkaClient client;
+
+        @Override
+        public String bootstrapBrokers(String clusterArn) {
+            // created on the first refresh, most execution environments never need it
+            if (client == null) {
+                client = KafkaClient.builder().httpClient(UrlConnectionHttpClient.create()).build();
+            }
+            return client.getBootstrapBrokers(request -> request.clusterArn(clusterArn)).bootstrapBrokerStringSaslIam();
+        }
+    }
+}
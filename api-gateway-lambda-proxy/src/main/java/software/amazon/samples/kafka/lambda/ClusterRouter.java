@@ -0,0 +1,194 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import com.fasterxml.jackson.core.JsonProcessingException;
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import org.apache.kafka.common.utils.Utils;
+
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.ThreadLocalRandom;
+
+/**
+ * Spreads the records over the MSK clusters the function writes to, every cluster gets a share of
+ * the records in proportion to its weight. Configured with the environment variables:
+ * <ul>
+ *     <li>{@code kafka_clusters} JSON array of all clusters, e.g.
+ *     {@code [{"msk_cluster_arn": "arn:...", "bootstrap_server": "b-1...:9098", "weight": 2}, ...]}.
+ *     The first cluster is the one of {@code bootstrap_server} and {@code msk_cluster_arn}, the
+ *     producers of the other clusters get the same settings. Without it all records are written to
+ *     the cluster of {@code bootstrap_server}</li>
+ *     <li>{@code cluster_routing} {@code key} (default) sends all records with the same key to the
+ *     same cluster, {@code weight} picks a cluster at random for every record</li>
+ * </ul>
+ * Records are routed by key with weighted rendezvous hashing: every cluster scores the key and the
+ * highest score wins. Adding a cluster only moves the keys which the new cluster wins, the keys of
+ * the other clusters keep their cluster and their order.
+ */
+public class ClusterRouter {
+
+    public static final String CLUSTERS_VARIABLE = "kafka_clusters";
+    public static final String ROUTING_VARIABLE = "cluster_routing";
+
+    private static final ObjectMapper MAPPER = new ObjectMapper();
+
+    public enum Routing {
+        KEY, WEIGHT
+    }
+
+    /**
+     * A cluster the records are written to, without producer properties of its own for the first
+     * cluster, which uses the producer properties of the handler.
+     */
+    static final class Cluster {
+        final String id;
+        final int weight;
+        final KafkaProducerPropertiesFactory producerProperties;
+        // prefix which makes the hash of a key independent of the partition the producer picks
+        final byte[] seed;
+
+        Cluster(String id, int weight, KafkaProducerPropertiesFactory producerProperties) {
+            if (weight < 0) {
+                throw new IllegalArgumentException("Weight of cluster " + id + " must not be negative, got " + weight);
+            }
+            this.id = id;
+            this.weight = weight;
+            this.producerProperties = producerProperties;
+            this.seed = (id + "/").getBytes(StandardCharsets.UTF_8);
+        }
+    }
+
+    private final List<Cluster> clusters;
+    private final Routing routing;
+    private final int totalWeight;
+
+    ClusterRouter(List<Cluster> clusters, Routing routing) {
+        int total = 0;
+        for (Cluster cluster : clusters) {
+            total += cluster.weight;
+        }
+        if (clusters.isEmpty() || total == 0) {
+            throw new IllegalArgumentException("At least one cluster must have a weight above 0");
+        }
+        this.clusters = clusters;
+        this.routing = routing;
+        this.totalWeight = total;
+    }
+
+    public static ClusterRouter fromValues(String clusters, String routing, Map<String, String> environment) {
+        Routing clusterRouting = Routing.KEY;
+        if (routing != null && !routing.isBlank()) {
+            try {
+                clusterRouting = Routing.valueOf(routing.strip().toUpperCase());
+            } catch (IllegalArgumentException e) {
+                throw new IllegalArgumentException("Unknown cluster routing " + routing, e);
+            }
+        }
+        if (clusters == null || clusters.isBlank()) {
+            return new ClusterRouter(List.of(new Cluster("default", 1, null)), clusterRouting);
+        }
+
+        JsonNode settings;
+        try {
+            settings = MAPPER.readTree(clusters);
+        } catch (JsonProcessingException e) {
+            throw new IllegalArgumentException("Clusters must be a JSON array, got " + clusters, e);
+        }
+        if (!settings.isArray() || settings.size() == 0) {
+            throw new IllegalArgumentException("Clusters must be a JSON array, got " + clusters);
+        }
+        List<Cluster> routes = new ArrayList<>(settings.size());
+        for (JsonNode setting : settings) {
+            String clusterArn = setting.path(BootstrapServerResolver.CLUSTER_ARN_VARIABLE).asText(null);
+            String bootstrapServers = setting.path(BootstrapServerResolver.BOOTSTRAP_SERVER_VARIABLE).asText(null);
+            int weight = setting.path("weight").asInt(1);
+            String id = clusterArn != null ? clusterArn : bootstrapServers;
+            if (id == null) {
+                throw new IllegalArgumentException("Cluster needs a msk_cluster_arn or a bootstrap_server, got " + setting);
+            }
+            if (routes.isEmpty()) {
+                routes.add(new Cluster(id, weight, null));
+                continue;
+            }
+            // kafka_* producer properties and the refresh interval apply to every cluster
+            Map<String, String> clusterEnvironment = new HashMap<>(environment);
+            clusterEnvironment.remove(BootstrapServerResolver.CLUSTER_ARN_VARIABLE);
+            clusterEnvironment.remove(BootstrapServerResolver.BOOTSTRAP_SERVER_VARIABLE);
+            if (clusterArn != null) {
+                clusterEnvironment.put(BootstrapServerResolver.CLUSTER_ARN_VARIABLE, clusterArn);
+            }
+            if (bootstrapServers != null) {
+                clusterEnvironment.put(BootstrapServerResolver.BOOTSTRAP_SERVER_VARIABLE, bootstrapServers);
+            }
+            routes.add(new Cluster(id, weight, new KafkaProducerPropertiesFactoryImpl(clusterEnvironment)));
+        }
+        return new ClusterRouter(routes, clusterRouting);
+    }
+
+    public static ClusterRouter fromEnvironment() {
+        return fromValues(System.getenv(CLUSTERS_VARIABLE), System.getenv(ROUTING_VARIABLE), System.getenv());
+    }
+
+    public int size() {
+        return clusters.size();
+    }
+
+    public String getClusterId(int cluster) {
+        return clusters.get(cluster).id;
+    }
+
+    /**
+     * @param cluster                   index of the cluster
+     * @param defaultProducerProperties the producer properties of the handler, used for the first cluster
+     * @return the producer properties of the cluster
+     */
+    public KafkaProducerPropertiesFactory producerProperties(int cluster, KafkaProducerPropertiesFactory defaultProducerProperties) {
+        KafkaProducerPropertiesFactory producerProperties = clusters.get(cluster).producerProperties;
+        return producerProperties != null ? producerProperties : defaultProducerProperties;
+    }
+
+    /**
+     * @param key the record key, null if the record has none
+     * @return the index of the cluster the record is written to
+     */
+    public int route(String key) {
+        if (clusters.size() == 1) {
+            return 0;
+        }
+        if (routing == Routing.WEIGHT || key == null) {
+            int slot = ThreadLocalRandom.current().nextInt(totalWeight);
+            for (int i = 0; i < clusters.size(); i++) {
+                slot -= clusters.get(i).weight;
+                if (slot < 0) {
+                    return i;
+                }
+            }
+        }
+
+        byte[] keyBytes = key.getBytes(StandardCharsets.UTF_8);
+        int winner = 0;
+        double highestScore = -1;
+        for (int i = 0; i < clusters.size(); i++) {
+            Cluster cluster = clusters.get(i);
+            if (cluster.weight == 0) {
+                continue;
+            }
+            byte[] seeded = new byte[cluster.seed.length + keyBytes.length];
+            System.arraycopy(cluster.seed, 0, seeded, 0, cluster.seed.length);
+            System.arraycopy(keyBytes, 0, seeded, cluster.seed.length, keyBytes.length);
+            // uniform in (0, 1), -weight / ln(u) picks every cluster in proportion to its weight
+            double uniform = (Utils.toPositive(Utils.murmur2(seeded)) + 1.0) / (Integer.MAX_VALUE + 2.0);
+            double score = -cluster.weight / Math.log(uniform);
+            if (score > highestScore) {
+                highestScore = score;
+                winner = i;
+            }
+        }
+        return winner;
+    }
+}
@@ -0,0 +1,38 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.apache.kafka.clients.producer.Callback;
+import org.apache.kafka.clients.producer.RecordMetadata;
+
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.AtomicReference;
+
+/**
+ * Collects delivery failures of records that were sent without waiting for the broker, so they
+ * can be reported by a later invocation.
+ */
+public class DeferredDeliveryErrors implements Callback {
+
+    private final AtomicInteger failedDeliveries = new AtomicInteger();
+    private final AtomicReference<Exception> lastError = new AtomicReference<>();
+
+    @Override
+    public void onCompletion(RecordMetadata metadata, Exception exception) {
+        if (exception != null) {
+            failedDeliveries.incrementAndGet();
+            lastError.set(exception);
+        }
+    }
+
+    /**
+     * Returns the number of failed deliveries since the last call and resets the counter.
+     */
+    public int drain() {
+        return failedDeliveries.getAndSet(0);
+    }
+
+    public Exception getLastError() {
+        return lastError.get();
+    }
+}
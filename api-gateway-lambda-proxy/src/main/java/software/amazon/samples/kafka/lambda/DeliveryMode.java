@@ -0,0 +1,42 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+/**
+ * Defines how long a request waits for Kafka before the response is returned.
+ */
+public enum DeliveryMode {
+
+    /** Flush the producer and wait for the broker acknowledgement of every record. */
+    SYNC("sync"),
+    /** Wait for the broker acknowledgement without flushing, records are batched according to linger.ms. */
+    ACK_ON_SEND("ack-on-send"),
+    /** Return as soon as the record is buffered, delivery errors are reported on a later invocation. */
+    FIRE_AND_FORGET("fire-and-forget");
+
+    private final String value;
+
+    DeliveryMode(String value) {
+        this.value = value;
+    }
+
+    public String getValue() {
+        return value;
+    }
+
+    public static DeliveryMode fromValue(String value) {
+        if (value == null || value.isBlank()) {
+            return SYNC;
+        }
+        for (DeliveryMode mode : values()) {
+            if (mode.value.equalsIgnoreCase(value.trim())) {
+                return mode;
+            }
+        }
+        throw new IllegalArgumentException("Unknown delivery mode " + value);
+    }
+
+    public static DeliveryMode fromEnvironment() {
+        return fromValue(System.getenv("delivery_mode"));
+    }
+}
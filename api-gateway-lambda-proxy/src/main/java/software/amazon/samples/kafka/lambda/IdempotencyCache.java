@@ -0,0 +1,269 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.apache.logging.log4j.LogManager;
+import org.apache.logging.log4j.Logger;
+import software.amazon.awssdk.http.urlconnection.UrlConnectionHttpClient;
+import software.amazon.awssdk.services.dynamodb.DynamoDbClient;
+import software.amazon.awssdk.services.dynamodb.model.AttributeValue;
+
+import java.util.LinkedHashMap;
+import java.util.Map;
+import java.util.concurrent.TimeUnit;
+import java.util.function.LongSupplier;
+
+/**
+ * Remembers the partition and offset of the records acknowledged for the idempotency key a client
+ * sends with a request, so a retried request is answered without writing the record again. The
+ * entries expire after a time to live and the oldest entries are evicted when the cache is full.
+ * An execution environment only knows its own requests, a retry which reaches another execution
+ * environment is only recognized with a shared table. Configured with the environment variables:
+ * <ul>
+ *     <li>{@code idempotency_header} request header with the idempotency key, empty disables the
+ *     cache (default Idempotency-Key)</li>
+ *     <li>{@code idempotency_cache_size} keys per execution environment (default 10000)</li>
+ *     <li>{@code idempotency_ttl_seconds} time in which a retry is recognized (default 600)</li>
+ *     <li>{@code idempotency_table} DynamoDB table shared by all execution environments, read when
+ *     a key is not in the cache of the execution environment (optional)</li>
+ * </ul>
+ */
+public class IdempotencyCache {
+
+    public static final String HEADER_VARIABLE = "idempotency_header";
+    public static final String SIZE_VARIABLE = "idempotency_cache_size";
+    public static final String TTL_VARIABLE = "idempotency_ttl_seconds";
+    public static final String TABLE_VARIABLE = "idempotency_table";
+
+    public static final String DEFAULT_HEADER = "Idempotency-Key";
+    public static final int DEFAULT_SIZE = 10000;
+    public static final int DEFAULT_TTL_SECONDS = 600;
+    public static final int MAX_KEY_LENGTH = 256;
+
+    /** Kafka record header with the idempotency key, for consumers which deduplicate themselves. */
+    public static final String RECORD_HEADER = "idempotency-key";
+    /** Response header of a request which was answered from the cache. */
+    public static final String REPLAYED_HEADER = "Idempotent-Replayed";
+
+    private static final Logger log = LogManager.getLogger(IdempotencyCache.class);
+
+    /**
+     * Partition and offset of an acknowledged record.
+     */
+    public static final class Acknowledgement {
+        final int partition;
+        final long offset;
+
+        Acknowledgement(int partition, long offset) {
+            this.partition = partition;
+            this.offset = offset;
+        }
+
+        public int getPartition() {
+            return partition;
+        }
+
+        public long getOffset() {
+            return offset;
+        }
+    }
+
+    /**
+     * Store shared by the execution environments of the function.
+     */
+    interface SharedStore {
+        Acknowledgement get(String key, long nowSeconds);
+
+        void put(String key, Acknowledgement acknowledgement, long expiresAtSeconds);
+    }
+
+    private static final class Entry {
+        final Acknowledgement acknowledgement;
+        final long expiresAt;
+
+        Entry(Acknowledgement acknowledgement, long expiresAt) {
+            this.acknowledgement = acknowledgement;
+            this.expiresAt = expiresAt;
+        }
+    }
+
+    private final String header;
+    private final long ttlNanos;
+    private final SharedStore sharedStore;
+    private final LongSupplier clock;
+    private final Map<String, Entry> entries;
+
+    IdempotencyCache(String header, int maximumSize, int ttlSeconds, SharedStore sharedStore, LongSupplier clock) {
+        if (maximumSize < 1) {
+            throw new IllegalArgumentException("Idempotency cache size must be at least 1, got " + maximumSize);
+        }
+        if (ttlSeconds < 1) {
+            throw new IllegalArgumentException("Idempotency time to live must be at least 1 second, got " + ttlSeconds);
+        }
+        this.header = header == null || header.isBlank() ? null : header.strip();
+        this.ttlNanos = TimeUnit.SECONDS.toNanos(ttlSeconds);
+        this.sharedStore = sharedStore;
+        this.clock = clock;
+        // insertion order is expiry order, all entries live equally long
+        this.entries = new LinkedHashMap<String, Entry>(16, 0.75f, false) {
+            @Override
+            protected boolean removeEldestEntry(Map.Entry<String, Entry> eldest) {
+                return size() > maximumSize;
+            }
+        };
+    }
+
+    public static IdempotencyCache fromValues(String header, String maximumSize, String ttlSeconds, String table) {
+        return new IdempotencyCache(
+                header == null ? DEFAULT_HEADER : header,
+                maximumSize == null || maximumSize.isBlank() ? DEFAULT_SIZE : Integer.parseInt(maximumSize.strip()),
+                ttlSeconds == null || ttlSeconds.isBlank() ? DEFAULT_TTL_SECONDS : Integer.parseInt(ttlSeconds.strip()),
+                table == null || table.isBlank() ? null : new DynamoDbSharedStore(table.strip()),
+                System::nanoTime);
+    }
+
+    public static IdempotencyCache fromEnvironment() {
+        return fromValues(System.getenv(HEADER_VARIABLE), System.getenv(SIZE_VARIABLE),
+                System.getenv(TTL_VARIABLE), System.getenv(TABLE_VARIABLE));
+    }
+
+    public boolean isEnabled() {
+        return header != null;
+    }
+
+    /**
+     * @param headers the request headers, null if the request has none
+     * @return the idempotency key of the request, null if the client did not send one
+     */
+    public String key(Map<String, String> headers) {
+        if (!isEnabled() || headers == null) {
+            return null;
+        }
+        // API Gateway keeps the case of the header names sent by the client
+        for (Map.Entry<String, String> entry : headers.entrySet()) {
+            if (header.equalsIgnoreCase(entry.getKey()) && entry.getValue() != null && !entry.getValue().isBlank()) {
+                String key = entry.getValue().strip();
+                if (key.length() > MAX_KEY_LENGTH) {
+                    throw new IllegalArgumentException(header + " must not be longer than " + MAX_KEY_LENGTH + " characters");
+                }
+                return key;
+            }
+        }
+        return null;
+    }
+
+    /**
+     * @return the cache key of a single request, the same idempotency key sent to another topic
+     * belongs to another request
+     */
+    public static String requestKey(String topic, String key) {
+        return topic + '\0' + key;
+    }
+
+    /**
+     * @return the cache key of the record at the index of a batch request, which no single request
+     * can have
+     */
+    public static String recordKey(String topic, String key, int index) {
+        return topic + '\0' + key + '\0' + index;
+    }
+
+    /**
+     * @return the acknowledgement of the record written for the key, null if it was not written yet
+     * or expired
+     */
+    public synchronized Acknowledgement get(String key) {
+        long now = clock.getAsLong();
+        Entry entry = entries.get(key);
+        if (entry != null) {
+            if (now - entry.expiresAt < 0) {
+                return entry.acknowledgement;
+            }
+            entries.remove(key);
+        }
+        if (sharedStore == null) {
+            return null;
+        }
+        try {
+            Acknowledgement acknowledgement = sharedStore.get(key, currentTimeSeconds());
+            if (acknowledgement != null) {
+                // the shared entry may be older, this one expires a little late
+                entries.put(key, new Entry(acknowledgement, now + ttlNanos));
+            }
+            return acknowledgement;
+        } catch (RuntimeException e) {
+            // a retry is written again rather than failed while the table is not available
+            log.warn("Could not read idempotency key {}", key, e);
+            return null;
+        }
+    }
+
+    /**
+     * Remembers the acknowledgement of the record written for the key.
+     */
+    public synchronized void put(String key, int partition, long offset) {
+        Acknowledgement acknowledgement = new Acknowledgement(partition, offset);
+        // re-inserted at the end, so the eldest entry is also the first to expire
+        entries.remove(key);
+        entries.put(key, new Entry(acknowledgement, clock.getAsLong() + ttlNanos));
+        if (sharedStore != null) {
+            try {
+                sharedStore.put(key, acknowledgement, currentTimeSeconds() + TimeUnit.NANOSECONDS.toSeconds(ttlNanos));
+            } catch (RuntimeException e) {
+                log.warn("Could not write idempotency key {}", key, e);
+            }
+        }
+    }
+
+    synchronized int size() {
+        return entries.size();
+    }
+
+    private static long currentTimeSeconds() {
+        return TimeUnit.MILLISECONDS.toSeconds(System.currentTimeMillis());
+    }
+
+    private static class DynamoDbSharedStore implements SharedStore {
+
+        private static final String KEY = "idempotency_key";
+        private static final String EXPIRES_AT = "expires_at";
+
+        private final String table;
+        private DynamoDbClient client;
+
+        DynamoDbSharedStore(String table) {
+            this.table = table;
+        }
+
+        private DynamoDbClient client() {
+            // created on first use, requests without idempotency key never need it
+            if (client == null) {
+                client = DynamoDbClient.builder().httpClient(UrlConnectionHttpClient.create()).build();
+            }
+            return client;
+        }
+
+        @Override
+        public Acknowledgement get(String key, long nowSeconds) {
+            Map<String, AttributeValue> item = client().getItem(request -> request
+                    .tableName(table)
+                    .key(Map.of(KEY, AttributeValue.builder().s(key).build()))).item();
+            // DynamoDB deletes expired items eventually, not right away
+            if (item == null || item.isEmpty() || Long.parseLong(item.get(EXPIRES_AT).n()) <= nowSeconds) {
+                return null;
+            }
+            return new Acknowledgement(Integer.parseInt(item.get("partition").n()), Long.parseLong(item.get("offset").n()));
+        }
+
+        @Override
+        public void put(String key, Acknowledgement acknowledgement, long expiresAtSeconds) {
+            client().putItem(request -> request
+                    .tableName(table)
+                    .item(Map.of(
+                            KEY, AttributeValue.builder().s(key).build(),
+                            "partition", AttributeValue.builder().n(Integer.toString(acknowledgement.partition)).build(),
+                            "offset", AttributeValue.builder().n(Long.toString(acknowledgement.offset)).build(),
+                            EXPIRES_AT, AttributeValue.builder().n(Long.toString(expiresAtSeconds)).build())));
+        }
+    }
+}
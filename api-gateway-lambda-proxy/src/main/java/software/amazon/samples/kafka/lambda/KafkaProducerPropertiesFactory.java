@@ -10,4 +10,11 @@ public interface KafkaProducerPropertiesFactory {
 
     @Tracing
     Properties getProducerProperties();
+
+    /**
+     * Called when the producer can not reach the brokers, the next properties should point to
+     * the current bootstrap brokers of the cluster.
+     */
+    default void refreshBootstrapServers() {
+    }
 }
@@ -7,35 +7,77 @@ import java.util.Properties;
 
 public class KafkaProducerPropertiesFactoryImpl implements KafkaProducerPropertiesFactory {
 
+    /**
+     * Environment variables with this prefix override producer properties,
+     * e.g. kafka_linger_ms=5 sets linger.ms=5.
+     */
+    public static final String PRODUCER_PROPERTY_PREFIX = "kafka_";
+
     private Properties kafkaProducerProperties;
 
+    private final Map<String, String> environment;
+
+    private final BootstrapServerResolver bootstrapServerResolver;
+
     public KafkaProducerPropertiesFactoryImpl() {
+        this(System.getenv());
+    }
 
+    KafkaProducerPropertiesFactoryImpl(Map<String, String> environment) {
+        this(environment, BootstrapServerResolver.fromEnvironment(environment));
+    }
+
+    KafkaProducerPropertiesFactoryImpl(Map<String, String> environment, BootstrapServerResolver bootstrapServerResolver) {
+        this.environment = environment;
+        this.bootstrapServerResolver = bootstrapServerResolver;
     }
 
     private String getBootstrapServer() {
-        return System.getenv("bootstrap_server");
+        return bootstrapServerResolver.bootstrapServers();
+    }
+
+    @Override
+    public void refreshBootstrapServers() {
+        bootstrapServerResolver.invalidate();
     }
 
     @Override
     public Properties getProducerProperties() {
-        if (kafkaProducerProperties != null)
+        if (kafkaProducerProperties != null) {
+            // a new producer is only created after the previous one failed, the brokers may have changed
+            kafkaProducerProperties.put("bootstrap.servers", getBootstrapServer());
             return kafkaProducerProperties;
+        }
 
-        String serializer = org.apache.kafka.common.serialization.StringSerializer.class.getCanonicalName();
+        String keySerializer = org.apache.kafka.common.serialization.StringSerializer.class.getCanonicalName();
+        // record values are passed through as bytes, the payload is never converted to a string
+        String valueSerializer = org.apache.kafka.common.serialization.ByteArraySerializer.class.getCanonicalName();
         String callbackHandler = software.amazon.msk.auth.iam.IAMClientCallbackHandler.class.getCanonicalName();
         String loginModule = software.amazon.msk.auth.iam.IAMLoginModule.class.getCanonicalName();
 
-        Map<String, String> configuration = Map.of(
-                "key.serializer", serializer,
-                "value.serializer", serializer,
-                "bootstrap.servers", getBootstrapServer(),
-                "security.protocol", "SASL_SSL",
-                "sasl.mechanism", "AWS_MSK_IAM",
-                "sasl.jaas.config", loginModule+ " required;",
-                "sasl.client.callback.handler.class", callbackHandler,
-                "connections.max.idle.ms", "60",
-                "reconnect.backoff.ms", "1000"
+        Map<String, String> configuration = Map.ofEntries(
+                Map.entry("key.serializer", keySerializer),
+                Map.entry("value.serializer", valueSerializer),
+                Map.entry("bootstrap.servers", getBootstrapServer()),
+                Map.entry("security.protocol", "SASL_SSL"),
+                Map.entry("sasl.mechanism", "AWS_MSK_IAM"),
+                Map.entry("sasl.jaas.config", loginModule+ " required;"),
+                Map.entry("sasl.client.callback.handler.class", callbackHandler),
+                // retries of the producer do not duplicate records, needs acks=all and the
+                // kafka-cluster:WriteDataIdempotently permission
+                Map.entry("enable.idempotence", "true"),
+                Map.entry("acks", "all"),
+                // keep connections open between warm invocations to avoid a new TLS and IAM handshake,
+                // below the 10 minutes after which the brokers close idle connections, so the client
+                // closes an expired connection itself on the first poll after a thaw
+                Map.entry("connections.max.idle.ms", "540000"),
+                // keep the partitions of the topic across long freezes, a send does not block on a
+                // metadata request after a thaw, the metadata is refreshed in the background
+                Map.entry("metadata.max.idle.ms", "3600000"),
+                // exponential backoff with jitter, execution environments thawed at the same time
+                // do not reconnect to an unavailable broker in lockstep
+                Map.entry("reconnect.backoff.ms", "1000"),
+                Map.entry("reconnect.backoff.max.ms", "10000")
         );
 
         kafkaProducerProperties = new Properties();
@@ -44,9 +86,17 @@ public class KafkaProducerPropertiesFactoryImpl implements KafkaProducerProperti
             kafkaProducerProperties.put(configEntry.getKey(), configEntry.getValue());
         }
 
-
+        for (Map.Entry<String, String> environmentEntry : environment.entrySet()) {
+            if (environmentEntry.getKey().startsWith(PRODUCER_PROPERTY_PREFIX)) {
+                kafkaProducerProperties.put(toPropertyName(environmentEntry.getKey()), environmentEntry.getValue());
+            }
+        }
 
         return kafkaProducerProperties;
     }
 
+    private static String toPropertyName(String environmentVariable) {
+        return environmentVariable.substring(PRODUCER_PROPERTY_PREFIX.length()).replace('_', '.');
+    }
+
 }
@@ -0,0 +1,76 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import com.amazonaws.services.lambda.runtime.Context;
+import com.amazonaws.services.lambda.runtime.RequestHandler;
+import com.amazonaws.services.lambda.runtime.events.KinesisEvent;
+import com.amazonaws.services.lambda.runtime.events.StreamsEventResponse;
+import org.apache.kafka.clients.producer.ProducerRecord;
+import org.apache.logging.log4j.LogManager;
+import org.apache.logging.log4j.Logger;
+import software.amazon.lambda.powertools.logging.Logging;
+import software.amazon.lambda.powertools.metrics.Metrics;
+import software.amazon.lambda.powertools.tracing.Tracing;
+
+import java.nio.ByteBuffer;
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * Drains records which API Gateway wrote to a Kinesis data stream into Kafka. Records which could
+ * not be delivered are reported as batch item failures, so the shard is retried from the first
+ * failed record.
+ */
+public class KinesisKafkaProxy extends AbstractKafkaProxy implements RequestHandler<KinesisEvent, StreamsEventResponse> {
+
+    private static final Logger log = LogManager.getLogger(KinesisKafkaProxy.class);
+
+    @Override
+    @Tracing
+    @Logging
+    @Metrics
+    public StreamsEventResponse handleRequest(KinesisEvent input, Context context) {
+        List<KinesisEvent.KinesisEventRecord> kinesisRecords = input.getRecords();
+
+        List<ProducerRecord<String, byte[]>> records = new ArrayList<>(kinesisRecords.size());
+        for (KinesisEvent.KinesisEventRecord kinesisRecord : kinesisRecords) {
+            KinesisEvent.Record record = kinesisRecord.getKinesis();
+            byte[] message = toBytes(record.getData());
+            String key = recordKeyExtractor.extract(null, message, record.getPartitionKey());
+            records.add(new ProducerRecord<String, byte[]>(topicRouter.getDefaultTopic(), key, message));
+        }
+
+        List<StreamsEventResponse.BatchItemFailure> failures = new ArrayList<>();
+        try {
+            List<Exception> errors = sendAll(records);
+            for (int i = 0; i < errors.size(); i++) {
+                if (errors.get(i) != null) {
+                    log.error(errors.get(i).getMessage(), errors.get(i));
+                    failures.add(new StreamsEventResponse.BatchItemFailure(kinesisRecords.get(i).getKinesis().getSequenceNumber()));
+                }
+            }
+        } catch (Exception e) {
+            log.error(e.getMessage(), e);
+            for (KinesisEvent.KinesisEventRecord kinesisRecord : kinesisRecords) {
+                failures.add(new StreamsEventResponse.BatchItemFailure(kinesisRecord.getKinesis().getSequenceNumber()));
+            }
+        }
+
+        log.info("Batch of {} records was send, {} failed", kinesisRecords.size(), failures.size());
+
+        return new StreamsEventResponse(failures);
+    }
+
+    /**
+     * Returns the record data without copying if the buffer wraps a complete array.
+     */
+    private static byte[] toBytes(ByteBuffer data) {
+        if (data.hasArray() && data.arrayOffset() == 0 && data.position() == 0 && data.remaining() == data.array().length) {
+            return data.array();
+        }
+        byte[] bytes = new byte[data.remaining()];
+        data.duplicate().get(bytes);
+        return bytes;
+    }
+}
@@ -0,0 +1,73 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import com.fasterxml.jackson.databind.DeserializationFeature;
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
+
+import java.io.IOException;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+
+/**
+ * Splits the body of a batch request into the individual Kafka record values.
+ * <p>
+ * A body starting with '[' is read as a JSON array, any other body is read as
+ * newline delimited records (one record per non empty line). Content after the
+ * array is rejected, so newline delimited records whose first line is an array
+ * are not cut short. The body is parsed as bytes, so records are never converted
+ * to Java strings.
+ */
+public class MessageBatchParser {
+
+    private static final ObjectMapper MAPPER = new ObjectMapper().enable(DeserializationFeature.FAIL_ON_TRAILING_TOKENS);
+
+    public List<byte[]> parse(byte[] body) throws IOException {
+        int start = body == null ? 0 : skipWhitespace(body, 0);
+        if (body == null || start == body.length) {
+            throw new IllegalArgumentException("Batch request body must not be empty");
+        }
+
+        if (body[start] == '[') {
+            return parseJsonArray(body);
+        }
+        return parseDelimited(body);
+    }
+
+    private List<byte[]> parseJsonArray(byte[] body) throws IOException {
+        JsonNode array = MAPPER.readTree(body);
+        List<byte[]> messages = new ArrayList<>(array.size());
+        for (JsonNode element : array) {
+            // Plain strings are forwarded as is, objects and arrays as their JSON representation
+            messages.add(element.isTextual()
+                    ? element.textValue().getBytes(StandardCharsets.UTF_8)
+                    : MAPPER.writeValueAsBytes(element));
+        }
+        return messages;
+    }
+
+    private List<byte[]> parseDelimited(byte[] body) {
+        List<byte[]> messages = new ArrayList<>();
+        int lineStart = 0;
+        for (int i = 0; i <= body.length; i++) {
+            if (i == body.length || body[i] == '\n') {
+                int lineEnd = i > lineStart && body[i - 1] == '\r' ? i - 1 : i;
+                if (skipWhitespace(body, lineStart) < lineEnd) {
+                    messages.add(Arrays.copyOfRange(body, lineStart, lineEnd));
+                }
+                lineStart = i + 1;
+            }
+        }
+        return messages;
+    }
+
+    private static int skipWhitespace(byte[] body, int index) {
+        while (index < body.length && Character.isWhitespace(body[index])) {
+            index++;
+        }
+        return index;
+    }
+}
@@ -0,0 +1,124 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.apache.kafka.clients.producer.Producer;
+import software.amazon.cloudwatchlogs.emf.logger.MetricsLogger;
+import software.amazon.cloudwatchlogs.emf.model.Unit;
+import software.amazon.lambda.powertools.metrics.MetricsUtils;
+
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.List;
+import java.util.Map;
+import java.util.WeakHashMap;
+import java.util.concurrent.TimeUnit;
+
+/**
+ * Publishes a subset of the client metrics the Kafka producer keeps internally, e.g. the time
+ * records wait in the buffer or the average batch size, as EMF metrics. The metrics are sampled
+ * at the end of an invocation, a background thread would not run while the execution environment
+ * is frozen. Configured with the environment variables:
+ * <ul>
+ *     <li>{@code client_metrics} {@code none} (default), {@code default} for {@link #DEFAULT_METRICS}
+ *     or a comma separated list of metric names of the producer-metrics group</li>
+ *     <li>{@code client_metrics_interval_seconds} minimum time between two samples, 0 samples every
+ *     invocation (default 60)</li>
+ * </ul>
+ */
+public class ProducerClientMetrics {
+
+    public static final String METRICS_VARIABLE = "client_metrics";
+    public static final String INTERVAL_VARIABLE = "client_metrics_interval_seconds";
+
+    public static final List<String> DEFAULT_METRICS = List.of(
+            "record-queue-time-avg",
+            "request-latency-avg",
+            "batch-size-avg",
+            "compression-rate-avg",
+            "record-retry-rate");
+
+    public static final int DEFAULT_INTERVAL_SECONDS = 60;
+
+    private static final Map<String, Unit> UNITS = Map.of(
+            "record-queue-time-avg", Unit.MILLISECONDS,
+            "record-queue-time-max", Unit.MILLISECONDS,
+            "request-latency-avg", Unit.MILLISECONDS,
+            "request-latency-max", Unit.MILLISECONDS,
+            "batch-size-avg", Unit.BYTES,
+            "batch-size-max", Unit.BYTES,
+            "record-size-avg", Unit.BYTES,
+            "record-retry-rate", Unit.COUNT_SECOND,
+            "record-error-rate", Unit.COUNT_SECOND,
+            "record-send-rate", Unit.COUNT_SECOND);
+
+    private final List<String> metricNames;
+    private final long intervalNanos;
+    // per producer, every cluster has its own producer, closed producers are dropped
+    private final Map<Producer<?, ?>, Long> lastSamples = new WeakHashMap<>();
+
+    private ProducerClientMetrics(List<String> metricNames, long intervalSeconds) {
+        this.metricNames = metricNames;
+        this.intervalNanos = TimeUnit.SECONDS.toNanos(intervalSeconds);
+    }
+
+    public static ProducerClientMetrics fromValues(String metrics, String intervalSeconds) {
+        List<String> metricNames;
+        if (metrics == null || metrics.isBlank() || metrics.strip().equals("none")) {
+            metricNames = Collections.emptyList();
+        } else if (metrics.strip().equals("default")) {
+            metricNames = DEFAULT_METRICS;
+        } else {
+            metricNames = new ArrayList<>();
+            for (String name : metrics.split(",")) {
+                if (!name.isBlank()) {
+                    metricNames.add(name.strip());
+                }
+            }
+        }
+
+        int interval = intervalSeconds == null || intervalSeconds.isBlank()
+                ? DEFAULT_INTERVAL_SECONDS : Integer.parseInt(intervalSeconds.strip());
+        if (interval < 0) {
+            throw new IllegalArgumentException("Client metrics interval must not be negative, got " + interval);
+        }
+        return new ProducerClientMetrics(metricNames, interval);
+    }
+
+    public static ProducerClientMetrics fromEnvironment() {
+        return fromValues(System.getenv(METRICS_VARIABLE), System.getenv(INTERVAL_VARIABLE));
+    }
+
+    public boolean isEnabled() {
+        return !metricNames.isEmpty();
+    }
+
+    public List<String> getMetricNames() {
+        return metricNames;
+    }
+
+    /**
+     * Publishes the chosen metrics if the interval since the last sample of this producer has
+     * passed. Metrics the producer does not report yet, e.g. before the first request was sent, are
+     * skipped.
+     */
+    public void publish(Producer<?, ?> producer) {
+        if (!isEnabled()) {
+            return;
+        }
+        long now = System.nanoTime();
+        Long lastSample = lastSamples.get(producer);
+        if (lastSample != null && now - lastSample < intervalNanos) {
+            return;
+        }
+        lastSamples.put(producer, now);
+
+        MetricsLogger metrics = MetricsUtils.metricsLogger();
+        for (String name : metricNames) {
+            double value = ProducerMetrics.metricValue(producer.metrics(), name);
+            if (!Double.isNaN(value) && !Double.isInfinite(value)) {
+                metrics.putMetric(name, value, UNITS.getOrDefault(name, Unit.NONE));
+            }
+        }
+    }
+}
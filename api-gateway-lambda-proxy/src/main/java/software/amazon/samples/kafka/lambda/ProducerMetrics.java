@@ -0,0 +1,143 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.apache.kafka.clients.producer.Producer;
+import org.apache.kafka.common.Metric;
+import org.apache.kafka.common.MetricName;
+import software.amazon.cloudwatchlogs.emf.logger.MetricsLogger;
+import software.amazon.cloudwatchlogs.emf.model.Unit;
+import software.amazon.lambda.powertools.metrics.MetricsUtils;
+
+import java.util.HashMap;
+import java.util.Map;
+import java.util.WeakHashMap;
+import java.util.concurrent.TimeUnit;
+
+/**
+ * Emits the metrics of the producer hot path in CloudWatch Embedded Metric Format. The values of a
+ * request or of a batch of the buffer are aggregated, so every invocation writes one EMF document
+ * regardless of the number of records. The document is written by the {@code @Metrics} annotation of
+ * the handler when the invocation ends.
+ */
+public class ProducerMetrics {
+
+    public static final String ENQUEUE_LATENCY = "EnqueueLatency";
+    public static final String ACK_LATENCY = "AckLatency";
+    public static final String RECORD_SIZE = "RecordSize";
+    public static final String BATCH_SIZE = "BatchSize";
+    public static final String BUFFER_UTILISATION = "BufferUtilisation";
+    public static final String RETRIES = "Retries";
+    public static final String ERRORS = "Errors";
+    public static final String CONNECTIONS_CREATED = "ConnectionsCreated";
+    public static final String AUTHENTICATIONS = "Authentications";
+    public static final String REAUTHENTICATIONS = "Reauthentications";
+
+    // totals of the producer-metrics group -> metric of the difference since the previous invocation
+    private static final Map<String, String> COUNTERS = Map.of(
+            "record-retry-total", RETRIES,
+            "connection-creation-total", CONNECTIONS_CREATED,
+            "successful-authentication-total", AUTHENTICATIONS,
+            "successful-reauthentication-total", REAUTHENTICATIONS);
+
+    // per producer, every cluster has its own producer, closed producers are dropped
+    private final Map<Producer<?, ?>, Map<String, Double>> lastTotals = new WeakHashMap<>();
+
+    /**
+     * Starts the measurement of the records of one request or batch.
+     */
+    public Batch startBatch() {
+        return new Batch();
+    }
+
+    /**
+     * Records the utilisation of the producer buffer, the retries and the connections opened and
+     * authenticated since the previous invocation. Warm invocations which reuse the connections
+     * of the execution environment do not open or authenticate connections, re-authentications
+     * renew the IAM session of an open connection before it expires.
+     */
+    public void recordProducer(Producer<?, ?> producer) {
+        MetricsLogger metrics = MetricsUtils.metricsLogger();
+
+        double total = metricValue(producer.metrics(), "buffer-total-bytes");
+        double available = metricValue(producer.metrics(), "buffer-available-bytes");
+        if (total > 0) {
+            metrics.putMetric(BUFFER_UTILISATION, 100 * (total - available) / total, Unit.PERCENT);
+        }
+
+        // the producer only reports its totals since it was created
+        Map<String, Double> producerTotals = lastTotals.computeIfAbsent(producer, p -> new HashMap<>());
+        for (Map.Entry<String, String> counter : COUNTERS.entrySet()) {
+            double value = metricValue(producer.metrics(), counter.getKey());
+            if (!Double.isNaN(value)) {
+                double last = producerTotals.getOrDefault(counter.getKey(), 0.0);
+                metrics.putMetric(counter.getValue(), value - last, Unit.COUNT);
+                producerTotals.put(counter.getKey(), value);
+            }
+        }
+    }
+
+    /**
+     * @return the value of a metric of the producer-metrics group, NaN if the producer does not report it
+     */
+    static double metricValue(Map<MetricName, ? extends Metric> producerMetrics, String name) {
+        for (Map.Entry<MetricName, ? extends Metric> entry : producerMetrics.entrySet()) {
+            if (entry.getKey().name().equals(name) && entry.getKey().group().equals("producer-metrics")) {
+                Object value = entry.getValue().metricValue();
+                return value instanceof Number ? ((Number) value).doubleValue() : Double.NaN;
+            }
+        }
+        return Double.NaN;
+    }
+
+    /**
+     * Measures the records of one request or batch. The enqueue latency is the average time
+     * {@code send} blocks per record, the ack latency the time from the last send until every
+     * acknowledgement of the batch was received.
+     */
+    public static class Batch {
+
+        private int records;
+        private long bytes;
+        private long enqueueNanos;
+        private long sentAt;
+
+        private Batch() {
+        }
+
+        /**
+         * @param startedAt the {@link System#nanoTime()} before the record was handed to the producer
+         * @param size      the size of the record value in bytes
+         */
+        public void sent(long startedAt, int size) {
+            sentAt = System.nanoTime();
+            enqueueNanos += sentAt - startedAt;
+            records++;
+            bytes += size;
+        }
+
+        /**
+         * Writes the metrics of the batch.
+         *
+         * @param acknowledged whether the acknowledgements were awaited, false in fire-and-forget mode
+         * @param errors       the number of records which could not be delivered
+         */
+        public void finish(boolean acknowledged, int errors) {
+            MetricsLogger metrics = MetricsUtils.metricsLogger();
+            metrics.putMetric(BATCH_SIZE, records, Unit.COUNT);
+            metrics.putMetric(ERRORS, errors, Unit.COUNT);
+            if (records == 0) {
+                return;
+            }
+            metrics.putMetric(RECORD_SIZE, (double) bytes / records, Unit.BYTES);
+            metrics.putMetric(ENQUEUE_LATENCY, toMillis(enqueueNanos) / records, Unit.MILLISECONDS);
+            if (acknowledged) {
+                metrics.putMetric(ACK_LATENCY, toMillis(System.nanoTime() - sentAt), Unit.MILLISECONDS);
+            }
+        }
+
+        private static double toMillis(long nanos) {
+            return (double) nanos / TimeUnit.MILLISECONDS.toNanos(1);
+        }
+    }
+}
@@ -0,0 +1,118 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import com.fasterxml.jackson.core.JsonPointer;
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import org.apache.kafka.common.utils.Utils;
+
+import java.io.IOException;
+import java.util.Map;
+
+/**
+ * Selects the key of a Kafka record. Records with the same key are written to the same partition
+ * in order, so the key decides which messages keep their order and how evenly the partitions are
+ * loaded. Configured with the environment variable record_key:
+ * <ul>
+ *     <li>{@code request-id} the id of the invocation, spreads records evenly without ordering (default)</li>
+ *     <li>{@code header:<name>} the value of a request header</li>
+ *     <li>{@code json:<pointer>} the value at a JSON pointer into the message, e.g. {@code json:/customer/id}</li>
+ *     <li>{@code hash} a hash of the message, identical messages share a partition</li>
+ * </ul>
+ * If a message does not carry the configured key the fallback key is used.
+ */
+public class RecordKeyExtractor {
+
+    public static final String ENVIRONMENT_VARIABLE = "record_key";
+
+    private static final ObjectMapper MAPPER = new ObjectMapper();
+
+    private enum Source {REQUEST_ID, HEADER, JSON_POINTER, HASH}
+
+    private final Source source;
+    private final String header;
+    private final JsonPointer pointer;
+
+    private RecordKeyExtractor(Source source, String header, JsonPointer pointer) {
+        this.source = source;
+        this.header = header;
+        this.pointer = pointer;
+    }
+
+    public static RecordKeyExtractor fromValue(String value) {
+        if (value == null || value.isBlank() || value.strip().equals("request-id")) {
+            return new RecordKeyExtractor(Source.REQUEST_ID, null, null);
+        }
+        value = value.strip();
+        if (value.equals("hash")) {
+            return new RecordKeyExtractor(Source.HASH, null, null);
+        }
+        if (value.startsWith("header:") && !value.substring("header:".length()).isBlank()) {
+            return new RecordKeyExtractor(Source.HEADER, value.substring("header:".length()).strip(), null);
+        }
+        if (value.startsWith("json:")) {
+            return new RecordKeyExtractor(Source.JSON_POINTER, null, JsonPointer.compile(value.substring("json:".length()).strip()));
+        }
+        throw new IllegalArgumentException("Unknown record key " + value);
+    }
+
+    public static RecordKeyExtractor fromEnvironment() {
+        return fromValue(System.getenv(ENVIRONMENT_VARIABLE));
+    }
+
+    /**
+     * @param headers     the request headers, null if the message was not received through API Gateway
+     * @param message     the message which is written to Kafka
+     * @param fallbackKey the key used if the message does not carry the configured key
+     */
+    public String extract(Map<String, String> headers, byte[] message, String fallbackKey) {
+        String key = null;
+        switch (source) {
+            case HEADER:
+                key = headerValue(headers);
+                break;
+            case JSON_POINTER:
+                key = jsonValue(message);
+                break;
+            case HASH:
+                key = message == null ? null : Integer.toHexString(Utils.murmur2(message));
+                break;
+            default:
+                break;
+        }
+        return key == null || key.isEmpty() ? fallbackKey : key;
+    }
+
+    private String headerValue(Map<String, String> headers) {
+        if (headers == null) {
+            return null;
+        }
+        // API Gateway keeps the case of the header names sent by the client
+        for (Map.Entry<String, String> entry : headers.entrySet()) {
+            if (header.equalsIgnoreCase(entry.getKey())) {
+                return entry.getValue();
+            }
+        }
+        return null;
+    }
+
+    private String jsonValue(byte[] message) {
+        if (message == null) {
+            return null;
+        }
+        try {
+            JsonNode node = MAPPER.readTree(message);
+            if (node == null) {
+                return null;
+            }
+            JsonNode value = node.at(pointer);
+            if (value.isMissingNode() || value.isNull()) {
+                return null;
+            }
+            return value.isValueNode() ? value.asText() : MAPPER.writeValueAsString(value);
+        } catch (IOException e) {
+            return null;
+        }
+    }
+}
@@ -0,0 +1,249 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import com.google.protobuf.DescriptorProtos;
+import com.google.protobuf.Descriptors;
+import com.google.protobuf.DynamicMessage;
+import com.google.protobuf.util.JsonFormat;
+import org.apache.avro.AvroRuntimeException;
+import org.apache.avro.Schema;
+import org.apache.avro.generic.GenericDatumReader;
+import org.apache.avro.generic.GenericDatumWriter;
+import org.apache.avro.io.BinaryEncoder;
+import org.apache.avro.io.DecoderFactory;
+import org.apache.avro.io.EncoderFactory;
+
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.IOException;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.NoSuchFileException;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.HashMap;
+import java.util.Map;
+import java.util.regex.Pattern;
+
+/**
+ * Validates JSON messages against a schema and writes them in the compact binary encoding of the
+ * schema. Configured with the environment variables:
+ * <ul>
+ *     <li>{@code serialization_format} {@code none} (default), {@code avro} or {@code protobuf}</li>
+ *     <li>{@code schema_directory} directory of the schema files, {@code <name>.avsc} for Avro and
+ *     {@code <name>.desc} for Protobuf, a descriptor set written by {@code protoc --include_imports
+ *     --descriptor_set_out} where {@code <name>} is the full name of the message type</li>
+ *     <li>{@code schema_name} schema of requests without the {@code X-Schema-Name} header</li>
+ *     <li>{@code schema_cache_size} number of compiled schemas kept in memory (default 32)</li>
+ * </ul>
+ * Schemas are read from the directory once and then served from a {@link SchemaCache}, so a
+ * request does not wait for a file read or a network round trip. The default schema is compiled
+ * when the serializer is created from the environment, so a broken schema file fails the init of
+ * the function instead of its requests.
+ */
+public class RecordSerializer {
+
+    public static final String FORMAT_VARIABLE = "serialization_format";
+    public static final String SCHEMA_DIRECTORY_VARIABLE = "schema_directory";
+    public static final String SCHEMA_NAME_VARIABLE = "schema_name";
+    public static final String CACHE_SIZE_VARIABLE = "schema_cache_size";
+
+    /** Request header selecting the schema of the message. */
+    public static final String SCHEMA_HEADER = "X-Schema-Name";
+    /** Kafka record header naming the schema the value was written with. */
+    public static final String RECORD_SCHEMA_HEADER = "schema";
+
+    public static final int DEFAULT_CACHE_SIZE = 32;
+
+    private static final Pattern SCHEMA_NAME_PATTERN = Pattern.compile("[\\w.-]+");
+
+    private enum Format {
+        NONE(null), AVRO(".avsc"), PROTOBUF(".desc");
+
+        private final String extension;
+
+        Format(String extension) {
+            this.extension = extension;
+        }
+    }
+
+    private interface CompiledSchema {
+        byte[] encode(byte[] json) throws IOException;
+    }
+
+    private final Format format;
+    private final Path schemaDirectory;
+    private final String defaultSchemaName;
+    private final SchemaCache<CompiledSchema> schemas;
+
+    private RecordSerializer(Format format, Path schemaDirectory, String defaultSchemaName, int cacheSize) {
+        this.format = format;
+        this.schemaDirectory = schemaDirectory;
+        this.defaultSchemaName = defaultSchemaName;
+        this.schemas = new SchemaCache<>(cacheSize);
+    }
+
+    public static RecordSerializer fromValues(String format, String schemaDirectory, String schemaName, String cacheSize) {
+        Format parsedFormat = Format.NONE;
+        if (format != null && !format.isBlank()) {
+            try {
+                parsedFormat = Format.valueOf(format.strip().toUpperCase());
+            } catch (IllegalArgumentException e) {
+                throw new IllegalArgumentException("Unknown serialization format " + format);
+            }
+        }
+        if (parsedFormat != Format.NONE && (schemaDirectory == null || schemaDirectory.isBlank())) {
+            throw new IllegalArgumentException("Serialization format " + format + " requires a schema directory");
+        }
+        return new RecordSerializer(
+                parsedFormat,
+                parsedFormat == Format.NONE ? null : Paths.get(schemaDirectory.strip()),
+                schemaName == null || schemaName.isBlank() ? null : schemaName.strip(),
+                cacheSize == null || cacheSize.isBlank() ? DEFAULT_CACHE_SIZE : Integer.parseInt(cacheSize.strip()));
+    }
+
+    public static RecordSerializer fromEnvironment() {
+        RecordSerializer serializer = fromValues(
+                System.getenv(FORMAT_VARIABLE),
+                System.getenv(SCHEMA_DIRECTORY_VARIABLE),
+                System.getenv(SCHEMA_NAME_VARIABLE),
+                System.getenv(CACHE_SIZE_VARIABLE));
+        serializer.preload();
+        return serializer;
+    }
+
+    public boolean isEnabled() {
+        return format != Format.NONE;
+    }
+
+    /**
+     * @param headers the request headers, may be null
+     * @return the schema requested by the {@code X-Schema-Name} header or the default schema
+     */
+    public String schemaName(Map<String, String> headers) {
+        if (headers != null) {
+            for (Map.Entry<String, String> entry : headers.entrySet()) {
+                if (SCHEMA_HEADER.equalsIgnoreCase(entry.getKey()) && entry.getValue() != null && !entry.getValue().isBlank()) {
+                    return entry.getValue().strip();
+                }
+            }
+        }
+        return defaultSchemaName;
+    }
+
+    /**
+     * Validates the JSON message against the schema and returns its binary encoding.
+     *
+     * @throws IllegalArgumentException if the schema does not exist or the message does not match it
+     * @throws IllegalStateException    if the schema file can not be read or compiled
+     */
+    public byte[] serialize(String schemaName, byte[] message) throws IOException {
+        CompiledSchema schema = getSchema(schemaName);
+        try {
+            return schema.encode(message);
+        } catch (AvroRuntimeException | IOException e) {
+            // malformed JSON and values which do not match the schema
+            throw new IllegalArgumentException("Message does not match schema " + schemaName + ": " + e.getMessage(), e);
+        }
+    }
+
+    /**
+     * Compiles the default schema ahead of the first request.
+     *
+     * @throws IllegalArgumentException if the default schema does not exist
+     * @throws IllegalStateException    if the schema file can not be read or compiled
+     */
+    public void preload() {
+        if (isEnabled() && defaultSchemaName != null) {
+            try {
+                getSchema(defaultSchemaName);
+            } catch (IOException e) {
+                // load wraps every read error, the cache does not throw one itself
+                throw new IllegalStateException(e.getMessage(), e);
+            }
+        }
+    }
+
+    int cachedSchemas() {
+        return schemas.size();
+    }
+
+    private CompiledSchema getSchema(String schemaName) throws IOException {
+        if (schemaName == null) {
+            throw new IllegalArgumentException("No schema selected, set the " + SCHEMA_HEADER + " header");
+        }
+        if (!SCHEMA_NAME_PATTERN.matcher(schemaName).matches()) {
+            throw new IllegalArgumentException("Invalid schema name " + schemaName);
+        }
+        return schemas.get(schemaName, this::load);
+    }
+
+    /**
+     * Reads and compiles a schema file. Only a missing file is an error of the request, a file
+     * which can not be read or compiled is an error of the deployment.
+     */
+    private CompiledSchema load(String schemaName) {
+        Path file = schemaDirectory.resolve(schemaName + format.extension);
+        try {
+            byte[] content = Files.readAllBytes(file);
+            return format == Format.AVRO ? compileAvro(content) : compileProtobuf(schemaName, content);
+        } catch (NoSuchFileException e) {
+            throw new IllegalArgumentException("Unknown schema " + schemaName);
+        } catch (IOException | RuntimeException e) {
+            // SchemaParseException of Avro, InvalidProtocolBufferException of Protobuf
+            throw new IllegalStateException("Schema file " + file + " can not be loaded: " + e.getMessage(), e);
+        }
+    }
+
+    private static CompiledSchema compileAvro(byte[] content) {
+        Schema schema = new Schema.Parser().parse(new String(content, StandardCharsets.UTF_8));
+        GenericDatumReader<Object> reader = new GenericDatumReader<>(schema);
+        GenericDatumWriter<Object> writer = new GenericDatumWriter<>(schema);
+        // Messages are expected in the JSON encoding of Avro, unions are wrapped in their type name
+        return json -> {
+            Object datum = reader.read(null, DecoderFactory.get().jsonDecoder(schema, new ByteArrayInputStream(json)));
+            ByteArrayOutputStream out = new ByteArrayOutputStream(json.length);
+            BinaryEncoder encoder = EncoderFactory.get().binaryEncoder(out, null);
+            writer.write(datum, encoder);
+            encoder.flush();
+            return out.toByteArray();
+        };
+    }
+
+    private static CompiledSchema compileProtobuf(String messageType, byte[] content) throws IOException {
+        DescriptorProtos.FileDescriptorSet descriptorSet = DescriptorProtos.FileDescriptorSet.parseFrom(content);
+
+        // protoc writes the files of a descriptor set after their dependencies
+        Map<String, Descriptors.FileDescriptor> files = new HashMap<>();
+        Descriptors.Descriptor descriptor = null;
+        for (DescriptorProtos.FileDescriptorProto file : descriptorSet.getFileList()) {
+            Descriptors.FileDescriptor[] dependencies = file.getDependencyList().stream()
+                    .map(files::get)
+                    .toArray(Descriptors.FileDescriptor[]::new);
+            Descriptors.FileDescriptor fileDescriptor;
+            try {
+                fileDescriptor = Descriptors.FileDescriptor.buildFrom(file, dependencies);
+            } catch (Descriptors.DescriptorValidationException e) {
+                throw new IOException("Invalid descriptor set for " + messageType, e);
+            }
+            files.put(file.getName(), fileDescriptor);
+            for (Descriptors.Descriptor candidate : fileDescriptor.getMessageTypes()) {
+                if (candidate.getFullName().equals(messageType)) {
+                    descriptor = candidate;
+                }
+            }
+        }
+        if (descriptor == null) {
+            throw new IOException("Descriptor set does not contain message type " + messageType);
+        }
+
+        Descriptors.Descriptor messageDescriptor = descriptor;
+        JsonFormat.Parser parser = JsonFormat.parser();
+        return json -> {
+            DynamicMessage.Builder builder = DynamicMessage.newBuilder(messageDescriptor);
+            parser.merge(new String(json, StandardCharsets.UTF_8), builder);
+            return builder.build().toByteArray();
+        };
+    }
+}
@@ -0,0 +1,45 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import java.io.IOException;
+import java.util.LinkedHashMap;
+import java.util.Map;
+
+/**
+ * Least recently used cache of compiled schemas. The cache lives as long as the execution
+ * environment, so a schema is read and compiled on first use only.
+ */
+class SchemaCache<V> {
+
+    interface Loader<V> {
+        V load(String name) throws IOException;
+    }
+
+    private final Map<String, V> entries;
+
+    SchemaCache(int maximumSize) {
+        if (maximumSize < 1) {
+            throw new IllegalArgumentException("Schema cache size must be at least 1, got " + maximumSize);
+        }
+        entries = new LinkedHashMap<String, V>(16, 0.75f, true) {
+            @Override
+            protected boolean removeEldestEntry(Map.Entry<String, V> eldest) {
+                return size() > maximumSize;
+            }
+        };
+    }
+
+    synchronized V get(String name, Loader<V> loader) throws IOException {
+        V value = entries.get(name);
+        if (value == null) {
+            value = loader.load(name);
+            entries.put(name, value);
+        }
+        return value;
+    }
+
+    synchronized int size() {
+        return entries.size();
+    }
+}
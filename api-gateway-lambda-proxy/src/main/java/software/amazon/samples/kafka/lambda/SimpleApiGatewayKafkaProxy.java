@@ -6,72 +6,298 @@ import com.amazonaws.services.lambda.runtime.Context;
 import com.amazonaws.services.lambda.runtime.RequestHandler;
 import com.amazonaws.services.lambda.runtime.events.APIGatewayProxyRequestEvent;
 import com.amazonaws.services.lambda.runtime.events.APIGatewayProxyResponseEvent;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.fasterxml.jackson.databind.node.ArrayNode;
+import com.fasterxml.jackson.databind.node.ObjectNode;
 import org.apache.kafka.clients.producer.KafkaProducer;
 import org.apache.kafka.clients.producer.ProducerRecord;
 import org.apache.kafka.clients.producer.RecordMetadata;
 import org.apache.logging.log4j.LogManager;
 import org.apache.logging.log4j.Logger;
 import software.amazon.lambda.powertools.logging.Logging;
+import software.amazon.lambda.powertools.metrics.Metrics;
 import software.amazon.lambda.powertools.tracing.Tracing;
 
+import java.io.IOException;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.Base64;
 import java.util.HashMap;
+import java.util.LinkedHashSet;
+import java.util.List;
 import java.util.Map;
+import java.util.Set;
+import java.util.concurrent.ExecutionException;
 import java.util.concurrent.Future;
 
-import static software.amazon.lambda.powertools.utilities.jmespath.Base64Function.decode;
+public class SimpleApiGatewayKafkaProxy extends AbstractKafkaProxy implements RequestHandler<APIGatewayProxyRequestEvent, APIGatewayProxyResponseEvent> {
 
-public class SimpleApiGatewayKafkaProxy implements RequestHandler<APIGatewayProxyRequestEvent, APIGatewayProxyResponseEvent> {
-
-    public static final String TOPIC_NAME = "messages";
+    public static final String BATCH_RESOURCE = "/batch";
 
     private static final Logger log = LogManager.getLogger(SimpleApiGatewayKafkaProxy.class);
-    public KafkaProducerPropertiesFactory kafkaProducerProperties = new KafkaProducerPropertiesFactoryImpl();
-    private KafkaProducer<String, String> producer;
+    private static final ObjectMapper MAPPER = new ObjectMapper();
+    public MessageBatchParser messageBatchParser = new MessageBatchParser();
+    public DeliveryMode deliveryMode = DeliveryMode.fromEnvironment();
+    public RecordSerializer recordSerializer = RecordSerializer.fromEnvironment();
+    public IdempotencyCache idempotencyCache = IdempotencyCache.fromEnvironment();
+    private final DeferredDeliveryErrors deferredDeliveryErrors = new DeferredDeliveryErrors();
 
+    /**
+     * The event is only logged in invocations sampled at debug level, see POWERTOOLS_LOGGER_SAMPLE_RATE,
+     * so the message bodies are not serialized into the logs of every request.
+     */
     @Override
     @Tracing
-    @Logging(logEvent = true)
+    @Logging
+    @Metrics
     public APIGatewayProxyResponseEvent handleRequest(APIGatewayProxyRequestEvent input, Context context) {
+        log.debug("Received event {}", input);
+        reportDeferredDeliveryErrors();
+
+        // POST /batch and POST /topics/{topic}/batch
+        if (input.getResource() != null && input.getResource().endsWith(BATCH_RESOURCE)) {
+            return handleBatchRequest(input, context);
+        }
+
         APIGatewayProxyResponseEvent response = createEmptyResponse();
+        ProducerMetrics.Batch batch = producerMetrics.startBatch();
+        // replayed and rejected requests are written as batches without records
+        boolean finished = false;
         try {
+            TopicRouter.Route route = topicRouter.route(input.getPathParameters(), input.getHeaders());
+            DeliveryMode deliveryMode = route.deliveryMode(this.deliveryMode);
+
+            // a retry of an acknowledged request is answered without writing the record again
+            String idempotencyKey = idempotencyCache.key(input.getHeaders());
+            String cacheKey = idempotencyKey == null ? null : IdempotencyCache.requestKey(route.getTopic(), idempotencyKey);
+            if (cacheKey != null && idempotencyCache.get(cacheKey) != null) {
+                log.debug("Message with idempotency key {} was already pushed", idempotencyKey);
+                response.getHeaders().put(IdempotencyCache.REPLAYED_HEADER, "true");
+                return response.withStatusCode(200).withBody("Message successfully pushed to kafka");
+            }
 
-            String message = getMessageBody(input);
+            ProducerRecord<String, byte[]> record = createRecord(input, route, getMessageBody(input),
+                    idempotencyKey != null ? idempotencyKey : context.getAwsRequestId(), idempotencyKey);
 
-            KafkaProducer<String, String> producer = createProducer();
+            KafkaProducer<String, byte[]> producer = producerFor(record);
 
-            ProducerRecord<String, String> record = new ProducerRecord<String, String>(TOPIC_NAME, context.getAwsRequestId(), message);
+            long startedAt = System.nanoTime();
+            if (deliveryMode == DeliveryMode.FIRE_AND_FORGET) {
+                producer.send(record, deferredDeliveryErrors);
+                batch.sent(startedAt, record.value().length);
+                finished = true;
+                batch.finish(false, 0);
+                recordProducerMetrics(producer);
+                return response.withStatusCode(202).withBody("Message accepted");
+            }
 
             Future<RecordMetadata> send = producer.send(record);
-            producer.flush();
+            batch.sent(startedAt, record.value().length);
+            if (deliveryMode == DeliveryMode.SYNC) {
+                producer.flush();
+            }
 
             RecordMetadata metadata = send.get();
+            finished = true;
+            batch.finish(true, 0);
+            recordProducerMetrics(producer);
+            if (cacheKey != null) {
+                idempotencyCache.put(cacheKey, metadata.partition(), metadata.offset());
+            }
 
-            log.info(String.format("Message was send to partition %s", metadata.partition()));
+            log.debug("Message was send to partition {}", metadata.partition());
 
             return response.withStatusCode(200).withBody("Message successfully pushed to kafka");
+        } catch (IllegalArgumentException e) {
+            log.error(e.getMessage(), e);
+            return response.withBody(e.getMessage()).withStatusCode(400);
         } catch (Exception e) {
             log.error(e.getMessage(), e);
+            if (!finished) {
+                finished = true;
+                batch.finish(false, 1);
+            }
+            resetIfDisconnected(e);
             return response.withBody(e.getMessage()).withStatusCode(500);
+        } finally {
+            if (!finished) {
+                batch.finish(false, 0);
+            }
         }
     }
 
+    /**
+     * Pushes every record of a batch request to Kafka. All records are handed to the producers of
+     * their clusters before a single flush per producer, so they share broker round trips. The response lists the outcome of
+     * every record in request order, failed records do not fail the whole batch. In fire-and-forget
+     * mode records are only reported as accepted. With an idempotency key the records acknowledged
+     * by an earlier attempt of the batch are not written again and reported as duplicates.
+     */
     @Tracing
-    private KafkaProducer<String, String> createProducer() {
-        if (producer == null) {
-            log.info("Connecting to kafka cluster");
-            producer = new KafkaProducer<String, String>(kafkaProducerProperties.getProducerProperties());
+    private APIGatewayProxyResponseEvent handleBatchRequest(APIGatewayProxyRequestEvent input, Context context) {
+        APIGatewayProxyResponseEvent response = createEmptyResponse();
+
+        List<byte[]> messages;
+        TopicRouter.Route route;
+        String idempotencyKey;
+        try {
+            route = topicRouter.route(input.getPathParameters(), input.getHeaders());
+            idempotencyKey = idempotencyCache.key(input.getHeaders());
+            messages = messageBatchParser.parse(getMessageBody(input));
+        } catch (Exception e) {
+            log.error(e.getMessage(), e);
+            return response.withBody(e.getMessage()).withStatusCode(400);
+        }
+
+        DeliveryMode deliveryMode = route.deliveryMode(this.deliveryMode);
+        ProducerMetrics.Batch batch = producerMetrics.startBatch();
+        boolean finished = false;
+        try {
+            Set<KafkaProducer<String, byte[]>> usedProducers = new LinkedHashSet<>();
+            List<Future<RecordMetadata>> sends = new ArrayList<>(messages.size());
+            List<Exception> sendErrors = new ArrayList<>(messages.size());
+            List<IdempotencyCache.Acknowledgement> duplicates = new ArrayList<>(messages.size());
+            for (int i = 0; i < messages.size(); i++) {
+                String recordIdempotencyKey = idempotencyKey == null ? null : idempotencyKey + "-" + i;
+                IdempotencyCache.Acknowledgement duplicate = idempotencyKey == null ? null
+                        : idempotencyCache.get(IdempotencyCache.recordKey(route.getTopic(), idempotencyKey, i));
+                duplicates.add(duplicate);
+                if (duplicate != null) {
+                    sends.add(null);
+                    sendErrors.add(null);
+                    continue;
+                }
+                try {
+                    // a record which does not match the schema fails alone
+                    ProducerRecord<String, byte[]> record = createRecord(input, route, messages.get(i),
+                            recordIdempotencyKey != null ? recordIdempotencyKey : context.getAwsRequestId() + "-" + i,
+                            recordIdempotencyKey);
+                    KafkaProducer<String, byte[]> producer = producerFor(record);
+                    usedProducers.add(producer);
+                    long startedAt = System.nanoTime();
+                    sends.add(deliveryMode == DeliveryMode.FIRE_AND_FORGET
+                            ? producer.send(record, deferredDeliveryErrors)
+                            : producer.send(record));
+                    batch.sent(startedAt, record.value().length);
+                    sendErrors.add(null);
+                } catch (Exception e) {
+                    sends.add(null);
+                    sendErrors.add(e);
+                }
+            }
+            if (deliveryMode == DeliveryMode.SYNC) {
+                for (KafkaProducer<String, byte[]> producer : usedProducers) {
+                    producer.flush();
+                }
+            }
+
+            ArrayNode results = MAPPER.createArrayNode();
+            List<Exception> errors = new ArrayList<>();
+            int failed = 0;
+            for (int i = 0; i < sends.size(); i++) {
+                ObjectNode result = results.addObject().put("index", i);
+                IdempotencyCache.Acknowledgement duplicate = duplicates.get(i);
+                if (duplicate != null) {
+                    result.put("partition", duplicate.getPartition()).put("offset", duplicate.getOffset()).put("duplicate", true);
+                    continue;
+                }
+                Exception error = sendErrors.get(i);
+                if (error == null && deliveryMode == DeliveryMode.FIRE_AND_FORGET) {
+                    result.put("status", "accepted");
+                    continue;
+                }
+                if (error == null) {
+                    try {
+                        RecordMetadata metadata = sends.get(i).get();
+                        result.put("partition", metadata.partition()).put("offset", metadata.offset());
+                        if (idempotencyKey != null) {
+                            idempotencyCache.put(IdempotencyCache.recordKey(route.getTopic(), idempotencyKey, i),
+                                    metadata.partition(), metadata.offset());
+                        }
+                        continue;
+                    } catch (ExecutionException e) {
+                        error = e.getCause() instanceof Exception ? (Exception) e.getCause() : e;
+                    }
+                }
+                failed++;
+                errors.add(error);
+                result.put("error", String.valueOf(error.getMessage()));
+            }
+
+            finished = true;
+            batch.finish(deliveryMode != DeliveryMode.FIRE_AND_FORGET, failed);
+            for (KafkaProducer<String, byte[]> producer : usedProducers) {
+                recordProducerMetrics(producer);
+            }
+            resetIfDisconnected(errors);
+
+            log.debug("Batch of {} messages was send, {} failed", messages.size(), failed);
+
+            ObjectNode body = MAPPER.createObjectNode().put("failed", failed);
+            body.set("records", results);
+            int statusCode = failed > 0 ? 207 : deliveryMode == DeliveryMode.FIRE_AND_FORGET ? 202 : 200;
+            return response.withStatusCode(statusCode).withBody(MAPPER.writeValueAsString(body));
+        } catch (Exception e) {
+            log.error(e.getMessage(), e);
+            if (!finished) {
+                batch.finish(false, messages.size());
+            }
+            return response.withBody(e.getMessage()).withStatusCode(500);
         }
-        return producer;
     }
 
+    @Override
+    protected void prime() throws Exception {
+        super.prime();
+        messageBatchParser.parse("[\"priming\"]".getBytes(StandardCharsets.UTF_8));
+        recordSerializer.preload();
+    }
 
-    private String getMessageBody(APIGatewayProxyRequestEvent input) {
-        String body = input.getBody();
+    /**
+     * Creates the Kafka record of a message. If a serialization format is configured, JSON messages
+     * are validated against their schema and written in its binary encoding, the key is still read
+     * from the JSON message. Binary requests are expected to be encoded already and are written as is.
+     * The idempotency key of the client, if any, is passed on in a record header.
+     */
+    private ProducerRecord<String, byte[]> createRecord(APIGatewayProxyRequestEvent input, TopicRouter.Route route, byte[] message,
+                                                        String fallbackKey, String idempotencyKey) throws IOException {
+        String key = route.recordKeyExtractor(recordKeyExtractor).extract(input.getHeaders(), message, fallbackKey);
+        ProducerRecord<String, byte[]> record;
+        if (!recordSerializer.isEnabled() || Boolean.TRUE.equals(input.getIsBase64Encoded())) {
+            record = new ProducerRecord<String, byte[]>(route.getTopic(), key, message);
+        } else {
+            String schemaName = recordSerializer.schemaName(input.getHeaders());
+            record = new ProducerRecord<String, byte[]>(route.getTopic(), key, recordSerializer.serialize(schemaName, message));
+            record.headers().add(RecordSerializer.RECORD_SCHEMA_HEADER, schemaName.getBytes(StandardCharsets.UTF_8));
+        }
+        if (idempotencyKey != null) {
+            record.headers().add(IdempotencyCache.RECORD_HEADER, idempotencyKey.getBytes(StandardCharsets.UTF_8));
+        }
+        return record;
+    }
+
+    private void reportDeferredDeliveryErrors() {
+        int failedDeliveries = deferredDeliveryErrors.drain();
+        if (failedDeliveries > 0) {
+            Exception lastError = deferredDeliveryErrors.getLastError();
+            log.error(String.format("%s fire-and-forget messages could not be delivered since the last invocation", failedDeliveries), lastError);
+            resetIfDisconnected(lastError);
+        }
+    }
 
-        if (input.getIsBase64Encoded()) {
-            body = decode(body);
+    /**
+     * Returns the raw message. Binary media types arrive base64 encoded and are decoded straight
+     * into bytes without an intermediate string.
+     */
+    private byte[] getMessageBody(APIGatewayProxyRequestEvent input) {
+        String body = input.getBody();
+        if (body == null) {
+            return new byte[0];
         }
-        return body;
+        if (Boolean.TRUE.equals(input.getIsBase64Encoded())) {
+            return Base64.getDecoder().decode(body);
+        }
+        return body.getBytes(StandardCharsets.UTF_8);
     }
 
     private APIGatewayProxyResponseEvent createEmptyResponse() {
@@ -81,9 +307,4 @@ public class SimpleApiGatewayKafkaProxy implements RequestHandler<APIGatewayProx
         APIGatewayProxyResponseEvent response = new APIGatewayProxyResponseEvent().withHeaders(headers);
         return response;
     }
-
-
-
-
-
 }
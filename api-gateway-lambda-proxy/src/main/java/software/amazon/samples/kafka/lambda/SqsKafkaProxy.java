@@ -0,0 +1,62 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import com.amazonaws.services.lambda.runtime.Context;
+import com.amazonaws.services.lambda.runtime.RequestHandler;
+import com.amazonaws.services.lambda.runtime.events.SQSBatchResponse;
+import com.amazonaws.services.lambda.runtime.events.SQSEvent;
+import org.apache.kafka.clients.producer.ProducerRecord;
+import org.apache.logging.log4j.LogManager;
+import org.apache.logging.log4j.Logger;
+import software.amazon.lambda.powertools.logging.Logging;
+import software.amazon.lambda.powertools.metrics.Metrics;
+import software.amazon.lambda.powertools.tracing.Tracing;
+
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * Drains messages which API Gateway wrote to an SQS queue into Kafka. Messages which could not be
+ * delivered are reported as batch item failures, so only those are retried.
+ */
+public class SqsKafkaProxy extends AbstractKafkaProxy implements RequestHandler<SQSEvent, SQSBatchResponse> {
+
+    private static final Logger log = LogManager.getLogger(SqsKafkaProxy.class);
+
+    @Override
+    @Tracing
+    @Logging
+    @Metrics
+    public SQSBatchResponse handleRequest(SQSEvent input, Context context) {
+        List<SQSEvent.SQSMessage> messages = input.getRecords();
+
+        List<ProducerRecord<String, byte[]>> records = new ArrayList<>(messages.size());
+        for (SQSEvent.SQSMessage message : messages) {
+            byte[] value = message.getBody().getBytes(StandardCharsets.UTF_8);
+            String key = recordKeyExtractor.extract(null, value, message.getMessageId());
+            records.add(new ProducerRecord<String, byte[]>(topicRouter.getDefaultTopic(), key, value));
+        }
+
+        List<SQSBatchResponse.BatchItemFailure> failures = new ArrayList<>();
+        try {
+            List<Exception> errors = sendAll(records);
+            for (int i = 0; i < errors.size(); i++) {
+                if (errors.get(i) != null) {
+                    log.error(errors.get(i).getMessage(), errors.get(i));
+                    failures.add(new SQSBatchResponse.BatchItemFailure(messages.get(i).getMessageId()));
+                }
+            }
+        } catch (Exception e) {
+            log.error(e.getMessage(), e);
+            for (SQSEvent.SQSMessage message : messages) {
+                failures.add(new SQSBatchResponse.BatchItemFailure(message.getMessageId()));
+            }
+        }
+
+        log.info("Batch of {} messages was send, {} failed", messages.size(), failures.size());
+
+        return new SQSBatchResponse(failures);
+    }
+}
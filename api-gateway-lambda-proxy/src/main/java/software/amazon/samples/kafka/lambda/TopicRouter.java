@@ -0,0 +1,137 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import com.fasterxml.jackson.core.JsonProcessingException;
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
+
+import java.util.Collection;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.Map;
+
+/**
+ * Selects the Kafka topic of a request from the {@code topic} path parameter of
+ * {@code POST /topics/{topic}}, the {@code Kafka-Topic} header or the default topic, in that order.
+ * Only the topics of the allow-list generated by the stack are accepted. A topic can override the
+ * delivery mode and the record key of the handler, all topics share one producer. Configured with
+ * the environment variables:
+ * <ul>
+ *     <li>{@code topic_name} the default topic (default messages)</li>
+ *     <li>{@code topics} JSON object of the allowed topics and their settings, e.g.
+ *     {@code {"orders": {"delivery_mode": "sync", "record_key": "json:/customer/id"}}}, without it
+ *     only the default topic is allowed</li>
+ * </ul>
+ */
+public class TopicRouter {
+
+    public static final String DEFAULT_TOPIC_VARIABLE = "topic_name";
+    public static final String TOPICS_VARIABLE = "topics";
+    public static final String TOPIC_PATH_PARAMETER = "topic";
+    public static final String TOPIC_HEADER = "Kafka-Topic";
+
+    private static final ObjectMapper MAPPER = new ObjectMapper();
+
+    /**
+     * Allowed topic with the settings which override the ones of the handler, null if the topic
+     * keeps the setting of the handler.
+     */
+    public static final class Route {
+        private final String topic;
+        private final DeliveryMode deliveryMode;
+        private final RecordKeyExtractor recordKeyExtractor;
+
+        Route(String topic, DeliveryMode deliveryMode, RecordKeyExtractor recordKeyExtractor) {
+            this.topic = topic;
+            this.deliveryMode = deliveryMode;
+            this.recordKeyExtractor = recordKeyExtractor;
+        }
+
+        public String getTopic() {
+            return topic;
+        }
+
+        public DeliveryMode deliveryMode(DeliveryMode defaultDeliveryMode) {
+            return deliveryMode != null ? deliveryMode : defaultDeliveryMode;
+        }
+
+        public RecordKeyExtractor recordKeyExtractor(RecordKeyExtractor defaultRecordKeyExtractor) {
+            return recordKeyExtractor != null ? recordKeyExtractor : defaultRecordKeyExtractor;
+        }
+    }
+
+    private final String defaultTopic;
+    private final Map<String, Route> routes;
+
+    private TopicRouter(String defaultTopic, Map<String, Route> routes) {
+        this.defaultTopic = defaultTopic;
+        this.routes = routes;
+    }
+
+    public static TopicRouter fromValues(String defaultTopic, String topics) {
+        String topic = defaultTopic == null || defaultTopic.isBlank() ? AbstractKafkaProxy.TOPIC_NAME : defaultTopic.strip();
+        Map<String, Route> routes = new LinkedHashMap<>();
+        routes.put(topic, new Route(topic, null, null));
+        if (topics == null || topics.isBlank()) {
+            return new TopicRouter(topic, routes);
+        }
+
+        JsonNode settings;
+        try {
+            settings = MAPPER.readTree(topics);
+        } catch (JsonProcessingException e) {
+            throw new IllegalArgumentException("Topics must be a JSON object, got " + topics, e);
+        }
+        if (!settings.isObject()) {
+            throw new IllegalArgumentException("Topics must be a JSON object, got " + topics);
+        }
+        for (Iterator<Map.Entry<String, JsonNode>> fields = settings.fields(); fields.hasNext(); ) {
+            Map.Entry<String, JsonNode> field = fields.next();
+            JsonNode deliveryMode = field.getValue().get("delivery_mode");
+            JsonNode recordKey = field.getValue().get("record_key");
+            routes.put(field.getKey(), new Route(field.getKey(),
+                    deliveryMode == null ? null : DeliveryMode.fromValue(deliveryMode.asText()),
+                    recordKey == null ? null : RecordKeyExtractor.fromValue(recordKey.asText())));
+        }
+        return new TopicRouter(topic, routes);
+    }
+
+    public static TopicRouter fromEnvironment() {
+        return fromValues(System.getenv(DEFAULT_TOPIC_VARIABLE), System.getenv(TOPICS_VARIABLE));
+    }
+
+    public String getDefaultTopic() {
+        return defaultTopic;
+    }
+
+    public Collection<String> getTopics() {
+        return routes.keySet();
+    }
+
+    /**
+     * @param pathParameters the path parameters of the request, null if it has none
+     * @param headers        the request headers, null if it has none
+     * @return the route of the topic selected by the request
+     * @throws IllegalArgumentException if the topic is not allowed
+     */
+    public Route route(Map<String, String> pathParameters, Map<String, String> headers) {
+        String topic = pathParameters == null ? null : pathParameters.get(TOPIC_PATH_PARAMETER);
+        if (topic == null && headers != null) {
+            // API Gateway keeps the case of the header names sent by the client
+            for (Map.Entry<String, String> entry : headers.entrySet()) {
+                if (TOPIC_HEADER.equalsIgnoreCase(entry.getKey()) && entry.getValue() != null && !entry.getValue().isBlank()) {
+                    topic = entry.getValue().strip();
+                }
+            }
+        }
+        if (topic == null) {
+            return routes.get(defaultTopic);
+        }
+        Route route = routes.get(topic);
+        if (route == null) {
+            throw new IllegalArgumentException("Topic " + topic + " is not allowed");
+        }
+        return route;
+    }
+}
@@ -0,0 +1,76 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.junit.Test;
+
+import java.util.Map;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.AtomicLong;
+
+import static org.junit.Assert.assertEquals;
+
+public class BootstrapServerResolverTest {
+
+    private static final String CLUSTER_ARN = "arn:aws:kafka:eu-central-1:123456789012:cluster/demo/uuid";
+
+    private final AtomicLong now = new AtomicLong();
+    private final AtomicInteger lookups = new AtomicInteger();
+
+    private BootstrapServerResolver resolver(String clusterArn, long refreshSeconds) {
+        return new BootstrapServerResolver("b-1:9098", clusterArn, refreshSeconds,
+                arn -> "b-" + (lookups.incrementAndGet() + 1) + ":9098", now::get);
+    }
+
+    @Test
+    public void deployedBrokersAreUsedUntilTheyExpire() {
+        BootstrapServerResolver resolver = resolver(CLUSTER_ARN, 60);
+
+        assertEquals("b-1:9098", resolver.bootstrapServers());
+        assertEquals(0, lookups.get());
+
+        now.set(TimeUnit.SECONDS.toNanos(60));
+        assertEquals("b-2:9098", resolver.bootstrapServers());
+        assertEquals("b-2:9098", resolver.bootstrapServers());
+        assertEquals(1, lookups.get());
+    }
+
+    @Test
+    public void invalidatedBrokersAreReadAgain() {
+        BootstrapServerResolver resolver = resolver(CLUSTER_ARN, 0);
+
+        resolver.invalidate();
+
+        assertEquals("b-2:9098", resolver.bootstrapServers());
+        assertEquals(1, lookups.get());
+    }
+
+    @Test
+    public void failedLookupKeepsKnownBrokers() {
+        BootstrapServerResolver resolver = new BootstrapServerResolver("b-1:9098", CLUSTER_ARN, 0,
+                arn -> {
+                    throw new IllegalStateException("throttled");
+                }, now::get);
+
+        resolver.invalidate();
+
+        assertEquals("b-1:9098", resolver.bootstrapServers());
+    }
+
+    @Test
+    public void brokersWithoutClusterArnAreNeverRefreshed() {
+        BootstrapServerResolver resolver = resolver(null, 1);
+
+        resolver.invalidate();
+        now.set(TimeUnit.SECONDS.toNanos(10));
+
+        assertEquals("b-1:9098", resolver.bootstrapServers());
+        assertEquals(0, lookups.get());
+    }
+
+    @Test(expected = IllegalArgumentException.class)
+    public void negativeRefreshIntervalIsRejected() {
+        BootstrapServerResolver.fromEnvironment(Map.of(BootstrapServerResolver.REFRESH_VARIABLE, "-1"));
+    }
+}
@@ -0,0 +1,98 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.junit.Test;
+
+import java.util.List;
+import java.util.Map;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertNotSame;
+import static org.junit.Assert.assertSame;
+
+public class ClusterRouterTest {
+
+    private static final String CLUSTERS = "[{\"msk_cluster_arn\": \"arn:aws:kafka:eu-west-1:1:cluster/a/1\", \"weight\": 1},"
+            + " {\"msk_cluster_arn\": \"arn:aws:kafka:eu-west-1:1:cluster/b/2\", \"bootstrap_server\": \"b-1.b:9098\", \"weight\": 3}]";
+
+    @Test
+    public void routeUsesSingleClusterByDefault() {
+        ClusterRouter router = ClusterRouter.fromValues(null, null, Map.of());
+        KafkaProducerPropertiesFactory handlerProperties = new KafkaProducerPropertiesFactoryImpl(Map.of());
+
+        assertEquals(1, router.size());
+        assertEquals(0, router.route("customer-1"));
+        assertSame(handlerProperties, router.producerProperties(0, handlerProperties));
+    }
+
+    @Test
+    public void otherClustersGetTheirOwnBootstrapServers() {
+        ClusterRouter router = ClusterRouter.fromValues(CLUSTERS, "key", Map.of("kafka_linger_ms", "5", "bootstrap_refresh_seconds", "0"));
+        KafkaProducerPropertiesFactory handlerProperties = new KafkaProducerPropertiesFactoryImpl(Map.of());
+
+        assertSame(handlerProperties, router.producerProperties(0, handlerProperties));
+        KafkaProducerPropertiesFactory clusterProperties = router.producerProperties(1, handlerProperties);
+        assertNotSame(handlerProperties, clusterProperties);
+        assertEquals("b-1.b:9098", clusterProperties.getProducerProperties().get("bootstrap.servers"));
+        assertEquals("5", clusterProperties.getProducerProperties().get("linger.ms"));
+    }
+
+    @Test
+    public void routeSpreadsKeysByWeightAndKeepsThem() {
+        ClusterRouter router = ClusterRouter.fromValues(CLUSTERS, null, Map.of());
+
+        int[] records = new int[2];
+        for (int i = 0; i < 40000; i++) {
+            String key = "customer-" + i;
+            int cluster = router.route(key);
+            assertEquals(cluster, router.route(key));
+            records[cluster]++;
+        }
+        assertEquals(0.75, records[1] / 40000.0, 0.02);
+    }
+
+    @Test
+    public void addingClusterOnlyMovesKeysToIt() {
+        ClusterRouter before = new ClusterRouter(List.of(
+                new ClusterRouter.Cluster("a", 1, null),
+                new ClusterRouter.Cluster("b", 1, null)), ClusterRouter.Routing.KEY);
+        ClusterRouter after = new ClusterRouter(List.of(
+                new ClusterRouter.Cluster("a", 1, null),
+                new ClusterRouter.Cluster("b", 1, null),
+                new ClusterRouter.Cluster("c", 1, null)), ClusterRouter.Routing.KEY);
+
+        int moved = 0;
+        for (int i = 0; i < 30000; i++) {
+            String key = "customer-" + i;
+            if (before.route(key) != after.route(key)) {
+                assertEquals(2, after.route(key));
+                moved++;
+            }
+        }
+        assertEquals(1 / 3.0, moved / 30000.0, 0.02);
+    }
+
+    @Test
+    public void routeSkipsClustersWithoutWeight() {
+        ClusterRouter router = new ClusterRouter(List.of(
+                new ClusterRouter.Cluster("draining", 0, null),
+                new ClusterRouter.Cluster("b", 1, null)), ClusterRouter.Routing.WEIGHT);
+
+        for (int i = 0; i < 1000; i++) {
+            assertEquals(1, router.route("customer-" + i));
+            assertEquals(1, router.route(null));
+        }
+        assertEquals(2, router.size());
+    }
+
+    @Test(expected = IllegalArgumentException.class)
+    public void fromValuesRejectsUnknownRouting() {
+        ClusterRouter.fromValues(CLUSTERS, "round-robin", Map.of());
+    }
+
+    @Test(expected = IllegalArgumentException.class)
+    public void fromValuesRejectsClustersWithoutWeight() {
+        ClusterRouter.fromValues("[{\"bootstrap_server\": \"b-1.a:9098\", \"weight\": 0}]", null, Map.of());
+    }
+}
@@ -0,0 +1,87 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.junit.Test;
+
+import java.util.HashMap;
+import java.util.Map;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertFalse;
+import static org.junit.Assert.assertNotNull;
+import static org.junit.Assert.assertNull;
+
+public class IdempotencyCacheTest {
+
+    private final AtomicLong now = new AtomicLong();
+
+    @Test
+    public void keyIsReadFromHeaderIgnoringCase() {
+        IdempotencyCache cache = new IdempotencyCache("Idempotency-Key", 10, 60, null, now::get);
+
+        assertEquals("abc", cache.key(Map.of("idempotency-key", " abc ")));
+        assertNull(cache.key(Map.of("Content-Type", "application/json")));
+        assertNull(cache.key(null));
+        assertFalse(IdempotencyCache.fromValues("", null, null, null).isEnabled());
+    }
+
+    @Test(expected = IllegalArgumentException.class)
+    public void keyIsLimitedInLength() {
+        IdempotencyCache cache = new IdempotencyCache("Idempotency-Key", 10, 60, null, now::get);
+
+        cache.key(Map.of("Idempotency-Key", "k".repeat(IdempotencyCache.MAX_KEY_LENGTH + 1)));
+    }
+
+    @Test
+    public void acknowledgementsExpire() {
+        IdempotencyCache cache = new IdempotencyCache("Idempotency-Key", 10, 60, null, now::get);
+
+        cache.put("a", 2, 42);
+        IdempotencyCache.Acknowledgement acknowledgement = cache.get("a");
+        assertEquals(2, acknowledgement.getPartition());
+        assertEquals(42, acknowledgement.getOffset());
+
+        now.set(TimeUnit.SECONDS.toNanos(60));
+        assertNull(cache.get("a"));
+        assertEquals(0, cache.size());
+    }
+
+    @Test
+    public void oldestKeysAreEvicted() {
+        IdempotencyCache cache = new IdempotencyCache("Idempotency-Key", 2, 60, null, now::get);
+
+        cache.put("a", 0, 1);
+        cache.put("b", 0, 2);
+        cache.put("c", 0, 3);
+
+        assertEquals(2, cache.size());
+        assertNull(cache.get("a"));
+        assertNotNull(cache.get("c"));
+    }
+
+    @Test
+    public void sharedStoreIsReadOnMiss() {
+        Map<String, IdempotencyCache.Acknowledgement> shared = new HashMap<>();
+        IdempotencyCache.SharedStore store = new IdempotencyCache.SharedStore() {
+            @Override
+            public IdempotencyCache.Acknowledgement get(String key, long nowSeconds) {
+                return shared.get(key);
+            }
+
+            @Override
+            public void put(String key, IdempotencyCache.Acknowledgement acknowledgement, long expiresAtSeconds) {
+                shared.put(key, acknowledgement);
+            }
+        };
+        IdempotencyCache writer = new IdempotencyCache("Idempotency-Key", 10, 60, store, now::get);
+        IdempotencyCache reader = new IdempotencyCache("Idempotency-Key", 10, 60, store, now::get);
+
+        writer.put("a", 1, 7);
+
+        assertEquals(7, reader.get("a").getOffset());
+        assertEquals(1, reader.size());
+    }
+}
@@ -0,0 +1,31 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.junit.Test;
+
+import java.util.Map;
+import java.util.Properties;
+
+import static org.junit.Assert.assertEquals;
+
+public class KafkaProducerPropertiesFactoryImplTest {
+
+    @Test
+    public void getProducerPropertiesAppliesEnvironmentOverrides() {
+        Map<String, String> environment = Map.of(
+                "bootstrap_server", "localhost:9098",
+                "kafka_linger_ms", "5",
+                "kafka_max_in_flight_requests_per_connection", "1",
+                "kafka_connections_max_idle_ms", "300000"
+        );
+
+        Properties properties = new KafkaProducerPropertiesFactoryImpl(environment).getProducerProperties();
+
+        assertEquals("localhost:9098", properties.get("bootstrap.servers"));
+        assertEquals("5", properties.get("linger.ms"));
+        assertEquals("1", properties.get("max.in.flight.requests.per.connection"));
+        assertEquals("300000", properties.get("connections.max.idle.ms"));
+        assertEquals("SASL_SSL", properties.get("security.protocol"));
+    }
+}
@@ -0,0 +1,51 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.apache.kafka.clients.producer.Producer;
+import org.junit.Test;
+
+import java.util.List;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertFalse;
+import static org.mockito.Mockito.mock;
+import static org.mockito.Mockito.times;
+import static org.mockito.Mockito.verify;
+
+public class ProducerClientMetricsTest {
+
+    @Test
+    public void disabledByDefault() {
+        assertFalse(ProducerClientMetrics.fromValues(null, null).isEnabled());
+        assertFalse(ProducerClientMetrics.fromValues("none", null).isEnabled());
+    }
+
+    @Test
+    public void fromValuesSelectsMetrics() {
+        assertEquals(ProducerClientMetrics.DEFAULT_METRICS, ProducerClientMetrics.fromValues("default", "0").getMetricNames());
+        assertEquals(List.of("batch-size-avg", "record-send-rate"),
+                ProducerClientMetrics.fromValues("batch-size-avg, record-send-rate,", null).getMetricNames());
+    }
+
+    @Test(expected = IllegalArgumentException.class)
+    public void fromValuesRejectsNegativeInterval() {
+        ProducerClientMetrics.fromValues("default", "-1");
+    }
+
+    @Test
+    public void publishSamplesEveryProducer() {
+        ProducerClientMetrics clientMetrics = ProducerClientMetrics.fromValues("default", "60");
+        Producer<?, ?> first = mock(Producer.class);
+        Producer<?, ?> second = mock(Producer.class);
+
+        clientMetrics.publish(first);
+        clientMetrics.publish(second);
+        clientMetrics.publish(first);
+        clientMetrics.publish(second);
+
+        // the second producer is sampled within the interval of the first, each only once
+        verify(first, times(1)).metrics();
+        verify(second, times(1)).metrics();
+    }
+}
@@ -0,0 +1,25 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.apache.kafka.common.metrics.Measurable;
+import org.apache.kafka.common.metrics.Metrics;
+import org.junit.Test;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertTrue;
+
+public class ProducerMetricsTest {
+
+    @Test
+    public void metricValueReadsProducerMetricsGroup() {
+        Metrics metrics = new Metrics();
+        metrics.addMetric(metrics.metricName("buffer-total-bytes", "producer-metrics"), (Measurable) (config, now) -> 1024);
+        metrics.addMetric(metrics.metricName("buffer-total-bytes", "other-metrics"), (Measurable) (config, now) -> 1);
+
+        assertEquals(1024, ProducerMetrics.metricValue(metrics.metrics(), "buffer-total-bytes"), 0);
+        assertTrue(Double.isNaN(ProducerMetrics.metricValue(metrics.metrics(), "record-retry-total")));
+
+        metrics.close();
+    }
+}
@@ -0,0 +1,279 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import com.amazonaws.services.lambda.runtime.Context;
+import com.amazonaws.services.lambda.runtime.events.APIGatewayProxyRequestEvent;
+import com.amazonaws.services.lambda.runtime.events.APIGatewayProxyResponseEvent;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.fasterxml.jackson.databind.node.ArrayNode;
+import com.fasterxml.jackson.databind.node.ObjectNode;
+import org.junit.After;
+import org.junit.Before;
+import org.junit.Rule;
+import org.junit.Test;
+import org.junit.rules.TemporaryFolder;
+
+import java.io.File;
+import java.lang.management.ManagementFactory;
+import java.time.Instant;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Collections;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.Properties;
+import java.util.concurrent.Callable;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+
+import static org.mockito.Mockito.mock;
+import static org.mockito.Mockito.when;
+
+/**
+ * Offline throughput benchmark of {@link SimpleApiGatewayKafkaProxy} against an embedded broker.
+ * <p>
+ * Sweeps payload size, concurrency and producer configuration and writes throughput, latency
+ * percentiles and allocated bytes per request as JSON, so results can be diffed between commits.
+ * Every concurrent worker owns its own handler and producer like a Lambda execution environment.
+ * <pre>
+ * mvn -Pbenchmark test -Dbenchmark.payloadSizes=100,10240 -Dbenchmark.concurrency=1,8 \
+ *     -Dbenchmark.configs="default|lz4:compression.type=lz4;linger.ms=5"
+ * </pre>
+ * The key delivery.mode of a configuration selects the {@link DeliveryMode} of the handler.
+ * {@code -Dbenchmark.jvmOptions} sets the JAVA_TOOL_OPTIONS of the benchmark JVM, e.g. to the options
+ * of a JVM profile of the producer stack, {@code -Dbenchmark.jvmProfile} names them in the results.
+ */
+public class ProxyBenchmark {
+
+    private static final ObjectMapper MAPPER = new ObjectMapper();
+
+    private static final String DELIVERY_MODE = "delivery.mode";
+
+    private KafkaLocalServer server;
+
+    @Rule
+    public TemporaryFolder folder = new TemporaryFolder();
+
+    @Before
+    public void setup() throws Exception {
+        server = new KafkaLocalServer(folder.newFolder(), 2181);
+        server.start();
+    }
+
+    @After
+    public void teardown() throws Exception {
+        server.stop();
+    }
+
+    @Test
+    public void run() throws Exception {
+        List<Integer> payloadSizes = intList(System.getProperty("benchmark.payloadSizes", "100,1024,10240"));
+        List<Integer> concurrencies = intList(System.getProperty("benchmark.concurrency", "1,4,16"));
+        Map<String, Map<String, String>> configs = parseConfigs(System.getProperty("benchmark.configs",
+                "default|linger5:linger.ms=5;batch.size=65536|ack-on-send:delivery.mode=ack-on-send;linger.ms=5"));
+        int requests = Integer.parseInt(System.getProperty("benchmark.requests", "2000"));
+        int warmupRequests = Integer.parseInt(System.getProperty("benchmark.warmupRequests", "200"));
+        File output = new File(System.getProperty("benchmark.output", "target/benchmark/results.json"));
+
+        // the first request of the JVM loads the classes and runs interpreted, like on a cold start
+        double coldRequestMs = coldRequest();
+
+        ArrayNode results = MAPPER.createArrayNode();
+        for (Map.Entry<String, Map<String, String>> config : configs.entrySet()) {
+            for (int payloadSize : payloadSizes) {
+                for (int concurrency : concurrencies) {
+                    ObjectNode result = runScenario(config.getValue(), payloadSize, concurrency, requests, warmupRequests);
+                    result.put("config", config.getKey());
+                    results.add(result);
+                    System.out.println(MAPPER.writeValueAsString(result));
+                }
+            }
+        }
+
+        ObjectNode report = MAPPER.createObjectNode()
+                .put("label", System.getProperty("benchmark.label", ""))
+                .put("jvmProfile", System.getProperty("benchmark.jvmProfile", ""))
+                .put("timestamp", Instant.now().toString())
+                .put("javaVersion", System.getProperty("java.version"));
+        report.put("coldRequestMs", coldRequestMs);
+        report.putPOJO("jvmArguments", ManagementFactory.getRuntimeMXBean().getInputArguments());
+        report.set("results", results);
+
+        output.getParentFile().mkdirs();
+        MAPPER.writerWithDefaultPrettyPrinter().writeValue(output, report);
+        System.out.println("Benchmark results written to " + output.getAbsolutePath());
+    }
+
+    private double coldRequest() throws Exception {
+        SimpleApiGatewayKafkaProxy proxy = new SimpleApiGatewayKafkaProxy();
+        Properties properties = producerProps(Collections.emptyMap());
+        proxy.kafkaProducerProperties = () -> properties;
+        try {
+            WorkerResult result = worker(proxy, payload(100), 1).call();
+            return result.latenciesNanos.get(0) / 1e6;
+        } finally {
+            proxy.closeProducer();
+        }
+    }
+
+    private ObjectNode runScenario(Map<String, String> config, int payloadSize, int concurrency,
+                                   int requests, int warmupRequests) throws Exception {
+        String payload = payload(payloadSize);
+        int requestsPerWorker = Math.max(1, requests / concurrency);
+
+        List<SimpleApiGatewayKafkaProxy> proxies = new ArrayList<>();
+        for (int i = 0; i < concurrency; i++) {
+            SimpleApiGatewayKafkaProxy proxy = new SimpleApiGatewayKafkaProxy();
+            Properties properties = producerProps(config);
+            proxy.kafkaProducerProperties = () -> properties;
+            if (config.containsKey(DELIVERY_MODE)) {
+                proxy.deliveryMode = DeliveryMode.fromValue(config.get(DELIVERY_MODE));
+            }
+            proxies.add(proxy);
+        }
+
+        ExecutorService executor = Executors.newFixedThreadPool(concurrency);
+        try {
+            runWorkers(executor, proxies, payload, warmupRequests);
+
+            long start = System.nanoTime();
+            List<WorkerResult> workerResults = runWorkers(executor, proxies, payload, requestsPerWorker);
+            double elapsedSeconds = (System.nanoTime() - start) / 1e9;
+
+            List<Long> latencies = new ArrayList<>();
+            long allocatedBytes = 0;
+            int errors = 0;
+            for (WorkerResult workerResult : workerResults) {
+                latencies.addAll(workerResult.latenciesNanos);
+                allocatedBytes += workerResult.allocatedBytes;
+                errors += workerResult.errors;
+            }
+            Collections.sort(latencies);
+
+            ObjectNode result = MAPPER.createObjectNode()
+                    .put("payloadBytes", payloadSize)
+                    .put("concurrency", concurrency)
+                    .put("requests", latencies.size())
+                    .put("errors", errors)
+                    .put("throughputPerSecond", latencies.size() / elapsedSeconds)
+                    .put("latencyMsP50", percentile(latencies, 50))
+                    .put("latencyMsP95", percentile(latencies, 95))
+                    .put("latencyMsP99", percentile(latencies, 99))
+                    .put("latencyMsMax", latencies.get(latencies.size() - 1) / 1e6)
+                    .put("allocatedBytesPerRequest", allocatedBytes / latencies.size());
+            result.putPOJO("producerConfig", config);
+            return result;
+        } finally {
+            executor.shutdownNow();
+            for (SimpleApiGatewayKafkaProxy proxy : proxies) {
+                proxy.closeProducer();
+            }
+        }
+    }
+
+    private List<WorkerResult> runWorkers(ExecutorService executor, List<SimpleApiGatewayKafkaProxy> proxies,
+                                          String payload, int requestsPerWorker) throws Exception {
+        List<Future<WorkerResult>> futures = new ArrayList<>();
+        for (SimpleApiGatewayKafkaProxy proxy : proxies) {
+            futures.add(executor.submit(worker(proxy, payload, requestsPerWorker)));
+        }
+        List<WorkerResult> results = new ArrayList<>();
+        for (Future<WorkerResult> future : futures) {
+            results.add(future.get());
+        }
+        return results;
+    }
+
+    private Callable<WorkerResult> worker(SimpleApiGatewayKafkaProxy proxy, String payload, int requests) {
+        return () -> {
+            Context context = mock(Context.class);
+            when(context.getAwsRequestId()).thenReturn("benchmark");
+
+            com.sun.management.ThreadMXBean threadMXBean = (com.sun.management.ThreadMXBean) ManagementFactory.getThreadMXBean();
+            long threadId = Thread.currentThread().getId();
+
+            WorkerResult result = new WorkerResult(requests);
+            long allocatedBefore = threadMXBean.getThreadAllocatedBytes(threadId);
+            for (int i = 0; i < requests; i++) {
+                APIGatewayProxyRequestEvent event = new APIGatewayProxyRequestEvent()
+                        .withResource("/")
+                        .withBody(payload)
+                        .withIsBase64Encoded(false);
+
+                long start = System.nanoTime();
+                APIGatewayProxyResponseEvent response = proxy.handleRequest(event, context);
+                result.latenciesNanos.add(System.nanoTime() - start);
+
+                if (response.getStatusCode() >= 300) {
+                    result.errors++;
+                }
+            }
+            result.allocatedBytes = threadMXBean.getThreadAllocatedBytes(threadId) - allocatedBefore;
+            return result;
+        };
+    }
+
+    private Properties producerProps(Map<String, String> config) {
+        Properties props = new Properties();
+        props.put("bootstrap.servers", server.getZookeeperConnectionString());
+        props.put("key.serializer", "org.apache.kafka.common.serialization.StringSerializer");
+        props.put("value.serializer", "org.apache.kafka.common.serialization.ByteArraySerializer");
+        for (Map.Entry<String, String> entry : config.entrySet()) {
+            if (!DELIVERY_MODE.equals(entry.getKey())) {
+                props.put(entry.getKey(), entry.getValue());
+            }
+        }
+        return props;
+    }
+
+    private static String payload(int size) {
+        char[] characters = new char[size];
+        Arrays.fill(characters, 'x');
+        return new String(characters);
+    }
+
+    private static double percentile(List<Long> sortedNanos, int percent) {
+        int index = (int) Math.ceil(percent / 100.0 * sortedNanos.size()) - 1;
+        return sortedNanos.get(Math.max(0, index)) / 1e6;
+    }
+
+    private static List<Integer> intList(String value) {
+        List<Integer> values = new ArrayList<>();
+        for (String element : value.split(",")) {
+            values.add(Integer.parseInt(element.trim()));
+        }
+        return values;
+    }
+
+    /**
+     * Parses name:key=value;key=value configurations separated by '|'.
+     */
+    private static Map<String, Map<String, String>> parseConfigs(String value) {
+        Map<String, Map<String, String>> configs = new LinkedHashMap<>();
+        for (String config : value.split("\\|")) {
+            String[] nameAndProperties = config.split(":", 2);
+            Map<String, String> properties = new LinkedHashMap<>();
+            if (nameAndProperties.length > 1) {
+                for (String property : nameAndProperties[1].split(";")) {
+                    String[] keyValue = property.split("=", 2);
+                    properties.put(keyValue[0].trim(), keyValue[1].trim());
+                }
+            }
+            configs.put(nameAndProperties[0].trim(), properties);
+        }
+        return configs;
+    }
+
+    private static class WorkerResult {
+        final List<Long> latenciesNanos;
+        long allocatedBytes;
+        int errors;
+
+        WorkerResult(int requests) {
+            latenciesNanos = new ArrayList<>(requests);
+        }
+    }
+}
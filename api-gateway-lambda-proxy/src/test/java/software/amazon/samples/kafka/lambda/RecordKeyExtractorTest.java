@@ -0,0 +1,54 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.junit.Test;
+
+import java.nio.charset.StandardCharsets;
+import java.util.Map;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertNotEquals;
+
+public class RecordKeyExtractorTest {
+
+    @Test
+    public void extractUsesFallbackByDefault() {
+        assertEquals("request", RecordKeyExtractor.fromValue(null).extract(Map.of("key", "value"), bytes("{}"), "request"));
+    }
+
+    @Test
+    public void extractReadsHeaderIgnoringCase() {
+        RecordKeyExtractor extractor = RecordKeyExtractor.fromValue("header:X-Partition-Key");
+
+        assertEquals("customer-1", extractor.extract(Map.of("x-partition-key", "customer-1"), bytes("{}"), "request"));
+        assertEquals("request", extractor.extract(Map.of(), bytes("{}"), "request"));
+        assertEquals("request", extractor.extract(null, bytes("{}"), "request"));
+    }
+
+    @Test
+    public void extractReadsJsonPointer() {
+        RecordKeyExtractor extractor = RecordKeyExtractor.fromValue("json:/customer/id");
+
+        assertEquals("42", extractor.extract(null, bytes("{\"customer\":{\"id\":42}}"), "request"));
+        assertEquals("request", extractor.extract(null, bytes("{\"customer\":{}}"), "request"));
+        assertEquals("request", extractor.extract(null, bytes("plain text"), "request"));
+    }
+
+    @Test
+    public void extractHashesMessage() {
+        RecordKeyExtractor extractor = RecordKeyExtractor.fromValue("hash");
+
+        assertEquals(extractor.extract(null, bytes("message"), "a"), extractor.extract(null, bytes("message"), "b"));
+        assertNotEquals(extractor.extract(null, bytes("message"), "a"), extractor.extract(null, bytes("other message"), "a"));
+    }
+
+    @Test(expected = IllegalArgumentException.class)
+    public void fromValueRejectsUnknownSource() {
+        RecordKeyExtractor.fromValue("cookie:session");
+    }
+
+    private static byte[] bytes(String message) {
+        return message.getBytes(StandardCharsets.UTF_8);
+    }
+}
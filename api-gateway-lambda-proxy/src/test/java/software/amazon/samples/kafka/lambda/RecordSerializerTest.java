@@ -0,0 +1,142 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import com.google.protobuf.DescriptorProtos;
+import com.google.protobuf.DescriptorProtos.FieldDescriptorProto;
+import org.apache.avro.Schema;
+import org.apache.avro.generic.GenericDatumReader;
+import org.apache.avro.generic.GenericRecord;
+import org.apache.avro.io.DecoderFactory;
+import org.junit.Rule;
+import org.junit.Test;
+import org.junit.rules.TemporaryFolder;
+
+import java.io.File;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.util.Map;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertFalse;
+import static org.junit.Assert.assertTrue;
+
+public class RecordSerializerTest {
+
+    private static final String ORDER_SCHEMA = "{\"type\":\"record\",\"name\":\"Order\",\"fields\":["
+            + "{\"name\":\"id\",\"type\":\"string\"},{\"name\":\"amount\",\"type\":\"long\"}]}";
+
+    @Rule
+    public TemporaryFolder folder = new TemporaryFolder();
+
+    @Test
+    public void serializeWritesAvroBinary() throws Exception {
+        File schemas = folder.newFolder();
+        Files.writeString(schemas.toPath().resolve("order.avsc"), ORDER_SCHEMA);
+        RecordSerializer serializer = RecordSerializer.fromValues("avro", schemas.getPath(), "order", null);
+
+        byte[] message = bytes("{\"id\":\"order-1\",\"amount\":42}");
+        byte[] value = serializer.serialize("order", message);
+
+        Schema schema = new Schema.Parser().parse(ORDER_SCHEMA);
+        GenericRecord record = new GenericDatumReader<GenericRecord>(schema).read(null, DecoderFactory.get().binaryDecoder(value, null));
+        assertEquals("order-1", record.get("id").toString());
+        assertEquals(42L, record.get("amount"));
+        assertTrue(value.length < message.length);
+    }
+
+    @Test(expected = IllegalArgumentException.class)
+    public void serializeRejectsMessageNotMatchingSchema() throws Exception {
+        File schemas = folder.newFolder();
+        Files.writeString(schemas.toPath().resolve("order.avsc"), ORDER_SCHEMA);
+        RecordSerializer serializer = RecordSerializer.fromValues("avro", schemas.getPath(), "order", null);
+
+        serializer.serialize("order", bytes("{\"id\":\"order-1\",\"amount\":\"many\"}"));
+    }
+
+    @Test(expected = IllegalArgumentException.class)
+    public void serializeRejectsUnknownSchema() throws Exception {
+        RecordSerializer serializer = RecordSerializer.fromValues("avro", folder.newFolder().getPath(), null, null);
+
+        serializer.serialize("missing", bytes("{}"));
+    }
+
+    @Test(expected = IllegalStateException.class)
+    public void serializeFailsOnMalformedSchema() throws Exception {
+        File schemas = folder.newFolder();
+        Files.writeString(schemas.toPath().resolve("order.avsc"), "{\"type\":\"record\",\"name\":\"Order\"");
+        RecordSerializer serializer = RecordSerializer.fromValues("avro", schemas.getPath(), null, null);
+
+        serializer.serialize("order", bytes("{}"));
+    }
+
+    @Test(expected = IllegalStateException.class)
+    public void preloadFailsOnMalformedDescriptorSet() throws Exception {
+        File schemas = folder.newFolder();
+        Files.write(schemas.toPath().resolve("example.Order.desc"), new byte[]{(byte) 0xff, 0x01});
+        RecordSerializer serializer = RecordSerializer.fromValues("protobuf", schemas.getPath(), "example.Order", null);
+
+        serializer.preload();
+    }
+
+    @Test
+    public void serializeWritesProtobufBinary() throws Exception {
+        DescriptorProtos.FileDescriptorProto file = DescriptorProtos.FileDescriptorProto.newBuilder()
+                .setName("order.proto")
+                .setPackage("example")
+                .setSyntax("proto3")
+                .addMessageType(DescriptorProtos.DescriptorProto.newBuilder()
+                        .setName("Order")
+                        .addField(FieldDescriptorProto.newBuilder().setName("id").setNumber(1)
+                                .setType(FieldDescriptorProto.Type.TYPE_STRING))
+                        .addField(FieldDescriptorProto.newBuilder().setName("amount").setNumber(2)
+                                .setType(FieldDescriptorProto.Type.TYPE_INT64)))
+                .build();
+        File schemas = folder.newFolder();
+        Files.write(schemas.toPath().resolve("example.Order.desc"),
+                DescriptorProtos.FileDescriptorSet.newBuilder().addFile(file).build().toByteArray());
+        RecordSerializer serializer = RecordSerializer.fromValues("protobuf", schemas.getPath(), null, null);
+
+        byte[] value = serializer.serialize("example.Order", bytes("{\"id\":\"order-1\",\"amount\":42}"));
+
+        // field 1 length delimited "order-1", field 2 varint 42
+        assertEquals(11, value.length);
+    }
+
+    @Test
+    public void schemaCacheIsBounded() throws Exception {
+        File schemas = folder.newFolder();
+        for (String name : new String[]{"a", "b", "c"}) {
+            Files.writeString(schemas.toPath().resolve(name + ".avsc"), "\"string\"");
+        }
+        RecordSerializer serializer = RecordSerializer.fromValues("avro", schemas.getPath(), null, "2");
+
+        for (String name : new String[]{"a", "b", "c", "a"}) {
+            serializer.serialize(name, bytes("\"text\""));
+        }
+
+        assertEquals(2, serializer.cachedSchemas());
+    }
+
+    @Test
+    public void schemaNamePrefersHeader() {
+        RecordSerializer serializer = RecordSerializer.fromValues("avro", "/opt", "order", null);
+
+        assertEquals("payment", serializer.schemaName(Map.of("x-schema-name", "payment")));
+        assertEquals("order", serializer.schemaName(null));
+    }
+
+    @Test
+    public void disabledByDefault() {
+        assertFalse(RecordSerializer.fromValues(null, null, null, null).isEnabled());
+    }
+
+    @Test(expected = IllegalArgumentException.class)
+    public void fromValuesRequiresSchemaDirectory() {
+        RecordSerializer.fromValues("avro", null, "order", null);
+    }
+
+    private static byte[] bytes(String message) {
+        return message.getBytes(StandardCharsets.UTF_8);
+    }
+}
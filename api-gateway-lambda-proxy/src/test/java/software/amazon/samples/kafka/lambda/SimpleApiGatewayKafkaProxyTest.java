@@ -4,6 +4,7 @@ package software.amazon.samples.kafka.lambda;
 
 import com.amazonaws.services.lambda.runtime.Context;
 import com.amazonaws.services.lambda.runtime.events.APIGatewayProxyRequestEvent;
+import com.amazonaws.services.lambda.runtime.events.APIGatewayProxyResponseEvent;
 import com.amazonaws.services.lambda.runtime.tests.EventLoader;
 import org.apache.kafka.clients.consumer.ConsumerRecords;
 import org.apache.kafka.clients.consumer.KafkaConsumer;
@@ -18,9 +19,14 @@ import org.mockito.junit.MockitoJUnitRunner;
 
 import java.time.Duration;
 import java.util.Arrays;
+import java.util.Base64;
+import java.util.Map;
 import java.util.Properties;
 
+import static org.junit.Assert.assertArrayEquals;
 import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertNull;
+import static org.junit.Assert.assertTrue;
 import static org.mockito.Mockito.when;
 
 
@@ -73,6 +79,218 @@ public class SimpleApiGatewayKafkaProxyTest {
         assertEquals (record.count() ,1);
     }
 
+    @Test
+    public void handleBatchRequest() {
+
+        when(contextMock.getAwsRequestId()).thenReturn("1");
+        when(kafkaProducerPropertiesFactoryMock.getProducerProperties()).thenReturn(producerProps());
+
+        SimpleApiGatewayKafkaProxy simpleApiGatewayKafkaProxy= new SimpleApiGatewayKafkaProxy();
+        simpleApiGatewayKafkaProxy.kafkaProducerProperties = kafkaProducerPropertiesFactoryMock;
+
+        APIGatewayProxyRequestEvent event = EventLoader.loadApiGatewayRestEvent("src/test/resources/test_batch_event.json");
+
+        APIGatewayProxyResponseEvent response = simpleApiGatewayKafkaProxy.handleRequest(event, contextMock);
+        assertEquals(200, (int) response.getStatusCode());
+
+        KafkaConsumer<String, String> consumer = new KafkaConsumer<>(consumerProperties());
+        consumer.subscribe(Arrays.asList(SimpleApiGatewayKafkaProxy.TOPIC_NAME));
+        ConsumerRecords<String, String> record = consumer.poll(Duration.ofSeconds(5));
+
+        assertEquals(3, record.count());
+    }
+
+    @Test
+    public void rejectsBatchWithContentAfterArray() {
+
+        SimpleApiGatewayKafkaProxy simpleApiGatewayKafkaProxy= new SimpleApiGatewayKafkaProxy();
+        simpleApiGatewayKafkaProxy.kafkaProducerProperties = kafkaProducerPropertiesFactoryMock;
+
+        // newline delimited records whose first record is an array
+        APIGatewayProxyRequestEvent event = new APIGatewayProxyRequestEvent()
+                .withResource(SimpleApiGatewayKafkaProxy.BATCH_RESOURCE)
+                .withHeaders(Map.of("Content-Type", "application/json"))
+                .withBody("[\"a\"]\n{\"b\":1}\n")
+                .withIsBase64Encoded(false);
+
+        assertEquals(400, (int) simpleApiGatewayKafkaProxy.handleRequest(event, contextMock).getStatusCode());
+    }
+
+    @Test
+    public void handleBinaryRequest() {
+
+        when(contextMock.getAwsRequestId()).thenReturn("1");
+        when(kafkaProducerPropertiesFactoryMock.getProducerProperties()).thenReturn(producerProps());
+
+        SimpleApiGatewayKafkaProxy simpleApiGatewayKafkaProxy= new SimpleApiGatewayKafkaProxy();
+        simpleApiGatewayKafkaProxy.kafkaProducerProperties = kafkaProducerPropertiesFactoryMock;
+
+        byte[] payload = new byte[]{0, (byte) 0xff, (byte) 0xc3, 0x28, 10, 13};
+        APIGatewayProxyRequestEvent event = new APIGatewayProxyRequestEvent()
+                .withResource("/")
+                .withBody(Base64.getEncoder().encodeToString(payload))
+                .withIsBase64Encoded(true);
+
+        APIGatewayProxyResponseEvent response = simpleApiGatewayKafkaProxy.handleRequest(event, contextMock);
+        assertEquals(200, (int) response.getStatusCode());
+
+        Properties consumerProps = consumerProperties();
+        consumerProps.put("value.deserializer", "org.apache.kafka.common.serialization.ByteArrayDeserializer");
+        KafkaConsumer<String, byte[]> consumer = new KafkaConsumer<>(consumerProps);
+        consumer.subscribe(Arrays.asList(SimpleApiGatewayKafkaProxy.TOPIC_NAME));
+        ConsumerRecords<String, byte[]> records = consumer.poll(Duration.ofSeconds(5));
+
+        assertEquals(1, records.count());
+        assertArrayEquals(payload, records.iterator().next().value());
+    }
+
+    @Test
+    public void retriedRequestIsWrittenOnce() {
+
+        when(contextMock.getAwsRequestId()).thenReturn("1");
+        when(kafkaProducerPropertiesFactoryMock.getProducerProperties()).thenReturn(producerProps());
+
+        SimpleApiGatewayKafkaProxy simpleApiGatewayKafkaProxy= new SimpleApiGatewayKafkaProxy();
+        simpleApiGatewayKafkaProxy.kafkaProducerProperties = kafkaProducerPropertiesFactoryMock;
+        simpleApiGatewayKafkaProxy.idempotencyCache = IdempotencyCache.fromValues(null, null, null, null);
+
+        APIGatewayProxyRequestEvent event = new APIGatewayProxyRequestEvent()
+                .withResource("/")
+                .withHeaders(Map.of("Content-Type", "application/json", "Idempotency-Key", "order-42"))
+                .withBody("{\"order\":42}")
+                .withIsBase64Encoded(false);
+
+        assertEquals(200, (int) simpleApiGatewayKafkaProxy.handleRequest(event, contextMock).getStatusCode());
+        APIGatewayProxyResponseEvent retry = simpleApiGatewayKafkaProxy.handleRequest(event, contextMock);
+        assertEquals(200, (int) retry.getStatusCode());
+        assertEquals("true", retry.getHeaders().get(IdempotencyCache.REPLAYED_HEADER));
+
+        KafkaConsumer<String, String> consumer = new KafkaConsumer<>(consumerProperties());
+        consumer.subscribe(Arrays.asList(SimpleApiGatewayKafkaProxy.TOPIC_NAME));
+        ConsumerRecords<String, String> records = consumer.poll(Duration.ofSeconds(5));
+
+        assertEquals(1, records.count());
+        assertEquals("order-42", records.iterator().next().key());
+    }
+
+    @Test
+    public void sameIdempotencyKeyOnAnotherTopicIsWritten() {
+
+        when(contextMock.getAwsRequestId()).thenReturn("1");
+        when(kafkaProducerPropertiesFactoryMock.getProducerProperties()).thenReturn(producerProps());
+
+        SimpleApiGatewayKafkaProxy simpleApiGatewayKafkaProxy= new SimpleApiGatewayKafkaProxy();
+        simpleApiGatewayKafkaProxy.kafkaProducerProperties = kafkaProducerPropertiesFactoryMock;
+        simpleApiGatewayKafkaProxy.idempotencyCache = IdempotencyCache.fromValues(null, null, null, null);
+        simpleApiGatewayKafkaProxy.topicRouter = TopicRouter.fromValues(null, "{\"orders\": {}}");
+
+        APIGatewayProxyRequestEvent event = new APIGatewayProxyRequestEvent()
+                .withResource("/")
+                .withHeaders(Map.of("Content-Type", "application/json", "Idempotency-Key", "order-42"))
+                .withBody("{\"order\":42}")
+                .withIsBase64Encoded(false);
+        assertEquals(200, (int) simpleApiGatewayKafkaProxy.handleRequest(event, contextMock).getStatusCode());
+
+        event.setResource("/topics/{topic}");
+        event.setPathParameters(Map.of("topic", "orders"));
+        APIGatewayProxyResponseEvent response = simpleApiGatewayKafkaProxy.handleRequest(event, contextMock);
+        assertEquals(200, (int) response.getStatusCode());
+        assertNull(response.getHeaders().get(IdempotencyCache.REPLAYED_HEADER));
+
+        KafkaConsumer<String, String> consumer = new KafkaConsumer<>(consumerProperties());
+        consumer.subscribe(Arrays.asList("orders"));
+        ConsumerRecords<String, String> records = consumer.poll(Duration.ofSeconds(5));
+
+        assertEquals(1, records.count());
+    }
+
+    @Test
+    public void batchIdempotencyKeysDoNotCollideWithRequests() {
+
+        when(contextMock.getAwsRequestId()).thenReturn("1");
+        when(kafkaProducerPropertiesFactoryMock.getProducerProperties()).thenReturn(producerProps());
+
+        SimpleApiGatewayKafkaProxy simpleApiGatewayKafkaProxy= new SimpleApiGatewayKafkaProxy();
+        simpleApiGatewayKafkaProxy.kafkaProducerProperties = kafkaProducerPropertiesFactoryMock;
+        simpleApiGatewayKafkaProxy.idempotencyCache = IdempotencyCache.fromValues(null, null, null, null);
+
+        APIGatewayProxyRequestEvent batch = new APIGatewayProxyRequestEvent()
+                .withResource(SimpleApiGatewayKafkaProxy.BATCH_RESOURCE)
+                .withHeaders(Map.of("Content-Type", "application/json", "Idempotency-Key", "order"))
+                .withBody("[{\"order\":1},{\"order\":2}]")
+                .withIsBase64Encoded(false);
+        assertEquals(200, (int) simpleApiGatewayKafkaProxy.handleRequest(batch, contextMock).getStatusCode());
+
+        // the key of the first record of the batch is also order-0
+        APIGatewayProxyRequestEvent event = new APIGatewayProxyRequestEvent()
+                .withResource("/")
+                .withHeaders(Map.of("Content-Type", "application/json", "Idempotency-Key", "order-0"))
+                .withBody("{\"order\":3}")
+                .withIsBase64Encoded(false);
+        APIGatewayProxyResponseEvent response = simpleApiGatewayKafkaProxy.handleRequest(event, contextMock);
+        assertEquals(200, (int) response.getStatusCode());
+        assertNull(response.getHeaders().get(IdempotencyCache.REPLAYED_HEADER));
+
+        KafkaConsumer<String, String> consumer = new KafkaConsumer<>(consumerProperties());
+        consumer.subscribe(Arrays.asList(SimpleApiGatewayKafkaProxy.TOPIC_NAME));
+        ConsumerRecords<String, String> records = consumer.poll(Duration.ofSeconds(5));
+
+        assertEquals(3, records.count());
+    }
+
+    @Test
+    public void routesRequestToTopicOfPath() {
+
+        when(contextMock.getAwsRequestId()).thenReturn("1");
+        when(kafkaProducerPropertiesFactoryMock.getProducerProperties()).thenReturn(producerProps());
+
+        SimpleApiGatewayKafkaProxy simpleApiGatewayKafkaProxy= new SimpleApiGatewayKafkaProxy();
+        simpleApiGatewayKafkaProxy.kafkaProducerProperties = kafkaProducerPropertiesFactoryMock;
+        simpleApiGatewayKafkaProxy.topicRouter = TopicRouter.fromValues(null, "{\"orders\": {\"record_key\": \"json:/customer\"}}");
+
+        APIGatewayProxyRequestEvent event = new APIGatewayProxyRequestEvent()
+                .withResource("/topics/{topic}")
+                .withPathParameters(Map.of("topic", "orders"))
+                .withHeaders(Map.of("Content-Type", "application/json"))
+                .withBody("{\"customer\":\"c-7\"}")
+                .withIsBase64Encoded(false);
+        assertEquals(200, (int) simpleApiGatewayKafkaProxy.handleRequest(event, contextMock).getStatusCode());
+
+        event.setPathParameters(Map.of("topic", "payments"));
+        assertEquals(400, (int) simpleApiGatewayKafkaProxy.handleRequest(event, contextMock).getStatusCode());
+
+        KafkaConsumer<String, String> consumer = new KafkaConsumer<>(consumerProperties());
+        consumer.subscribe(Arrays.asList("orders"));
+        ConsumerRecords<String, String> records = consumer.poll(Duration.ofSeconds(5));
+
+        assertEquals(1, records.count());
+        assertEquals("c-7", records.iterator().next().key());
+    }
+
+    @Test
+    public void reusesConnectionsAcrossRequests() {
+
+        when(contextMock.getAwsRequestId()).thenReturn("1");
+        when(kafkaProducerPropertiesFactoryMock.getProducerProperties()).thenReturn(producerProps());
+
+        SimpleApiGatewayKafkaProxy simpleApiGatewayKafkaProxy= new SimpleApiGatewayKafkaProxy();
+        simpleApiGatewayKafkaProxy.kafkaProducerProperties = kafkaProducerPropertiesFactoryMock;
+
+        APIGatewayProxyRequestEvent event = EventLoader.loadApiGatewayRestEvent("src/test/resources/test_event.json");
+
+        for (int i = 0; i < 1000; i++) {
+            APIGatewayProxyResponseEvent response = simpleApiGatewayKafkaProxy.handleRequest(event, contextMock);
+            assertEquals(200, (int) response.getStatusCode());
+        }
+
+        // every connection pays the TCP, TLS and SASL handshake on MSK, the bootstrap connection
+        // and the connection to the partition leader are opened once for all requests
+        double connections = ProducerMetrics.metricValue(
+                simpleApiGatewayKafkaProxy.createProducer().metrics(), "connection-creation-total");
+        assertTrue("opened " + connections + " connections for 1000 requests", connections <= 2);
+        simpleApiGatewayKafkaProxy.closeProducer();
+    }
+
     private Properties consumerProperties() {
 
         Properties props = new Properties();
@@ -88,7 +306,7 @@ public class SimpleApiGatewayKafkaProxyTest {
         Properties props = new Properties();
         props.put("bootstrap.servers", server.getZookeeperConnectionString());
         props.put("key.serializer", "org.apache.kafka.common.serialization.StringSerializer");
-        props.put("value.serializer", "org.apache.kafka.common.serialization.StringSerializer");
+        props.put("value.serializer", "org.apache.kafka.common.serialization.ByteArraySerializer");
         return props;
     }
 
@@ -0,0 +1,101 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import com.amazonaws.services.lambda.runtime.Context;
+import com.amazonaws.services.lambda.runtime.events.SQSBatchResponse;
+import com.amazonaws.services.lambda.runtime.events.SQSEvent;
+import org.apache.kafka.clients.consumer.ConsumerRecords;
+import org.apache.kafka.clients.consumer.KafkaConsumer;
+import org.junit.After;
+import org.junit.Before;
+import org.junit.Rule;
+import org.junit.Test;
+import org.junit.rules.TemporaryFolder;
+import org.junit.runner.RunWith;
+import org.mockito.Mock;
+import org.mockito.junit.MockitoJUnitRunner;
+
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+import java.util.Properties;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertTrue;
+import static org.mockito.Mockito.when;
+
+
+@RunWith(MockitoJUnitRunner.class)
+public class SqsKafkaProxyTest {
+
+    private KafkaLocalServer server;
+
+    @Rule
+    public TemporaryFolder folder = new TemporaryFolder();
+
+    @Before
+    public void setup() throws Exception {
+        server = new KafkaLocalServer(folder.newFolder(), 2181);
+        server.start();
+    }
+
+    @After
+    public void teardown() throws Exception {
+        server.stop();
+    }
+
+    @Mock
+    private Context contextMock;
+
+    @Mock
+    private KafkaProducerPropertiesFactory kafkaProducerPropertiesFactoryMock;
+
+    @Test
+    public void handleRequest() {
+
+        when(kafkaProducerPropertiesFactoryMock.getProducerProperties()).thenReturn(producerProps());
+
+        SqsKafkaProxy sqsKafkaProxy = new SqsKafkaProxy();
+        sqsKafkaProxy.kafkaProducerProperties = kafkaProducerPropertiesFactoryMock;
+
+        List<SQSEvent.SQSMessage> messages = new ArrayList<>();
+        for (int i = 0; i < 5; i++) {
+            SQSEvent.SQSMessage message = new SQSEvent.SQSMessage();
+            message.setMessageId("message-" + i);
+            message.setBody("{\"test\":" + i + "}");
+            messages.add(message);
+        }
+        SQSEvent event = new SQSEvent();
+        event.setRecords(messages);
+
+        SQSBatchResponse response = sqsKafkaProxy.handleRequest(event, contextMock);
+        assertTrue(response.getBatchItemFailures().isEmpty());
+
+        KafkaConsumer<String, String> consumer = new KafkaConsumer<>(consumerProperties());
+        consumer.subscribe(Arrays.asList(SqsKafkaProxy.TOPIC_NAME));
+        ConsumerRecords<String, String> record = consumer.poll(Duration.ofSeconds(5));
+
+        assertEquals(5, record.count());
+    }
+
+    private Properties consumerProperties() {
+
+        Properties props = new Properties();
+        props.put("bootstrap.servers", server.getZookeeperConnectionString());
+        props.put("group.id", "group1");
+        props.put("key.deserializer", "org.apache.kafka.common.serialization.StringDeserializer");
+        props.put("value.deserializer", "org.apache.kafka.common.serialization.StringDeserializer");
+        props.put("auto.offset.reset", "earliest");
+        return props;
+    }
+
+    private Properties producerProps() {
+        Properties props = new Properties();
+        props.put("bootstrap.servers", server.getZookeeperConnectionString());
+        props.put("key.serializer", "org.apache.kafka.common.serialization.StringSerializer");
+        props.put("value.serializer", "org.apache.kafka.common.serialization.ByteArraySerializer");
+        return props;
+    }
+}
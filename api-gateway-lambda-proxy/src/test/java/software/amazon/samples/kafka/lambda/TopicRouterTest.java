@@ -0,0 +1,61 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+package software.amazon.samples.kafka.lambda;
+
+import org.junit.Test;
+
+import java.nio.charset.StandardCharsets;
+import java.util.List;
+import java.util.Map;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertSame;
+
+public class TopicRouterTest {
+
+    private static final String TOPICS = "{\"orders\": {\"delivery_mode\": \"sync\", \"record_key\": \"json:/customer/id\"},"
+            + " \"clicks\": {}}";
+
+    @Test
+    public void routeUsesDefaultTopic() {
+        TopicRouter router = TopicRouter.fromValues(null, null);
+
+        assertEquals(AbstractKafkaProxy.TOPIC_NAME, router.route(null, null).getTopic());
+        assertEquals(List.of(AbstractKafkaProxy.TOPIC_NAME), List.copyOf(router.getTopics()));
+    }
+
+    @Test
+    public void routePrefersPathParameterOverHeader() {
+        TopicRouter router = TopicRouter.fromValues("messages", TOPICS);
+
+        assertEquals("orders", router.route(Map.of("topic", "orders"), Map.of("Kafka-Topic", "clicks")).getTopic());
+        assertEquals("clicks", router.route(null, Map.of("kafka-topic", "clicks")).getTopic());
+        assertEquals("messages", router.route(Map.of(), Map.of()).getTopic());
+        assertEquals(List.of("messages", "orders", "clicks"), List.copyOf(router.getTopics()));
+    }
+
+    @Test
+    public void routeOverridesSettingsOfHandler() {
+        TopicRouter router = TopicRouter.fromValues("messages", TOPICS);
+        RecordKeyExtractor handlerExtractor = RecordKeyExtractor.fromValue(null);
+
+        TopicRouter.Route orders = router.route(Map.of("topic", "orders"), null);
+        assertEquals(DeliveryMode.SYNC, orders.deliveryMode(DeliveryMode.FIRE_AND_FORGET));
+        assertEquals("42", orders.recordKeyExtractor(handlerExtractor)
+                .extract(null, "{\"customer\":{\"id\":42}}".getBytes(StandardCharsets.UTF_8), "request"));
+
+        TopicRouter.Route clicks = router.route(Map.of("topic", "clicks"), null);
+        assertEquals(DeliveryMode.FIRE_AND_FORGET, clicks.deliveryMode(DeliveryMode.FIRE_AND_FORGET));
+        assertSame(handlerExtractor, clicks.recordKeyExtractor(handlerExtractor));
+    }
+
+    @Test(expected = IllegalArgumentException.class)
+    public void routeRejectsTopicNotAllowed() {
+        TopicRouter.fromValues("messages", TOPICS).route(Map.of("topic", "payments"), null);
+    }
+
+    @Test(expected = IllegalArgumentException.class)
+    public void fromValuesRejectsMalformedTopics() {
+        TopicRouter.fromValues("messages", "[\"orders\"]");
+    }
+}
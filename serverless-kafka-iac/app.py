@@ -17,48 +17,68 @@ MODE = "MODE"
 STANDALONE = "STANDALONE"
 MSK_ARN = "MSK_ARN"
 TOPIC_NAME = "TOPIC_NAME"
+# comma separated names of the stacks to synthesize, e.g. -c STACKS=KafkaDemoBackendStack
+# synthesizes the backend without building the producer, all stacks by default and only the
+# producer stack with MODE=STANDALONE
+STACKS = "STACKS"
 
+BACKEND_STACK = "KafkaDemoBackendStack"
+PRODUCER_STACK = "ServerlessKafkaProducerStack"
 
-app = cdk.App()
 
+def create_stacks(app: cdk.App, env: cdk.Environment) -> None:
+    topic_name = get_paramter(app.node, TOPIC_NAME, 'messages')
+    mode = app.node.try_get_context(MODE)
+    # STANDALONE deploys the producer against an existing cluster, the backend stack is only
+    # constructed when STACKS names it
+    default_stacks = PRODUCER_STACK if mode == STANDALONE else f"{BACKEND_STACK},{PRODUCER_STACK}"
+    stacks = [stack.strip() for stack in get_paramter(app.node, STACKS, default_stacks).split(",")]
 
-kafka_backend = KafkaDemoBackendStack(
-    app,
-    "KafkaDemoBackendStack",
-    env=cdk.Environment(
-        account=os.getenv("CDK_DEFAULT_ACCOUNT"), region=os.getenv("CDK_DEFAULT_REGION")
-    ),
-    topic_name=get_paramter(app.node, TOPIC_NAME, 'messages')
-)
+    # The stacks are only constructed when they are synthesized, the producer stack of the
+    # default mode references the VPC and the cluster of the backend stack
+    kafka_backend = None
+    if BACKEND_STACK in stacks or (PRODUCER_STACK in stacks and mode != STANDALONE):
+        kafka_backend = KafkaDemoBackendStack(
+            app,
+            BACKEND_STACK,
+            env=env,
+            topic_name=topic_name
+        )
 
+    if PRODUCER_STACK in stacks:
+        if mode == STANDALONE:
+            kafka_vpc = ec2.Vpc.from_lookup(
+                app, "existingvpc", vpc_id=app.node.try_get_context(KAFKA_VPC_ID)
+            )
+            kafka_security_group = ec2.SecurityGroup.from_security_group_id(
+                app,
+                "existingsecuritygroup",
+                security_group_id=app.node.try_get_context(KAFKA_SECURITY_GROUP_ID),
+            )
+            msk_arn = app.node.try_get_context(MSK_ARN)
+        else:
+            kafka_vpc = kafka_backend.kafka_vpc
+            kafka_security_group = kafka_backend.kafka_security_group
+            msk_arn = kafka_backend.msk_arn
 
-kafka_vpc = kafka_backend.kafka_vpc
-kafka_security_group = kafka_backend.kafka_security_group
-msk_arn = kafka_backend.msk_arn
-mode = app.node.try_get_context(MODE)
-if mode == STANDALONE:
-    kafka_vpc = ec2.Vpc.from_lookup(
-        app, "existingvpc", vpc_id=app.node.try_get_context(KAFKA_VPC_ID)
-    )
-    kafka_security_group = ec2.SecurityGroup.from_security_group_id(
-        app,
-        "existingsecuritygroup",
-        security_group_id=app.node.try_get_context(KAFKA_SECURITY_GROUP_ID),
-    )
-    msk_arn = app.node.try_get_context(MSK_ARN)
+        ServerlessKafkaProducerStack(
+            app,
+            PRODUCER_STACK,
+            kafka_vpc=kafka_vpc,
+            kafka_security_group=kafka_security_group,
+            msk_arn=msk_arn,
+            env=env,
+            topic_name=topic_name
+        )
 
 
-serverless = ServerlessKafkaProducerStack(
-    app,
-    "ServerlessKafkaProducerStack",
-    kafka_vpc=kafka_vpc,
-    kafka_security_group=kafka_security_group,
-    msk_arn=msk_arn,
-    env=cdk.Environment(
+if __name__ == "__main__":
+    app = cdk.App()
+
+    env = cdk.Environment(
         account=os.getenv("CDK_DEFAULT_ACCOUNT"), region=os.getenv("CDK_DEFAULT_REGION")
-    ),
-    topic_name=get_paramter(app.node, TOPIC_NAME, 'messages')
-)
+    )
+    create_stacks(app, env)
 
-#Aspects.of(app).add(AwsSolutionsChecks(verbose=True))
-app.synth()
+    #Aspects.of(app).add(AwsSolutionsChecks(verbose=True))
+    app.synth()
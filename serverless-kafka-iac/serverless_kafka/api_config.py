@@ -0,0 +1,102 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Limits which API Gateway enforces before a request reaches the producer Lambda, configured
+through the CDK context, e.g.
+
+    cdk deploy -c P_API_RATE_LIMIT=2000 -c P_API_MAX_BODY_BYTES=262144 ServerlessKafkaProducerStack
+
+Requests without a Content-Type header, JSON requests with a malformed or empty body and JSON
+batches with more than P_API_MAX_BATCH_RECORDS records are rejected with 400 by the request
+validator. When P_API_MAX_BODY_BYTES is set, requests whose Content-Length exceeds it are
+blocked with 403 by a WAF web ACL of the stage, API Gateway itself has no configurable limit
+below its 10 MB. The web ACL is billed per month and per request and only checks the header,
+chunked requests without a Content-Length pass it. The stage and the batch method are throttled with 429, so a flood of requests does not take the
+reserved concurrency of the function or the buffer of the producer.
+"""
+from typing import Dict
+
+from aws_cdk import aws_apigateway as apig
+from constructs import Node
+
+from .helpers import get_int_paramter
+
+P_API_MAX_BODY_BYTES = "P_API_MAX_BODY_BYTES"
+P_API_MAX_BATCH_RECORDS = "P_API_MAX_BATCH_RECORDS"
+P_API_RATE_LIMIT = "P_API_RATE_LIMIT"
+P_API_BURST_LIMIT = "P_API_BURST_LIMIT"
+P_API_BATCH_RATE_LIMIT = "P_API_BATCH_RATE_LIMIT"
+P_API_BATCH_BURST_LIMIT = "P_API_BATCH_BURST_LIMIT"
+
+# no web ACL, requests above the 6 MB payload limit of synchronous Lambda invocations fail when
+# API Gateway invokes the function, single records above max.request.size are rejected by the producer
+DEFAULT_MAX_BODY_BYTES = 0
+# payload limit of API Gateway
+MAX_BODY_BYTES = 10485760
+DEFAULT_MAX_BATCH_RECORDS = 500
+# POST /batch and POST /topics/{topic}/batch of the producer stack
+BATCH_METHOD_PATHS = ("/batch/POST", "/topics/{topic}/batch/POST")
+
+
+def get_max_body_bytes(node: Node) -> int:
+    """Largest Content-Length of a request, 0 (default) creates no web ACL."""
+    max_body_bytes = get_int_paramter(node, P_API_MAX_BODY_BYTES, DEFAULT_MAX_BODY_BYTES)
+    if not 0 <= max_body_bytes <= MAX_BODY_BYTES:
+        raise ValueError(f"{P_API_MAX_BODY_BYTES} must be between 0 and {MAX_BODY_BYTES}, got {max_body_bytes}")
+    return max_body_bytes
+
+
+def get_max_batch_records(node: Node) -> int:
+    max_batch_records = get_int_paramter(node, P_API_MAX_BATCH_RECORDS, DEFAULT_MAX_BATCH_RECORDS)
+    if max_batch_records < 1:
+        raise ValueError(f"{P_API_MAX_BATCH_RECORDS} must be at least 1, got {max_batch_records}")
+    return max_batch_records
+
+
+def get_throttling(node: Node, rate_parameter: str, rate: int, burst_parameter: str, burst: int) -> Dict:
+    """Throttling options of a stage or method, 0 keeps the limits of the account."""
+    rate_limit = get_int_paramter(node, rate_parameter, rate)
+    burst_limit = get_int_paramter(node, burst_parameter, burst)
+    if rate_limit < 0 or burst_limit < 0:
+        raise ValueError(f"{rate_parameter} and {burst_parameter} must not be negative")
+    if rate_limit > 0 and burst_limit > rate_limit:
+        raise ValueError(f"{burst_parameter} {burst_limit} exceeds {rate_parameter} {rate_limit}")
+
+    throttling = {}
+    if rate_limit > 0:
+        throttling["throttling_rate_limit"] = rate_limit
+    if burst_limit > 0:
+        throttling["throttling_burst_limit"] = burst_limit
+    return throttling
+
+
+def get_api_stage_throttling(node: Node, batch_resource: bool = False) -> Dict:
+    """Throttling options of the API Gateway stage and of its batch methods, whose requests
+    carry many records each."""
+    throttling = get_throttling(node, P_API_RATE_LIMIT, 1000, P_API_BURST_LIMIT, 500)
+    batch_throttling = get_throttling(node, P_API_BATCH_RATE_LIMIT, 100, P_API_BATCH_BURST_LIMIT, 50)
+    if batch_resource and batch_throttling:
+        throttling["method_options"] = {
+            path: apig.MethodDeploymentOptions(**batch_throttling) for path in BATCH_METHOD_PATHS
+        }
+    return throttling
+
+
+def content_length_above(max_bytes: int) -> str:
+    """Regular expression which matches the decimal numbers above max_bytes, WAF can only
+    compare the length of a header value, not its number."""
+    digits = str(max_bytes)
+    # more digits than the limit
+    alternatives = [f"[1-9][0-9]{{{len(digits)},}}"]
+    # as many digits, the first digit which differs is larger
+    for index, digit in enumerate(digits):
+        if digit == "9":
+            continue
+        rest = len(digits) - index - 1
+        larger = f"[{int(digit) + 1}-9]" if digit != "8" else "9"
+        alternative = f"{digits[:index]}{larger}"
+        if rest:
+            alternative += f"[0-9]{{{rest}}}"
+        alternatives.append(alternative)
+    return f"^0*({'|'.join(alternatives)})$"
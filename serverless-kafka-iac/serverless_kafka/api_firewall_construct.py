@@ -0,0 +1,73 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from aws_cdk import Aws
+from aws_cdk import aws_apigateway as apig
+from aws_cdk import aws_wafv2 as waf
+from constructs import Construct
+
+from .api_config import content_length_above
+
+
+class ApiFirewall(Construct):
+    """WAF web ACL of the API Gateway stage which blocks oversized requests.
+
+    WAF only inspects the first kilobytes of a body, so the size is checked on the
+    Content-Length header, before API Gateway reads the body or invokes the Lambda.
+    Requests with chunked transfer encoding have no Content-Length and are not blocked.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        rest_api: apig.RestApi,
+        max_body_bytes: int,
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        self.web_acl = waf.CfnWebACL(
+            self,
+            "webacl",
+            scope="REGIONAL",
+            default_action=waf.CfnWebACL.DefaultActionProperty(allow={}),
+            visibility_config=self.visibility_config("kafka-events-api"),
+            rules=[
+                waf.CfnWebACL.RuleProperty(
+                    name="max-body-size",
+                    priority=0,
+                    action=waf.CfnWebACL.RuleActionProperty(block={}),
+                    statement=waf.CfnWebACL.StatementProperty(
+                        regex_match_statement=waf.CfnWebACL.RegexMatchStatementProperty(
+                            regex_string=content_length_above(max_body_bytes),
+                            field_to_match=waf.CfnWebACL.FieldToMatchProperty(
+                                single_header={"Name": "content-length"}
+                            ),
+                            text_transformations=[
+                                waf.CfnWebACL.TextTransformationProperty(priority=0, type="NONE")
+                            ],
+                        )
+                    ),
+                    visibility_config=self.visibility_config("max-body-size"),
+                )
+            ],
+        )
+
+        stage = rest_api.deployment_stage
+        stage_arn = (
+            f"arn:{Aws.PARTITION}:apigateway:{Aws.REGION}::/restapis/"
+            f"{rest_api.rest_api_id}/stages/{stage.stage_name}"
+        )
+        association = waf.CfnWebACLAssociation(
+            self, "webaclassociation", resource_arn=stage_arn, web_acl_arn=self.web_acl.attr_arn
+        )
+        # the stage must exist before it can be associated
+        association.node.add_dependency(stage)
+
+    @staticmethod
+    def visibility_config(metric_name: str) -> waf.CfnWebACL.VisibilityConfigProperty:
+        return waf.CfnWebACL.VisibilityConfigProperty(
+            cloud_watch_metrics_enabled=True,
+            metric_name=metric_name,
+            sampled_requests_enabled=True,
+        )
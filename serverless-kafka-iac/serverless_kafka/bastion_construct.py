@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: MIT-0
 
 import logging as log
+from typing import List
 
 from aws_cdk import CfnOutput
 from aws_cdk import aws_ec2 as ec2
@@ -22,7 +23,9 @@ class BastionHost(Construct):
         msk_cluster_arn: str,
         region: str,
         kafka_cluster_security_group: ec2.ISecurityGroup,
-        topic_name: str,
+        topic_names: List[str],
+        partitions: int = 3,
+        replication_factor: int = 3,
     ) -> None:
         super().__init__(scope, construct_id)
 
@@ -38,7 +41,9 @@ class BastionHost(Construct):
             region=region,
             kafka_bastion_host_security_group=kafka_bastion_host_security_group,
             kafka_cluster_security_group=kafka_cluster_security_group,
-            topic_name=topic_name,
+            topic_names=topic_names,
+            partitions=partitions,
+            replication_factor=replication_factor,
         )
 
     def init_bastion_host(
@@ -48,7 +53,9 @@ class BastionHost(Construct):
         kafka_bastion_host_security_group: ec2.ISecurityGroup,
         kafka_cluster_security_group: ec2.ISecurityGroup,
         region: str,
-        topic_name: str,
+        topic_names: List[str],
+        partitions: int,
+        replication_factor: int,
     ):
 
         kafka_bastion_host_instance = ec2.Instance(
@@ -93,7 +100,10 @@ class BastionHost(Construct):
             'echo "sasl.mechanism=AWS_MSK_IAM" >> client.properties',
             'echo "sasl.jaas.config=software.amazon.msk.auth.iam.IAMLoginModule required;" >> client.properties',
             'echo "sasl.client.callback.handler.class=software.amazon.msk.auth.iam.IAMClientCallbackHandler" >> client.properties',
-            "./kafka-topics.sh --bootstrap-server $ZK --command-config client.properties --create --replication-factor 3 --partitions 3 --topic messages",  # create event topic
+            *[
+                f"./kafka-topics.sh --bootstrap-server $ZK --command-config client.properties --create --replication-factor {replication_factor} --partitions {partitions} --topic {topic_name}"  # create event topics
+                for topic_name in topic_names
+            ],
         )
 
         access_kafka_policy = iam.PolicyStatement(
@@ -117,8 +127,9 @@ class BastionHost(Construct):
             ],
             resources=[
                 get_topic_name(
-                    kafka_cluster_arn=kafka_cluster_arn, topic_name="messages"
+                    kafka_cluster_arn=kafka_cluster_arn, topic_name=topic_name
                 )
+                for topic_name in topic_names
             ],
         )
 
@@ -0,0 +1,113 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+MSK clusters the producer Lambda spreads its records over, configured through the CDK context.
+The cluster of the stack is always the first one, P_MSK_CLUSTERS adds more, e.g.
+
+    cdk deploy -c 'P_MSK_CLUSTERS=[{"arn": "arn:aws:kafka:...:cluster/second/...", "weight": 2,
+        "security_group_id": "sg-0123"}]' ServerlessKafkaProducerStack
+
+Every cluster gets records in proportion to its weight (default 1), an entry with the ARN
+"self" only sets the weight of the stack's cluster. Its own ARN works as well in STANDALONE
+mode, otherwise the ARN of the stack's cluster is only known at deployment time. With
+P_CLUSTER_ROUTING=key, the default, all records with the same key go to the same cluster,
+adding a cluster only moves the keys it takes over. With weight every record goes to a random
+cluster. The function joins the security group of every cluster, which must allow IAM access
+from its own members on port 9098, the clusters must be reachable from the subnets of the
+function and have the topics of the stack.
+"""
+import json
+import re
+from typing import Dict, List
+
+from aws_cdk import Stack, Token
+from constructs import Node
+
+from .helpers import get_paramter
+
+P_MSK_CLUSTERS = "P_MSK_CLUSTERS"
+P_CLUSTER_ROUTING = "P_CLUSTER_ROUTING"
+
+# key: the cluster follows from the record key, weight: a random cluster per record
+CLUSTER_ROUTINGS = ("key", "weight")
+
+CLUSTER_ARN_PATTERN = re.compile(r"^arn:[\w-]+:kafka:[\w-]+:\d{12}:cluster/[\w-]+/[\w-]+$")
+SECURITY_GROUP_PATTERN = re.compile(r"^sg-[0-9a-f]+$")
+CLUSTER_SETTINGS = ("arn", "weight", "security_group_id")
+# ARN of an entry which sets the weight of the stack's cluster
+SELF_ARN = "self"
+
+# security groups per Lambda function, one is the security group of the stack's cluster
+MAX_SECURITY_GROUPS = 5
+
+
+def get_cluster_routing(node: Node) -> str:
+    routing = get_paramter(node, P_CLUSTER_ROUTING, "key")
+    if routing not in CLUSTER_ROUTINGS:
+        raise ValueError(f"{P_CLUSTER_ROUTING} must be one of {', '.join(CLUSTER_ROUTINGS)}, got {routing}")
+    return routing
+
+
+def get_clusters(node: Node, msk_arn: str) -> List[Dict]:
+    """The cluster of the stack followed by the clusters of P_MSK_CLUSTERS, each with its ARN,
+    weight and, for the added clusters, optional security group."""
+    config = get_paramter(node, P_MSK_CLUSTERS, [])
+    if isinstance(config, str):
+        try:
+            config = json.loads(config)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{P_MSK_CLUSTERS} must be a JSON array, got {config}") from e
+    if not isinstance(config, list):
+        raise ValueError(f"{P_MSK_CLUSTERS} must be a JSON array, got {config}")
+
+    clusters = [{"arn": msk_arn, "weight": 1}]
+    for entry in config:
+        if not isinstance(entry, dict) or "arn" not in entry or set(entry) - set(CLUSTER_SETTINGS):
+            raise ValueError(f"{P_MSK_CLUSTERS} entries must have an arn and may set {', '.join(CLUSTER_SETTINGS[1:])}, got {entry}")
+        weight = int(entry.get("weight", 1))
+        if weight < 0:
+            raise ValueError(f"{P_MSK_CLUSTERS} weight of {entry['arn']} must not be negative, got {weight}")
+        # a token never equals the ARN of an entry, the stack's cluster is named by "self" then
+        if entry["arn"] == SELF_ARN or (not Token.is_unresolved(msk_arn) and entry["arn"] == msk_arn):
+            if "security_group_id" in entry:
+                raise ValueError(f"{P_MSK_CLUSTERS} entry of the stack's cluster may only set its weight, got {entry}")
+            clusters[0]["weight"] = weight
+            continue
+        if not CLUSTER_ARN_PATTERN.match(entry["arn"]):
+            raise ValueError(f"{P_MSK_CLUSTERS} must contain MSK cluster ARNs, got {entry['arn']}")
+        if entry["arn"] in [cluster["arn"] for cluster in clusters]:
+            raise ValueError(f"{P_MSK_CLUSTERS} lists {entry['arn']} twice")
+        cluster = {"arn": entry["arn"], "weight": weight}
+        if "security_group_id" in entry:
+            if not SECURITY_GROUP_PATTERN.match(entry["security_group_id"]):
+                raise ValueError(f"{P_MSK_CLUSTERS} security_group_id must be a security group id, got {entry['security_group_id']}")
+            cluster["security_group_id"] = entry["security_group_id"]
+        clusters.append(cluster)
+
+    if sum(cluster["weight"] for cluster in clusters) == 0:
+        raise ValueError(f"At least one cluster of {P_MSK_CLUSTERS} must have a weight above 0")
+    security_groups = {cluster["security_group_id"] for cluster in clusters if "security_group_id" in cluster}
+    if 1 + len(security_groups) > MAX_SECURITY_GROUPS:
+        raise ValueError(f"{P_MSK_CLUSTERS} adds {len(security_groups)} security groups, a function can have {MAX_SECURITY_GROUPS}")
+    return clusters
+
+
+def get_cluster_environment(stack: Stack, clusters: List[Dict], routing: str) -> Dict[str, str]:
+    """Environment variables read by the ClusterRouter of the producer Lambda, empty for a
+    single cluster. The bootstrap_server of the clusters is only known at deployment time."""
+    if len(clusters) == 1:
+        return {}
+    return {
+        "kafka_clusters": stack.to_json_string(
+            [
+                {
+                    "msk_cluster_arn": cluster["arn"],
+                    "bootstrap_server": cluster["bootstrap_server"],
+                    "weight": cluster["weight"],
+                }
+                for cluster in clusters
+            ]
+        ),
+        "cluster_routing": routing,
+    }
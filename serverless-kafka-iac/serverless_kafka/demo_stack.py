@@ -8,11 +8,17 @@ from aws_cdk import aws_ec2 as ec2
 from constructs import Construct
 
 from serverless_kafka.bastion_construct import BastionHost
-from serverless_kafka.msk_cluster_construct import MSKCuster
+from serverless_kafka.helpers import get_int_paramter
+from serverless_kafka.msk_cluster_construct import NUMBER_OF_BROKER_NODES, MSKCuster
+from serverless_kafka.topic_config import get_topic_names
 from serverless_kafka.vpc_construct import KafkaVPCS
 
 log.basicConfig(level=log.INFO)
 
+# Template optional parameter
+P_TOPIC_PARTITIONS = "P_TOPIC_PARTITIONS"
+P_TOPIC_REPLICATION_FACTOR = "P_TOPIC_REPLICATION_FACTOR"
+
 
 class KafkaDemoBackendStack(Stack):
     def __init__(
@@ -32,6 +38,8 @@ class KafkaDemoBackendStack(Stack):
 
         self.kafka_security_group = msk.kafka_security_group
 
+        partitions, replication_factor = self.get_topic_layout()
+
         bastion_host = BastionHost(
             self,
             "bastionhost",
@@ -39,9 +47,26 @@ class KafkaDemoBackendStack(Stack):
             kafka_vpc=self.kafka_vpc,
             msk_cluster_arn=self.msk_arn,
             kafka_cluster_security_group=self.kafka_security_group,
-            topic_name=topic_name,
+            topic_names=get_topic_names(self.node, topic_name),
+            partitions=partitions,
+            replication_factor=replication_factor,
         )
 
+    def get_topic_layout(self):
+        """Partition count and replication factor of the topic. Every partition accepts
+        writes on its leader broker only, so the partition count bounds the parallelism
+        of the producers and should grow with the throughput."""
+        partitions = get_int_paramter(self.node, P_TOPIC_PARTITIONS, 3)
+        replication_factor = get_int_paramter(self.node, P_TOPIC_REPLICATION_FACTOR, 3)
+
+        if partitions < 1:
+            raise ValueError(f"{P_TOPIC_PARTITIONS} must be >= 1, got {partitions}")
+        if not 1 <= replication_factor <= NUMBER_OF_BROKER_NODES:
+            raise ValueError(
+                f"{P_TOPIC_REPLICATION_FACTOR} must be between 1 and the {NUMBER_OF_BROKER_NODES} brokers, got {replication_factor}"
+            )
+        return partitions, replication_factor
+
     
     @property
     def get_msk_arn(self) -> str:
@@ -33,6 +33,30 @@ def get_paramter(node: Node, parameter_name: str, default_value=None):
         return default_value
 
 
+def get_flag(node: Node, parameter_name: str, default_value: bool = False) -> bool:
+    """Reads a boolean context value, -c NAME=true on the CLI is passed as string."""
+    return_value = node.try_get_context(parameter_name)
+    if return_value is None:
+        return default_value
+    if isinstance(return_value, bool):
+        return return_value
+    return str(return_value).strip().lower() in ("true", "1", "yes")
+
+
+def get_int_paramter(node: Node, parameter_name: str, default_value: int) -> int:
+    """Reads an integer context value, unlike get_paramter a value of 0 is kept."""
+    return_value = node.try_get_context(parameter_name)
+    if return_value is None or return_value == "":
+        return default_value
+    return int(return_value)
+
+
+def get_cluster_name(kafka_cluster_arn: str):
+
+    # cluster-name/cluster-uuid
+    return arn.split(kafka_cluster_arn, af.SLASH_RESOURCE_SLASH_RESOURCE_NAME).resource
+
+
 def get_topic_name(kafka_cluster_arn: str, topic_name: str):
 
     # cluster-name/cluster-uuid
@@ -0,0 +1,55 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Idempotency keys of the producer Lambda. A client which retries a request sends the same key in
+the Idempotency-Key header, the producer Lambda answers a retry of an acknowledged request from
+a cache instead of writing the records again, e.g.
+
+    cdk deploy -c P_IDEMPOTENCY_TTL_SECONDS=900 -c P_IDEMPOTENCY_TABLE=true ServerlessKafkaProducerStack
+
+Every execution environment keeps the last P_IDEMPOTENCY_CACHE_SIZE keys for
+P_IDEMPOTENCY_TTL_SECONDS. A retry which reaches another execution environment is only
+recognized with P_IDEMPOTENCY_TABLE=true, which shares the keys in a DynamoDB table.
+"""
+import re
+from typing import Dict
+
+from constructs import Node
+
+from .helpers import get_int_paramter, get_paramter
+
+P_IDEMPOTENCY_HEADER = "P_IDEMPOTENCY_HEADER"
+P_IDEMPOTENCY_CACHE_SIZE = "P_IDEMPOTENCY_CACHE_SIZE"
+P_IDEMPOTENCY_TTL_SECONDS = "P_IDEMPOTENCY_TTL_SECONDS"
+P_IDEMPOTENCY_TABLE = "P_IDEMPOTENCY_TABLE"
+
+DEFAULT_IDEMPOTENCY_HEADER = "Idempotency-Key"
+HEADER_PATTERN = re.compile(r"^[A-Za-z0-9-]+$")
+
+
+def get_idempotency_header(node: Node) -> str:
+    """Name of the request header with the idempotency key, empty if the cache is off."""
+    header = str(get_paramter(node, P_IDEMPOTENCY_HEADER, DEFAULT_IDEMPOTENCY_HEADER)).strip()
+    if header.lower() in ("none", "false"):
+        return ""
+    if not HEADER_PATTERN.match(header):
+        raise ValueError(f"{P_IDEMPOTENCY_HEADER} must be a header name, got {header}")
+    return header
+
+
+def get_idempotency_environment(node: Node) -> Dict[str, str]:
+    """Environment variables read by the IdempotencyCache of the producer Lambda."""
+    cache_size = get_int_paramter(node, P_IDEMPOTENCY_CACHE_SIZE, 10000)
+    if cache_size < 1:
+        raise ValueError(f"{P_IDEMPOTENCY_CACHE_SIZE} must be at least 1, got {cache_size}")
+
+    ttl_seconds = get_int_paramter(node, P_IDEMPOTENCY_TTL_SECONDS, 600)
+    if ttl_seconds < 1:
+        raise ValueError(f"{P_IDEMPOTENCY_TTL_SECONDS} must be at least 1, got {ttl_seconds}")
+
+    return {
+        "idempotency_header": get_idempotency_header(node),
+        "idempotency_cache_size": str(cache_size),
+        "idempotency_ttl_seconds": str(ttl_seconds),
+    }
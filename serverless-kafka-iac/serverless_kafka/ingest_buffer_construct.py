@@ -0,0 +1,183 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+import logging as log
+
+from aws_cdk import Aws, Duration
+from aws_cdk import aws_apigateway as apig
+from aws_cdk import aws_iam as iam
+from aws_cdk import aws_kinesis as kinesis
+from aws_cdk import aws_lambda as f
+from aws_cdk import aws_lambda_event_sources as event_sources
+from aws_cdk import aws_sqs as sqs
+from constructs import Construct
+
+log.basicConfig(level=log.INFO)
+
+BUFFER_SQS = "sqs"
+BUFFER_KINESIS = "kinesis"
+
+# API Gateway picks the mapping template by the Content-Type of the request
+BUFFERED_CONTENT_TYPES = (
+    "application/json",
+    "text/plain",
+    "application/x-www-form-urlencoded",
+)
+
+ACCEPTED_RESPONSE = '{"message": "Message accepted"}'
+
+
+class IngestBuffer(Construct):
+    """Durable buffer between API Gateway and the Kafka producer Lambda.
+
+    API Gateway writes every request into an SQS queue or a Kinesis data stream with
+    a direct service integration and returns 202 right away, an event source mapping
+    drains the buffer into Kafka in large batches. Records which keep failing end up in a
+    dead letter queue, for Kinesis the queue receives the shard and sequence numbers of the
+    failed records, which stay readable in the stream for its retention period.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        buffer_type: str,
+        batch_size: int,
+        max_batching_window: Duration,
+        consumer_timeout: Duration,
+        shard_count: int = 2,
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        self.buffer_type = buffer_type
+        self.batch_size = batch_size
+        self.max_batching_window = max_batching_window
+
+        self.dead_letter_queue = sqs.Queue(
+            self,
+            "ingestdeadletterqueue",
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            retention_period=Duration.days(14),
+        )
+
+        self.integration_role = iam.Role(
+            self,
+            "apigatewayintegrationrole",
+            assumed_by=iam.ServicePrincipal("apigateway.amazonaws.com"),  # type: ignore
+        )
+
+        if buffer_type == BUFFER_SQS:
+            self.queue = self.init_queue(consumer_timeout)
+            self.queue.grant_send_messages(self.integration_role)
+        elif buffer_type == BUFFER_KINESIS:
+            self.stream = self.init_stream(shard_count)
+            self.stream.grant_write(self.integration_role)
+        else:
+            raise ValueError(f"Unknown ingest buffer {buffer_type}")
+
+    def init_queue(self, consumer_timeout: Duration) -> sqs.Queue:
+        return sqs.Queue(
+            self,
+            "ingestqueue",
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            # AWS recommends six times the function timeout for SQS event sources
+            visibility_timeout=Duration.seconds(consumer_timeout.to_seconds() * 6),
+            dead_letter_queue=sqs.DeadLetterQueue(
+                max_receive_count=5, queue=self.dead_letter_queue
+            ),
+        )
+
+    def init_stream(self, shard_count: int) -> kinesis.Stream:
+        return kinesis.Stream(
+            self,
+            "ingeststream",
+            shard_count=shard_count,
+            encryption=kinesis.StreamEncryption.MANAGED,
+        )
+
+    def integration(self) -> apig.AwsIntegration:
+        """API Gateway service integration which writes the request body into the buffer."""
+        if self.buffer_type == BUFFER_SQS:
+            return apig.AwsIntegration(
+                service="sqs",
+                path=f"{Aws.ACCOUNT_ID}/{self.queue.queue_name}",
+                integration_http_method="POST",
+                options=self.integration_options(
+                    request_template="Action=SendMessage&MessageBody=$util.urlEncode($input.body)",
+                    content_type="application/x-www-form-urlencoded",
+                ),
+            )
+
+        return apig.AwsIntegration(
+            service="kinesis",
+            action="PutRecord",
+            integration_http_method="POST",
+            options=self.integration_options(
+                request_template=json.dumps(
+                    {
+                        "StreamName": self.stream.stream_name,
+                        "Data": "$util.base64Encode($input.body)",
+                        "PartitionKey": "$context.requestId",
+                    }
+                ),
+                content_type="application/x-amz-json-1.1",
+            ),
+        )
+
+    def integration_options(
+        self, request_template: str, content_type: str
+    ) -> apig.IntegrationOptions:
+        return apig.IntegrationOptions(
+            credentials_role=self.integration_role,
+            passthrough_behavior=apig.PassthroughBehavior.NEVER,
+            request_parameters={
+                "integration.request.header.Content-Type": f"'{content_type}'"
+            },
+            request_templates={
+                request_content_type: request_template
+                for request_content_type in BUFFERED_CONTENT_TYPES
+            },
+            integration_responses=[
+                apig.IntegrationResponse(
+                    status_code="202",
+                    response_templates={"application/json": ACCEPTED_RESPONSE},
+                ),
+                apig.IntegrationResponse(
+                    status_code="500",
+                    selection_pattern="[45]\\d{2}",
+                    response_templates={
+                        "application/json": '{"message": "Message could not be buffered"}'
+                    },
+                ),
+            ],
+        )
+
+    def method_responses(self):
+        return [
+            apig.MethodResponse(status_code="202"),
+            apig.MethodResponse(status_code="500"),
+        ]
+
+    def event_source(self) -> f.IEventSource:
+        """Event source which drains the buffer, failed records are reported per item."""
+        if self.buffer_type == BUFFER_SQS:
+            return event_sources.SqsEventSource(
+                self.queue,
+                batch_size=self.batch_size,
+                max_batching_window=self.max_batching_window,
+                report_batch_item_failures=True,
+            )
+
+        return event_sources.KinesisEventSource(
+            self.stream,
+            starting_position=f.StartingPosition.TRIM_HORIZON,
+            batch_size=self.batch_size,
+            max_batching_window=self.max_batching_window,
+            report_batch_item_failures=True,
+            bisect_batch_on_error=True,
+            retry_attempts=10,
+            on_failure=event_sources.SqsDlq(self.dead_letter_queue),
+        )
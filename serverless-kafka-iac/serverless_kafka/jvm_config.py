@@ -0,0 +1,91 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+JVM options of the producer Lambda, selected as a named profile through the CDK context, e.g.
+
+    cdk deploy -c P_JVM_PROFILE=throughput ServerlessKafkaProducerStack
+
+The profiles trade cold start against steady state throughput and memory:
+
+    cold-start  stops the JIT at the C1 tier, which compiles fast but produces slower code
+    throughput  uses all JIT tiers and the parallel GC with a larger heap, for long-lived
+                provisioned execution environments with more than one vCPU
+    low-memory  C1 only with the serial GC, a small code cache and a heap which is
+                returned to the OS early, for memory sizes below 512 MB
+
+Every profile keeps class data sharing of the JDK classes enabled. With P_APPCDS=true the
+build adds an archive of the JDK classes loaded by a training invocation to the deployment
+package, see appcds.sh of the Java project, which replaces the default archive of the JDK.
+Extra options given with P_JVM_OPTIONS are appended and override the options of the profile.
+The profiles can be compared offline with python -m tools.jvm_profiles benchmark.
+"""
+from typing import Dict, List
+
+from constructs import Node
+
+from .helpers import get_flag, get_paramter
+
+P_JVM_PROFILE = "P_JVM_PROFILE"
+P_JVM_OPTIONS = "P_JVM_OPTIONS"
+P_APPCDS = "P_APPCDS"
+
+# written into the root of the deployment package by appcds.sh, Lambda extracts it into /var/task
+APPCDS_ARCHIVE = "/var/task/appcds.jsa"
+
+DEFAULT_JVM_PROFILE = "cold-start"
+
+JVM_PROFILES: Dict[str, List[str]] = {
+    "cold-start": [
+        "-XX:+TieredCompilation",
+        "-XX:TieredStopAtLevel=1",
+        "-XX:+UseSerialGC",
+        "-Xshare:auto",
+    ],
+    "throughput": [
+        "-XX:+TieredCompilation",
+        "-XX:+UseParallelGC",
+        "-XX:MaxRAMPercentage=70",
+        "-Xshare:auto",
+    ],
+    "low-memory": [
+        "-XX:+TieredCompilation",
+        "-XX:TieredStopAtLevel=1",
+        "-XX:+UseSerialGC",
+        "-XX:MaxRAMPercentage=50",
+        "-XX:MinHeapFreeRatio=10",
+        "-XX:MaxHeapFreeRatio=20",
+        "-XX:ReservedCodeCacheSize=32m",
+        "-Xss512k",
+        "-Xshare:auto",
+    ],
+}
+
+
+def get_jvm_profile(node: Node) -> str:
+    profile = str(get_paramter(node, P_JVM_PROFILE, DEFAULT_JVM_PROFILE)).strip().lower()
+    if profile not in JVM_PROFILES:
+        raise ValueError(f"{P_JVM_PROFILE} must be one of {', '.join(JVM_PROFILES)}, got {profile}")
+    return profile
+
+
+def is_appcds_enabled(node: Node) -> bool:
+    return get_flag(node, P_APPCDS)
+
+
+def get_jvm_options(node: Node) -> List[str]:
+    """Options of the selected profile followed by the extra options of P_JVM_OPTIONS."""
+    options = list(JVM_PROFILES[get_jvm_profile(node)])
+    if is_appcds_enabled(node):
+        # falls back to no class data sharing if the archive can not be mapped
+        options.insert(options.index("-Xshare:auto"), f"-XX:SharedArchiveFile={APPCDS_ARCHIVE}")
+    extra_options = str(get_paramter(node, P_JVM_OPTIONS, "")).split()
+    for option in extra_options:
+        if not option.startswith("-"):
+            raise ValueError(f"{P_JVM_OPTIONS} must only contain JVM options, got {option}")
+    return options + extra_options
+
+
+def get_jvm_environment(node: Node) -> Dict[str, str]:
+    """Environment variables of the producer Lambda, the JVM reads JAVA_TOOL_OPTIONS on start."""
+    return {"JAVA_TOOL_OPTIONS": " ".join(get_jvm_options(node))}
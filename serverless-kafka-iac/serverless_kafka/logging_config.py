@@ -0,0 +1,84 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Logging policy of the producer Lambda and the API Gateway stage, configured through the
+CDK context, e.g.
+
+    cdk deploy -c P_LOG_SAMPLE_RATE=0.01 -c P_LOG_APPENDER=async -c P_API_DATA_TRACE=false ServerlessKafkaProducerStack
+
+Per request details, including the request event, are logged at debug level. They are only
+written for the share of invocations given by P_LOG_SAMPLE_RATE, which Powertools switches
+to debug level.
+"""
+from typing import Dict
+
+from aws_cdk import aws_apigateway as apig
+from constructs import Node
+
+from .helpers import get_flag, get_paramter
+
+P_LOG_LEVEL = "P_LOG_LEVEL"
+P_LOG_SAMPLE_RATE = "P_LOG_SAMPLE_RATE"
+P_LOG_APPENDER = "P_LOG_APPENDER"
+P_API_LOGGING_LEVEL = "P_API_LOGGING_LEVEL"
+P_API_DATA_TRACE = "P_API_DATA_TRACE"
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARN", "ERROR")
+
+# appender names of log4j2.xml, async writes the logs on a background thread
+LOG_APPENDERS = {
+    "sync": "JsonAppender",
+    "async": "AsyncJsonAppender",
+}
+
+API_LOGGING_LEVELS = {
+    "INFO": apig.MethodLoggingLevel.INFO,
+    "ERROR": apig.MethodLoggingLevel.ERROR,
+    "OFF": apig.MethodLoggingLevel.OFF,
+}
+
+
+def get_logging_environment(node: Node) -> Dict[str, str]:
+    """Environment variables of the producer Lambda read by Powertools and log4j2.xml."""
+    log_level = str(get_paramter(node, P_LOG_LEVEL, "INFO")).strip().upper()
+    if log_level not in LOG_LEVELS:
+        raise ValueError(f"{P_LOG_LEVEL} must be one of {', '.join(LOG_LEVELS)}, got {log_level}")
+
+    appender = str(get_paramter(node, P_LOG_APPENDER, "sync")).strip().lower()
+    if appender not in LOG_APPENDERS:
+        raise ValueError(
+            f"{P_LOG_APPENDER} must be one of {', '.join(LOG_APPENDERS)}, got {appender}"
+        )
+
+    environment = {
+        "POWERTOOLS_LOG_LEVEL": log_level,
+        "log_appender": LOG_APPENDERS[appender],
+    }
+
+    sample_rate = get_paramter(node, P_LOG_SAMPLE_RATE)
+    if sample_rate is not None:
+        try:
+            rate = float(sample_rate)
+        except ValueError:
+            rate = -1.0
+        if not 0 <= rate <= 1:
+            raise ValueError(f"{P_LOG_SAMPLE_RATE} must be between 0 and 1, got {sample_rate}")
+        environment["POWERTOOLS_LOGGER_SAMPLE_RATE"] = str(rate)
+
+    return environment
+
+
+def get_api_stage_logging(node: Node) -> Dict:
+    """Logging options of the API Gateway stage. Data tracing writes every request and
+    response body to CloudWatch."""
+    logging_level = str(get_paramter(node, P_API_LOGGING_LEVEL, "INFO")).strip().upper()
+    if logging_level not in API_LOGGING_LEVELS:
+        raise ValueError(
+            f"{P_API_LOGGING_LEVEL} must be one of {', '.join(API_LOGGING_LEVELS)}, got {logging_level}"
+        )
+
+    return {
+        "logging_level": API_LOGGING_LEVELS[logging_level],
+        "data_trace_enabled": get_flag(node, P_API_DATA_TRACE, True),
+    }
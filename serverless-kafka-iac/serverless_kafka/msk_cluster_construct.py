@@ -12,6 +12,8 @@ from .helpers import allow_tcp_ports_to_internally
 
 log.basicConfig(level=log.INFO)
 
+NUMBER_OF_BROKER_NODES = 3
+
 
 class MSKCuster(Construct):
     def __init__(
@@ -71,7 +73,7 @@ class MSKCuster(Construct):
             id="demo-cluster",
             cluster_name="demo-cluster",
             kafka_version="2.6.2",
-            number_of_broker_nodes=3,
+            number_of_broker_nodes=NUMBER_OF_BROKER_NODES,
             #logging_info=logging_info_property,
             broker_node_group_info=msk.CfnCluster.BrokerNodeGroupInfoProperty(
                 instance_type="m5.xlarge",
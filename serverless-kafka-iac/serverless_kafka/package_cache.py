@@ -0,0 +1,59 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Content addressed cache of the deployment package of the producer Lambda. The package is
+identified by a hash of the files the Maven build reads and of the build command, so a synth
+only runs the Docker bundling when the Java project or the build options changed, e.g.
+
+    ~/.cache/serverless-kafka-producer/ApiGatewayLambdaProxy-<hash>.zip
+
+A prebuilt package can be passed with -c P_PRODUCER_PACKAGE=path/to/ApiGatewayLambdaProxy.zip,
+in that case nothing is built.
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(str(Path.home()), ".cache", "serverless-kafka-producer")
+PACKAGE_NAME = "ApiGatewayLambdaProxy"
+
+# files and directories of the Java project which end up in the package, the tests are skipped
+# by the build and target/ is written by it
+BUILD_INPUTS = ("pom.xml", "assembly.xml", "appcds.sh", os.path.join("src", "main"))
+
+
+def source_files(project_directory: str) -> List[str]:
+    """Build inputs of the Java project relative to the project directory, in a stable order."""
+    files = []
+    for build_input in BUILD_INPUTS:
+        path = os.path.join(project_directory, build_input)
+        if os.path.isfile(path):
+            files.append(build_input)
+        for directory, _, file_names in os.walk(path):
+            for file_name in file_names:
+                files.append(os.path.relpath(os.path.join(directory, file_name), project_directory))
+    return sorted(file.replace(os.sep, "/") for file in files)
+
+
+def source_hash(project_directory: str, build_options: Iterable[str] = ()) -> str:
+    """Hash of the names and contents of the build inputs and of the build options."""
+    digest = hashlib.sha256()
+    for option in build_options:
+        digest.update(option.encode("utf-8") + b"\0")
+    for file in source_files(project_directory):
+        digest.update(file.encode("utf-8") + b"\0")
+        with open(os.path.join(project_directory, file), "rb") as source:
+            digest.update(hashlib.sha256(source.read()).digest())
+    return digest.hexdigest()
+
+
+def package_file_name(package_hash: str) -> str:
+    return f"{PACKAGE_NAME}-{package_hash[:32]}.zip"
+
+
+def cached_package(cache_directory: str, package_hash: str) -> Optional[str]:
+    """Path of the cached package of the hash, None if it was not built yet."""
+    path = os.path.join(cache_directory, package_file_name(package_hash))
+    return path if os.path.isfile(path) else None
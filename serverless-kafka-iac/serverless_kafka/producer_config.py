@@ -0,0 +1,191 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Kafka producer settings which can be tuned through the CDK context, e.g.
+
+    cdk deploy -c P_LINGER_MS=5 -c P_COMPRESSION_TYPE=lz4 ServerlessKafkaProducerStack
+
+The settings are passed to the producer Lambda as environment variables with the
+prefix kafka_ and the dots of the property name replaced by underscores
+(linger.ms -> kafka_linger_ms).
+"""
+import re
+from typing import Dict, List
+
+from constructs import Node
+
+from .helpers import get_int_paramter, get_paramter
+
+# CDK context parameter -> Kafka producer property
+PRODUCER_PARAMETERS = {
+    "P_ACKS": "acks",
+    "P_LINGER_MS": "linger.ms",
+    "P_BATCH_SIZE": "batch.size",
+    "P_COMPRESSION_TYPE": "compression.type",
+    "P_MAX_IN_FLIGHT_REQUESTS": "max.in.flight.requests.per.connection",
+    "P_BUFFER_MEMORY": "buffer.memory",
+    "P_ENABLE_IDEMPOTENCE": "enable.idempotence",
+    "P_CONNECTIONS_MAX_IDLE_MS": "connections.max.idle.ms",
+    "P_PARTITIONER": "partitioner.class",
+}
+
+ENVIRONMENT_PREFIX = "kafka_"
+
+ACKS = ("0", "1", "-1", "all")
+COMPRESSION_TYPES = ("none", "gzip", "snappy", "lz4", "zstd")
+
+# key-hash: murmur2 hash of the record key, records without key stick to a partition per batch
+# sticky: fills one batch per partition ignoring the key, the largest batches
+# round-robin: spreads records evenly ignoring the key, the smallest batches
+PARTITIONERS = {
+    "key-hash": "org.apache.kafka.clients.producer.internals.DefaultPartitioner",
+    "sticky": "org.apache.kafka.clients.producer.UniformStickyPartitioner",
+    "round-robin": "org.apache.kafka.clients.producer.RoundRobinPartitioner",
+}
+
+# property -> smallest accepted value
+NUMERIC_PROPERTIES = {
+    "linger.ms": 0,
+    "batch.size": 0,
+    "max.in.flight.requests.per.connection": 1,
+    "buffer.memory": 1,
+    "connections.max.idle.ms": 0,
+}
+
+# Kafka rejects idempotence with more than 5 in flight requests per connection
+MAX_IN_FLIGHT_WITH_IDEMPOTENCE = 5
+
+# Client metrics of the producer published by the producer Lambda, "default" or a comma
+# separated list of metric names of the producer-metrics group, e.g. record-queue-time-max
+P_CLIENT_METRICS = "P_CLIENT_METRICS"
+P_CLIENT_METRICS_INTERVAL_SECONDS = "P_CLIENT_METRICS_INTERVAL_SECONDS"
+
+DEFAULT_CLIENT_METRICS = (
+    "record-queue-time-avg",
+    "request-latency-avg",
+    "batch-size-avg",
+    "compression-rate-avg",
+    "record-retry-rate",
+)
+
+CLIENT_METRIC_PATTERN = re.compile(r"^[a-z0-9-]+$")
+
+
+def get_producer_config(node: Node) -> Dict[str, str]:
+    """Reads the producer settings from the CDK context and validates them.
+
+    Only settings which are present in the context are returned, everything else
+    keeps the default of the producer Lambda.
+    """
+    config = {}
+    for parameter_name, property_name in PRODUCER_PARAMETERS.items():
+        # false and 0 from cdk.json are settings, get_paramter would drop them
+        value = node.try_get_context(parameter_name)
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = str(value).lower()
+        config[property_name] = str(value).strip().lower()
+
+    partitioner = config.get("partitioner.class")
+    if partitioner is not None:
+        if partitioner not in PARTITIONERS:
+            raise ValueError(
+                f"P_PARTITIONER must be one of {', '.join(PARTITIONERS)}, got {partitioner}"
+            )
+        config["partitioner.class"] = PARTITIONERS[partitioner]
+
+    # the producer Lambda enables idempotence unless it is set, it is switched off for the
+    # settings it can not be combined with
+    if "enable.idempotence" not in config and not supports_idempotence(config):
+        config["enable.idempotence"] = "false"
+
+    validate_producer_config(config)
+
+    return config
+
+
+def supports_idempotence(config: Dict[str, str]) -> bool:
+    if config.get("acks", "all") not in ("all", "-1"):
+        return False
+    max_in_flight = config.get("max.in.flight.requests.per.connection", "")
+    return not max_in_flight.isdigit() or int(max_in_flight) <= MAX_IN_FLIGHT_WITH_IDEMPOTENCE
+
+
+def validate_producer_config(config: Dict[str, str]):
+    """Raises a ValueError for values and combinations the producer would reject
+    or which silently weaken the delivery guarantees."""
+
+    acks = config.get("acks")
+    if acks is not None and acks not in ACKS:
+        raise ValueError(f"acks must be one of {', '.join(ACKS)}, got {acks}")
+
+    compression_type = config.get("compression.type")
+    if compression_type is not None and compression_type not in COMPRESSION_TYPES:
+        raise ValueError(
+            f"compression.type must be one of {', '.join(COMPRESSION_TYPES)}, got {compression_type}"
+        )
+
+    for property_name, minimum in NUMERIC_PROPERTIES.items():
+        value = config.get(property_name)
+        if value is None:
+            continue
+        if not value.isdigit() or int(value) < minimum:
+            raise ValueError(
+                f"{property_name} must be an integer >= {minimum}, got {value}"
+            )
+
+    idempotence = config.get("enable.idempotence")
+    if idempotence is not None and idempotence not in ("true", "false"):
+        raise ValueError(f"enable.idempotence must be true or false, got {idempotence}")
+
+    if idempotence == "true":
+        if acks is not None and acks not in ("all", "-1"):
+            raise ValueError(f"enable.idempotence requires acks=all, got acks={acks}")
+
+        max_in_flight = config.get("max.in.flight.requests.per.connection")
+        if max_in_flight is not None and int(max_in_flight) > MAX_IN_FLIGHT_WITH_IDEMPOTENCE:
+            raise ValueError(
+                f"enable.idempotence requires max.in.flight.requests.per.connection <= "
+                f"{MAX_IN_FLIGHT_WITH_IDEMPOTENCE}, got {max_in_flight}"
+            )
+
+
+def get_client_metrics(node: Node) -> List[str]:
+    """Names of the client metrics to publish, empty if the exporter is off."""
+    client_metrics = str(get_paramter(node, P_CLIENT_METRICS, "none")).strip().lower()
+    if client_metrics in ("none", "false"):
+        return []
+    if client_metrics in ("default", "true"):
+        return list(DEFAULT_CLIENT_METRICS)
+
+    names = [name.strip() for name in client_metrics.split(",") if name.strip()]
+    for name in names:
+        if not CLIENT_METRIC_PATTERN.match(name):
+            raise ValueError(f"{P_CLIENT_METRICS} contains an invalid metric name {name}")
+    return names
+
+
+def get_client_metrics_environment(node: Node) -> Dict[str, str]:
+    """Environment variables read by the ProducerClientMetrics of the producer Lambda."""
+    client_metrics = get_client_metrics(node)
+    if not client_metrics:
+        return {}
+
+    interval = get_int_paramter(node, P_CLIENT_METRICS_INTERVAL_SECONDS, 60)
+    if interval < 0:
+        raise ValueError(f"{P_CLIENT_METRICS_INTERVAL_SECONDS} must not be negative, got {interval}")
+
+    return {
+        "client_metrics": ",".join(client_metrics),
+        "client_metrics_interval_seconds": str(interval),
+    }
+
+
+def to_environment(config: Dict[str, str]) -> Dict[str, str]:
+    """Maps producer properties to the environment variables read by the producer Lambda."""
+    return {
+        ENVIRONMENT_PREFIX + property_name.replace(".", "_"): value
+        for property_name, value in config.items()
+    }
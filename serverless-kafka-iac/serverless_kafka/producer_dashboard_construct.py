@@ -0,0 +1,177 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from typing import List, Optional, Sequence
+
+from aws_cdk import Duration
+from aws_cdk import aws_cloudwatch as cw
+from aws_cdk import aws_lambda as f
+from constructs import Construct
+
+# Namespace and dimension of the EMF metrics written by the ProducerMetrics of the producer Lambda
+METRICS_NAMESPACE = "ServerlessKafkaProducer"
+SERVICE_DIMENSION = "Service"
+
+# Broker metrics of the MSK cluster which are shown per broker
+BROKER_METRICS = ("CpuUser", "BytesInPerSec", "ProduceTotalTimeMsMean")
+
+PERIOD = Duration.minutes(1)
+
+
+class ProducerDashboard(Construct):
+    """CloudWatch dashboard and alarms over the hot path of the producer Lambda.
+
+    Shows the EMF metrics of the producer next to the concurrency of the Lambda
+    function and the load of the MSK brokers, so a bottleneck shows up on one screen.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        function: f.Function,
+        service_name: str,
+        cluster_name: str,
+        ack_latency_threshold_ms: int,
+        client_metrics: Sequence[str] = (),
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        self.service_name = service_name
+
+        self.alarms = self.init_alarms(function, ack_latency_threshold_ms)
+
+        self.dashboard = cw.Dashboard(self, "dashboard")
+        self.dashboard.add_widgets(
+            cw.GraphWidget(
+                title="Latency (ms)",
+                left=[
+                    self.metric("EnqueueLatency", "Average"),
+                    self.metric("EnqueueLatency", "p99"),
+                    self.metric("AckLatency", "Average"),
+                    self.metric("AckLatency", "p99"),
+                ],
+                width=12,
+            ),
+            cw.GraphWidget(
+                title="Records",
+                left=[self.metric("BatchSize", "Sum", label="Records")],
+                right=[self.metric("RecordSize", "Average", label="Record size (bytes)")],
+                width=12,
+            ),
+        )
+        self.dashboard.add_widgets(
+            cw.GraphWidget(
+                title="Errors and retries",
+                left=[self.metric("Errors", "Sum"), self.metric("Retries", "Sum")],
+                width=8,
+            ),
+            cw.GraphWidget(
+                title="Producer buffer utilisation (%)",
+                left=[self.metric("BufferUtilisation", "Maximum")],
+                left_y_axis=cw.YAxisProps(min=0, max=100),
+                width=8,
+            ),
+            cw.AlarmStatusWidget(title="Alarms", alarms=self.alarms, width=8),
+        )
+        self.dashboard.add_widgets(
+            cw.GraphWidget(
+                title="Lambda concurrency",
+                left=[function.metric("ConcurrentExecutions", statistic="Maximum", period=PERIOD)],
+                right=[function.metric_throttles(statistic="Sum", period=PERIOD)],
+                width=12,
+            ),
+            cw.GraphWidget(
+                title="Lambda duration (ms)",
+                left=[
+                    function.metric_duration(statistic="p50", period=PERIOD),
+                    function.metric_duration(statistic="p99", period=PERIOD),
+                ],
+                right=[function.metric_errors(statistic="Sum", period=PERIOD)],
+                width=12,
+            ),
+        )
+        self.dashboard.add_widgets(
+            *[
+                cw.GraphWidget(
+                    title=f"MSK {metric_name}",
+                    left=[self.broker_metric(cluster_name, metric_name)],
+                    width=8,
+                )
+                for metric_name in BROKER_METRICS
+            ]
+        )
+        if client_metrics:
+            # published by the producer Lambda without aggregation, one value per sample
+            self.dashboard.add_widgets(
+                *[
+                    cw.GraphWidget(
+                        title=f"Producer {metric_name}",
+                        left=[self.metric(metric_name, "Average", label=metric_name)],
+                        width=8,
+                    )
+                    for metric_name in client_metrics
+                ]
+            )
+
+    def metric(self, metric_name: str, statistic: str, label: Optional[str] = None) -> cw.Metric:
+        return cw.Metric(
+            namespace=METRICS_NAMESPACE,
+            metric_name=metric_name,
+            dimensions_map={SERVICE_DIMENSION: self.service_name},
+            statistic=statistic,
+            label=label or f"{metric_name} {statistic}",
+            period=PERIOD,
+        )
+
+    @staticmethod
+    def broker_metric(cluster_name: str, metric_name: str) -> cw.MathExpression:
+        # one line per broker, without knowing the number of brokers of the cluster
+        return cw.MathExpression(
+            expression=(
+                f"SEARCH('{{AWS/Kafka,\"Broker ID\",\"Cluster Name\"}} "
+                f"MetricName=\"{metric_name}\" \"Cluster Name\"=\"{cluster_name}\"', 'Average', 60)"
+            ),
+            using_metrics={},
+            label=metric_name,
+            period=PERIOD,
+        )
+
+    def init_alarms(self, function: f.Function, ack_latency_threshold_ms: int) -> List[cw.Alarm]:
+        return [
+            self.metric("Errors", "Sum").create_alarm(
+                self,
+                "produceerrors",
+                alarm_description="Records could not be written to Kafka",
+                threshold=1,
+                evaluation_periods=1,
+                comparison_operator=cw.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD,
+                treat_missing_data=cw.TreatMissingData.NOT_BREACHING,
+            ),
+            self.metric("AckLatency", "p99").create_alarm(
+                self,
+                "acklatency",
+                alarm_description="Brokers acknowledge records slowly",
+                threshold=ack_latency_threshold_ms,
+                evaluation_periods=5,
+                datapoints_to_alarm=3,
+                treat_missing_data=cw.TreatMissingData.NOT_BREACHING,
+            ),
+            self.metric("BufferUtilisation", "Maximum").create_alarm(
+                self,
+                "bufferutilisation",
+                alarm_description="The producer buffer is almost full, send blocks",
+                threshold=90,
+                evaluation_periods=3,
+                treat_missing_data=cw.TreatMissingData.NOT_BREACHING,
+            ),
+            function.metric_throttles(statistic="Sum", period=PERIOD).create_alarm(
+                self,
+                "throttles",
+                alarm_description="Invocations are throttled by the reserved concurrency",
+                threshold=1,
+                evaluation_periods=1,
+                comparison_operator=cw.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD,
+                treat_missing_data=cw.TreatMissingData.NOT_BREACHING,
+            ),
+        ]
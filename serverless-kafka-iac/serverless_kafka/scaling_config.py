@@ -0,0 +1,134 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Provisioned concurrency of the prod alias of the producer Lambda. Application Auto Scaling
+keeps the provisioned execution environments between P_PROVISIONED_CONCURRENCY and
+P_PROVISIONED_MAX_CONCURRENCY and tracks their utilization, so bursts get warm execution
+environments before they spill over to on demand cold starts:
+
+    cdk deploy -c P_PROVISIONED_CONCURRENCY=5 -c P_PROVISIONED_UTILIZATION_TARGET=0.6 \\
+        ServerlessKafkaProducerStack
+
+Recurring peaks are covered with scheduled actions which move the bounds, one action per
+entry of P_PROVISIONED_SCHEDULE separated by ";", written as <expression>=<min>[:<max>]
+with a cron, rate or at expression in UTC:
+
+    -c "P_PROVISIONED_SCHEDULE=cron(45 6 ? * MON-FRI *)=30:80;cron(0 20 ? * MON-FRI *)=5"
+
+The schedule can be derived from the traffic of the past weeks with
+python -m tools.prewarm_schedule. All bounds are checked against the reserved concurrency
+P_MAX_CONCURRENCY of the function, Lambda can not provision more execution environments.
+"""
+import re
+from typing import List, Optional
+
+from constructs import Node
+
+from .helpers import get_int_paramter, get_paramter
+
+P_PROVISIONED_CONCURRENCY = "P_PROVISIONED_CONCURRENCY"
+P_PROVISIONED_MAX_CONCURRENCY = "P_PROVISIONED_MAX_CONCURRENCY"
+P_PROVISIONED_UTILIZATION_TARGET = "P_PROVISIONED_UTILIZATION_TARGET"
+P_PROVISIONED_SCHEDULE = "P_PROVISIONED_SCHEDULE"
+
+DEFAULT_PROVISIONED_CONCURRENCY = 20
+DEFAULT_PROVISIONED_MAX_CONCURRENCY = 60
+DEFAULT_UTILIZATION_TARGET = 0.7
+# range of the target value of LambdaProvisionedConcurrencyUtilization
+MIN_UTILIZATION_TARGET = 0.1
+MAX_UTILIZATION_TARGET = 0.9
+# scheduled actions per scalable target
+MAX_SCHEDULED_ACTIONS = 200
+
+SCHEDULE_ENTRY = re.compile(r"^\s*((?:cron|rate|at)\([^)]+\))\s*=\s*(\d+)\s*(?::\s*(\d+)\s*)?$")
+
+
+def parse_schedule(value: str) -> List[dict]:
+    """Scheduled actions of a P_PROVISIONED_SCHEDULE value, an action without a maximum
+    keeps the maximum of the previous action."""
+    actions = []
+    for entry in value.split(";"):
+        if not entry.strip():
+            continue
+        match = SCHEDULE_ENTRY.match(entry)
+        if not match:
+            raise ValueError(
+                f"{P_PROVISIONED_SCHEDULE} entries must look like cron(...)=<min>[:<max>], got {entry.strip()}"
+            )
+        expression, min_capacity, max_capacity = match.groups()
+        actions.append(
+            {
+                "expression": expression,
+                "min_capacity": int(min_capacity),
+                "max_capacity": int(max_capacity) if max_capacity else None,
+            }
+        )
+    if len(actions) > MAX_SCHEDULED_ACTIONS:
+        raise ValueError(f"{P_PROVISIONED_SCHEDULE} allows at most {MAX_SCHEDULED_ACTIONS} entries, got {len(actions)}")
+    return actions
+
+
+def get_utilization_target(node: Node) -> float:
+    """Target of the utilization tracking policy, 0 disables the policy."""
+    target = float(get_paramter(node, P_PROVISIONED_UTILIZATION_TARGET, DEFAULT_UTILIZATION_TARGET))
+    if target != 0 and not MIN_UTILIZATION_TARGET <= target <= MAX_UTILIZATION_TARGET:
+        raise ValueError(
+            f"{P_PROVISIONED_UTILIZATION_TARGET} must be 0 or between {MIN_UTILIZATION_TARGET} "
+            f"and {MAX_UTILIZATION_TARGET}, got {target}"
+        )
+    return target
+
+
+def get_provisioned_scaling(node: Node, fast_start: bool, max_concurrency: int) -> Optional[dict]:
+    """Bounds, utilization target and scheduled actions of the provisioned concurrency,
+    None if the alias has no provisioned concurrency.
+
+    Args:
+        fast_start (bool): SnapStart is enabled, it can not be combined with provisioned concurrency
+        max_concurrency (int): reserved concurrency of the function
+    """
+    min_capacity = get_int_paramter(
+        node, P_PROVISIONED_CONCURRENCY, 0 if fast_start else DEFAULT_PROVISIONED_CONCURRENCY
+    )
+    schedule = parse_schedule(str(get_paramter(node, P_PROVISIONED_SCHEDULE, "")))
+
+    if min_capacity <= 0:
+        if schedule:
+            raise ValueError(f"{P_PROVISIONED_SCHEDULE} requires {P_PROVISIONED_CONCURRENCY} > 0")
+        return None
+    if fast_start:
+        raise ValueError(f"P_FAST_START can not be combined with {P_PROVISIONED_CONCURRENCY}")
+
+    max_capacity = get_int_paramter(node, P_PROVISIONED_MAX_CONCURRENCY, DEFAULT_PROVISIONED_MAX_CONCURRENCY)
+    check_bounds(P_PROVISIONED_CONCURRENCY, min_capacity, max_capacity, max_concurrency)
+
+    previous_max_capacity = max_capacity
+    for action in schedule:
+        if action["max_capacity"] is None:
+            action["max_capacity"] = previous_max_capacity
+        check_bounds(
+            f"{P_PROVISIONED_SCHEDULE} entry {action['expression']}",
+            action["min_capacity"],
+            action["max_capacity"],
+            max_concurrency,
+        )
+        previous_max_capacity = action["max_capacity"]
+
+    return {
+        "min_capacity": min_capacity,
+        "max_capacity": max_capacity,
+        "utilization_target": get_utilization_target(node),
+        "schedule": schedule,
+    }
+
+
+def check_bounds(name: str, min_capacity: int, max_capacity: int, max_concurrency: int):
+    if min_capacity < 1:
+        raise ValueError(f"{name} must provision at least 1 execution environment, got {min_capacity}")
+    if max_capacity < min_capacity:
+        raise ValueError(f"{name} maximum {max_capacity} is below the minimum {min_capacity}")
+    if max_capacity > max_concurrency:
+        raise ValueError(
+            f"{name} maximum {max_capacity} exceeds the reserved concurrency P_MAX_CONCURRENCY={max_concurrency}"
+        )
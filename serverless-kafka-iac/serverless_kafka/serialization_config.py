@@ -0,0 +1,86 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Optional schema validation of the messages, configured through the CDK context, e.g.
+
+    cdk deploy -c P_SERIALIZATION=avro -c P_SCHEMA_DIR=schemas -c P_SCHEMA_NAME=order ServerlessKafkaProducerStack
+
+The producer Lambda validates JSON messages against the schema and writes them in the
+compact Avro or Protobuf binary encoding. The schema files of P_SCHEMA_DIR are deployed
+as a Lambda layer, <name>.avsc for Avro and <name>.desc (protoc --include_imports
+--descriptor_set_out) for Protobuf, where <name> is the full name of the message type.
+"""
+import os
+import re
+from typing import Dict, Optional
+
+from constructs import Node
+
+from .helpers import get_int_paramter, get_paramter
+
+P_SERIALIZATION = "P_SERIALIZATION"
+P_SCHEMA_DIR = "P_SCHEMA_DIR"
+P_SCHEMA_NAME = "P_SCHEMA_NAME"
+P_SCHEMA_CACHE_SIZE = "P_SCHEMA_CACHE_SIZE"
+
+SERIALIZATION_NONE = "none"
+SERIALIZATION_FORMATS = (SERIALIZATION_NONE, "avro", "protobuf")
+
+# Lambda extracts the layers into /opt
+SCHEMA_LAYER_DIRECTORY = "/opt"
+
+SCHEMA_NAME_PATTERN = re.compile(r"^[\w.-]+$")
+
+DEFAULT_SCHEMA_CACHE_SIZE = 32
+
+
+def get_serialization_format(node: Node) -> str:
+    serialization = str(get_paramter(node, P_SERIALIZATION, SERIALIZATION_NONE)).strip().lower()
+    if serialization not in SERIALIZATION_FORMATS:
+        raise ValueError(
+            f"{P_SERIALIZATION} must be one of {', '.join(SERIALIZATION_FORMATS)}, got {serialization}"
+        )
+    return serialization
+
+
+def get_schema_directory(node: Node) -> Optional[str]:
+    """Local directory of the schema files, None if serialization is disabled."""
+    serialization = get_serialization_format(node)
+    if serialization == SERIALIZATION_NONE:
+        return None
+
+    schema_directory = get_paramter(node, P_SCHEMA_DIR)
+    if not schema_directory or not os.path.isdir(schema_directory):
+        raise ValueError(
+            f"{P_SERIALIZATION}={serialization} requires {P_SCHEMA_DIR} to be a directory, got {schema_directory}"
+        )
+    return schema_directory
+
+
+def get_serialization_environment(node: Node) -> Dict[str, str]:
+    """Environment variables read by the RecordSerializer of the producer Lambda,
+    empty if serialization is disabled."""
+    serialization = get_serialization_format(node)
+    if serialization == SERIALIZATION_NONE:
+        return {}
+
+    environment = {
+        "serialization_format": serialization,
+        "schema_directory": SCHEMA_LAYER_DIRECTORY,
+    }
+
+    schema_name = get_paramter(node, P_SCHEMA_NAME)
+    if schema_name is not None:
+        if not SCHEMA_NAME_PATTERN.match(schema_name):
+            raise ValueError(
+                f"{P_SCHEMA_NAME} may only contain letters, digits, '.', '_' and '-', got {schema_name}"
+            )
+        environment["schema_name"] = schema_name
+
+    cache_size = get_int_paramter(node, P_SCHEMA_CACHE_SIZE, DEFAULT_SCHEMA_CACHE_SIZE)
+    if cache_size < 1:
+        raise ValueError(f"{P_SCHEMA_CACHE_SIZE} must be at least 1, got {cache_size}")
+    environment["schema_cache_size"] = str(cache_size)
+
+    return environment
@@ -4,11 +4,14 @@
 import logging as log
 import os
 from pathlib import Path
+from typing import Dict, List, Optional
 
 
-from aws_cdk import (BundlingOptions, BundlingOutput, DockerVolume, Duration,
-                     Stack)
+from aws_cdk import (AssetHashType, BundlingOptions, BundlingOutput,
+                     DockerVolume, Duration, RemovalPolicy, Stack)
 from aws_cdk import aws_apigateway as apig
+from aws_cdk import aws_applicationautoscaling as appscaling
+from aws_cdk import aws_dynamodb as dynamodb
 from aws_cdk import aws_ec2 as ec2
 from aws_cdk import aws_iam as iam
 from aws_cdk import aws_lambda as f
@@ -16,16 +19,92 @@ from aws_cdk import aws_logs as logs
 from aws_cdk import custom_resources as cs
 from constructs import Construct
 
-from .helpers import get_group_name, get_paramter, get_topic_name
+from .api_config import (get_api_stage_throttling, get_max_batch_records,
+                         get_max_body_bytes)
+from .api_firewall_construct import ApiFirewall
+from .cluster_config import (get_cluster_environment, get_cluster_routing,
+                             get_clusters)
+from .helpers import (get_cluster_name, get_flag, get_group_name,
+                      get_int_paramter, get_paramter, get_topic_name)
+from .idempotency_config import (P_IDEMPOTENCY_TABLE,
+                                 get_idempotency_environment)
+from .ingest_buffer_construct import BUFFER_KINESIS, BUFFER_SQS, IngestBuffer
+from .jvm_config import P_APPCDS, get_jvm_environment, is_appcds_enabled
+from .logging_config import get_api_stage_logging, get_logging_environment
+from .package_cache import (DEFAULT_CACHE_DIRECTORY, cached_package,
+                            package_file_name, source_hash)
+from .producer_config import (get_client_metrics,
+                              get_client_metrics_environment,
+                              get_producer_config, to_environment)
+from .producer_dashboard_construct import METRICS_NAMESPACE, ProducerDashboard
+from .scaling_config import get_provisioned_scaling
+from .serialization_config import (get_schema_directory,
+                                   get_serialization_environment)
+from .topic_config import (check_delivery_mode, check_record_key,
+                           get_topic_environment, get_topic_names)
 
 log.basicConfig(level=log.INFO)
 
 # Template optional parameter
 P_RESERVED_CONCURRENCY = "P_RESERVED_CONCURRENCY"
 P_MAX_CONCURRENCY = "P_MAX_CONCURRENCY"
+P_DELIVERY_MODE = "P_DELIVERY_MODE"
+P_FAST_START = "P_FAST_START"
+P_INGEST_MODE = "P_INGEST_MODE"
+P_BUFFER_BATCH_SIZE = "P_BUFFER_BATCH_SIZE"
+P_BUFFER_BATCHING_WINDOW_SECONDS = "P_BUFFER_BATCHING_WINDOW_SECONDS"
+P_RECORD_KEY = "P_RECORD_KEY"
+P_BINARY_MEDIA_TYPES = "P_BINARY_MEDIA_TYPES"
+P_ACK_LATENCY_ALARM_MS = "P_ACK_LATENCY_ALARM_MS"
+P_MEMORY_SIZE = "P_MEMORY_SIZE"
+P_ARCHITECTURE = "P_ARCHITECTURE"
+P_PRODUCER_PACKAGE = "P_PRODUCER_PACKAGE"
+P_BUILD_CACHE_DIRECTORY = "P_BUILD_CACHE_DIRECTORY"
+P_BOOTSTRAP_REFRESH_SECONDS = "P_BOOTSTRAP_REFRESH_SECONDS"
+P_INSTALL_LATEST_AWS_SDK = "P_INSTALL_LATEST_AWS_SDK"
+
+# direct: API Gateway invokes the producer Lambda, sqs/kinesis: API Gateway writes into
+# a buffer and returns 202, the producer Lambda drains the buffer in batches
+INGEST_MODE_DIRECT = "direct"
+INGEST_MODES = (INGEST_MODE_DIRECT, BUFFER_SQS, BUFFER_KINESIS)
+
+JAVA_PROJECT_DIRECTORY = os.path.join("..", "api-gateway-lambda-proxy")
+
+HANDLER_PACKAGE = "software.amazon.samples.kafka.lambda"
+PROXY_HANDLER = f"{HANDLER_PACKAGE}.SimpleApiGatewayKafkaProxy::handleRequest"
+BUFFER_HANDLERS = {
+    BUFFER_SQS: f"{HANDLER_PACKAGE}.SqsKafkaProxy::handleRequest",
+    BUFFER_KINESIS: f"{HANDLER_PACKAGE}.KinesisKafkaProxy::handleRequest",
+}
 
 LAMBDA_TIMEOUT_SECONDS = 15
 
+# Lambda assigns CPU in proportion to the memory, 1769 MB is one full vCPU
+DEFAULT_MEMORY_SIZE = 1024
+MIN_MEMORY_SIZE = 128
+MAX_MEMORY_SIZE = 10240
+
+ARCHITECTURES = {
+    "x86_64": f.Architecture.X86_64,
+    "arm64": f.Architecture.ARM_64,
+}
+
+# Powertools service name, also the dimension of the metrics of the producer
+SERVICE_NAME = "KafkaProducer"
+
+BATCH_RESOURCE_PATH = "batch"
+# POST /topics/{topic} and POST /topics/{topic}/batch write to one of the allowed topics
+TOPICS_RESOURCE_PATH = "topics"
+
+# Requests with these content types reach the producer Lambda base64 encoded and are
+# written to Kafka byte for byte
+BINARY_MEDIA_TYPES = (
+    "application/octet-stream",
+    "application/avro",
+    "application/x-protobuf",
+    "application/vnd.kafka.binary",
+)
+
 CUSTOM_RESOURCE_PHYISCAL_FUNCTION_NAME = 'kafkaCLICallFunction'
 
 
@@ -44,29 +123,220 @@ class ServerlessKafkaProducerStack(Stack):
 
         vpc = kafka_vpc
 
+        # SnapStart restores initialized execution environments from a snapshot,
+        # it can not be combined with provisioned concurrency
+        fast_start = get_flag(self.node, P_FAST_START)
+        if fast_start and is_appcds_enabled(self.node):
+            # the archive is dumped by the Java 11 JVM of the bundling image
+            raise ValueError(f"{P_FAST_START} can not be combined with {P_APPCDS}")
+
+        ingest_mode = get_paramter(self.node, P_INGEST_MODE, INGEST_MODE_DIRECT)
+        if ingest_mode not in INGEST_MODES:
+            raise ValueError(
+                f"{P_INGEST_MODE} must be one of {', '.join(INGEST_MODES)}, got {ingest_mode}"
+            )
+
         bootstrap_broker = self.get_bootstrap_server(msk_arn=msk_arn)
 
-        function = self.init_proxy_lambda(
-            vpc=vpc,
-            kafka_security_groud=kafka_security_group,
-            bootstrap_broker=bootstrap_broker,
-            msk_arn=msk_arn,
-            topic_name=topic_name,
+        # the records are spread over the clusters of P_MSK_CLUSTERS, the first is msk_arn
+        clusters = get_clusters(self.node, msk_arn)
+        clusters[0]["bootstrap_server"] = bootstrap_broker
+        for index, cluster in enumerate(clusters[1:], start=1):
+            cluster["bootstrap_server"] = self.get_bootstrap_server(
+                msk_arn=cluster["arn"], construct_id=f"kafkaclicall{index}"
+            )
+
+        if ingest_mode == INGEST_MODE_DIRECT:
+            function = self.init_proxy_lambda(
+                vpc=vpc,
+                kafka_security_groud=kafka_security_group,
+                bootstrap_broker=bootstrap_broker,
+                msk_arn=msk_arn,
+                topic_name=topic_name,
+                fast_start=fast_start,
+                clusters=clusters,
+            )
+
+            self.init_api_gateway(function, vpc, kafka_security_group, fast_start=fast_start)  # type: ignore
+        else:
+            function = self.init_proxy_lambda(
+                vpc=vpc,
+                kafka_security_groud=kafka_security_group,
+                bootstrap_broker=bootstrap_broker,
+                msk_arn=msk_arn,
+                topic_name=topic_name,
+                fast_start=fast_start,
+                clusters=clusters,
+                construct_id="KafkaBufferConsumer",
+                handler=BUFFER_HANDLERS[ingest_mode],
+            )
+
+            self.init_buffered_api_gateway(function, vpc, kafka_security_group, ingest_mode)  # type: ignore
+
+        ProducerDashboard(
+            self,
+            "producerdashboard",
+            function=function,
+            service_name=SERVICE_NAME,
+            cluster_name=get_cluster_name(msk_arn),
+            client_metrics=get_client_metrics(self.node),
+            ack_latency_threshold_ms=get_int_paramter(self.node, P_ACK_LATENCY_ALARM_MS, 1000),
         )
 
-        self.init_api_gateway(function, vpc, kafka_security_group)  # type: ignore
-
     def init_api_gateway(
         self,
         _function: f.IFunction,
         vpc: ec2.IVpc,
         kafka_security_groud: ec2.ISecurityGroup,
+        fast_start: bool = False,
     ):
         """Creates the API Gateway endpoint
 
         Args:
             function (f.IFunction): Lambda backend funtion
+            fast_start (bool): SnapStart is enabled, provisioned concurrency is off by default
+        """
+        prod_alias = self.init_prod_alias(_function, fast_start)
+
+        rest_api = self.init_rest_api(
+            vpc,
+            kafka_security_groud,
+            binary_media_types=self.get_binary_media_types(),
+            batch_resource=True,
+        )
+
+        # rejects requests the producer would fail on before they invoke the Lambda,
+        # bodies of other content types than JSON are passed through unchecked
+        validator = rest_api.add_request_validator(
+            "requestvalidator",
+            validate_request_body=True,
+            validate_request_parameters=True,
+        )
+        content_type_required = {"method.request.header.Content-Type": True}
+        record_model = rest_api.add_model(
+            "recordmodel",
+            content_type="application/json",
+            schema=apig.JsonSchema(
+                schema=apig.JsonSchemaVersion.DRAFT4,
+                title="record",
+                type=[
+                    apig.JsonSchemaType.OBJECT,
+                    apig.JsonSchemaType.ARRAY,
+                    apig.JsonSchemaType.STRING,
+                    apig.JsonSchemaType.NUMBER,
+                    apig.JsonSchemaType.BOOLEAN,
+                ],
+            ),
+        )
+        batch_model = rest_api.add_model(
+            "batchmodel",
+            content_type="application/json",
+            schema=apig.JsonSchema(
+                schema=apig.JsonSchemaVersion.DRAFT4,
+                title="batch",
+                type=apig.JsonSchemaType.ARRAY,
+                min_items=1,
+                max_items=get_max_batch_records(self.node),
+            ),
+        )
+
+        def add_post_methods(resource: apig.IResource):
+            resource.add_method(
+                "POST",
+                apig.LambdaIntegration(prod_alias),
+                request_validator=validator,
+                request_parameters=content_type_required,
+                request_models={"application/json": record_model},
+            )
+
+            # POST .../batch takes a JSON array or newline delimited records
+            batch_resource = resource.add_resource(BATCH_RESOURCE_PATH)
+            batch_resource.add_method(
+                "POST",
+                apig.LambdaIntegration(prod_alias),
+                request_validator=validator,
+                request_parameters=content_type_required,
+                request_models={"application/json": batch_model},
+            )
+
+        add_post_methods(rest_api.root)
+        # the producer Lambda rejects topics which are not allowed
+        add_post_methods(rest_api.root.add_resource(TOPICS_RESOURCE_PATH).add_resource("{topic}"))
+
+    def init_buffered_api_gateway(
+        self,
+        _function: f.IFunction,
+        vpc: ec2.IVpc,
+        kafka_security_groud: ec2.ISecurityGroup,
+        buffer_type: str,
+    ):
+        """Creates the API Gateway endpoint which writes into an SQS queue or a Kinesis
+        data stream, the producer Lambda drains the buffer into Kafka
+
+        Args:
+            function (f.IFunction): Lambda which drains the buffer
+            buffer_type (str): sqs or kinesis
         """
+        ingest_buffer = IngestBuffer(
+            self,
+            "ingestbuffer",
+            buffer_type=buffer_type,
+            batch_size=get_int_paramter(self.node, P_BUFFER_BATCH_SIZE, 500),
+            max_batching_window=Duration.seconds(
+                get_int_paramter(self.node, P_BUFFER_BATCHING_WINDOW_SECONDS, 1)
+            ),
+            consumer_timeout=Duration.seconds(LAMBDA_TIMEOUT_SECONDS),
+        )
+
+        # the event source mapping invokes the alias so SnapStart applies
+        prod_alias = f.Alias(
+            self, "prod-alias", alias_name="prod", version=_function.current_version
+        )
+        prod_alias.add_event_source(ingest_buffer.event_source())
+
+        rest_api = self.init_rest_api(vpc, kafka_security_groud)
+        rest_api.root.add_method(
+            "POST",
+            ingest_buffer.integration(),
+            method_responses=ingest_buffer.method_responses(),
+        )
+
+    def init_prod_alias(self, _function: f.IFunction, fast_start: bool) -> f.Alias:
+        prod_alias = f.Alias(
+            self, "prod-alias", alias_name="prod", version=_function.current_version
+        )
+
+        scaling = get_provisioned_scaling(
+            self.node, fast_start, max_concurrency=self.get_max_concurrency()
+        )
+        if scaling:
+            scalable_target = prod_alias.add_auto_scaling(
+                min_capacity=scaling["min_capacity"],
+                max_capacity=scaling["max_capacity"],
+            )
+            # adds execution environments before the provisioned ones are used up
+            if scaling["utilization_target"] > 0:
+                scalable_target.scale_on_utilization(
+                    utilization_target=scaling["utilization_target"]
+                )
+            # moves the bounds ahead of recurring peaks and back after them
+            for index, action in enumerate(scaling["schedule"]):
+                scalable_target.scale_on_schedule(
+                    f"provisionedschedule{index}",
+                    schedule=appscaling.Schedule.expression(action["expression"]),
+                    min_capacity=action["min_capacity"],
+                    max_capacity=action["max_capacity"],
+                )
+
+        return prod_alias
+
+    def init_rest_api(
+        self,
+        vpc: ec2.IVpc,
+        kafka_security_groud: ec2.ISecurityGroup,
+        binary_media_types: Optional[List[str]] = None,
+        batch_resource: bool = False,
+    ) -> apig.RestApi:
         vpc_endpoint = ec2.InterfaceVpcEndpoint(
             self,
             "apigatewayendpoint",
@@ -87,26 +357,35 @@ class ServerlessKafkaProducerStack(Stack):
             ),
         )
 
-        prod_alias = f.Alias(
-            self, "prod-alias", alias_name="prod", version=_function.current_version
-        )
-
-        prod_alias.add_auto_scaling(min_capacity=20, max_capacity=60)
-
         rest_api = apig.RestApi(
             self,
             "messagesapiendpoint",
             rest_api_name="kafka-events-api",
             deploy_options=apig.StageOptions(
-                logging_level=apig.MethodLoggingLevel.INFO,
-                data_trace_enabled=True,
                 tracing_enabled=True,
+                **get_api_stage_logging(self.node),
+                **get_api_stage_throttling(self.node, batch_resource=batch_resource),
             ),
             default_method_options=apig.MethodOptions(
                 authorization_type=apig.AuthorizationType.NONE
             ),
+            binary_media_types=binary_media_types,
         )
-        rest_api.root.add_method("POST", apig.LambdaIntegration(prod_alias))
+
+        # tells the client which check failed instead of a bare "Invalid request body"
+        rest_api.add_gateway_response(
+            "badrequestbody",
+            type=apig.ResponseType.BAD_REQUEST_BODY,
+            templates={
+                "application/json": '{"message": "$context.error.validationErrorString"}'
+            },
+        )
+
+        max_body_bytes = get_max_body_bytes(self.node)
+        if max_body_bytes > 0:
+            ApiFirewall(self, "apifirewall", rest_api=rest_api, max_body_bytes=max_body_bytes)
+
+        return rest_api
 
     def init_proxy_lambda(
         self,
@@ -115,40 +394,80 @@ class ServerlessKafkaProducerStack(Stack):
         bootstrap_broker: str,
         msk_arn: str,
         topic_name: str,
+        fast_start: bool = False,
+        clusters: Optional[List[Dict]] = None,
+        construct_id: str = "KafkaProducer",
+        handler: str = PROXY_HANDLER,
     ):
+        if clusters is None:
+            clusters = [{"arn": msk_arn, "weight": 1, "bootstrap_server": bootstrap_broker}]
+        cluster_arns = [cluster["arn"] for cluster in clusters]
+
+        # the function joins the security group of every cluster it writes to
+        security_groups = [kafka_security_groud]
+        for security_group_id in sorted({cluster["security_group_id"] for cluster in clusters if "security_group_id" in cluster}):
+            security_groups.append(
+                ec2.SecurityGroup.from_security_group_id(
+                    self, f"clustersecuritygroup{security_group_id}", security_group_id
+                )
+            )
+
         function = f.Function(
             self,
-            "KafkaProducer",
-            runtime=f.Runtime.JAVA_11,  # type: ignore
-            handler="software.amazon.samples.kafka.lambda.SimpleApiGatewayKafkaProxy::handleRequest",
+            construct_id,
+            runtime=f.Runtime.JAVA_17 if fast_start else f.Runtime.JAVA_11,  # type: ignore
+            architecture=self.get_architecture(),
+            handler=handler,
             timeout=Duration.seconds(LAMBDA_TIMEOUT_SECONDS),
             log_retention=logs.RetentionDays.ONE_DAY,
-            code=self.build_mvn_package(),
+            code=self.build_mvn_package(appcds=is_appcds_enabled(self.node)),
             tracing=f.Tracing.ACTIVE,
             vpc=vpc,
             vpc_subnets=ec2.SubnetSelection(
                 subnet_type=ec2.SubnetType.PRIVATE_WITH_NAT
             ),
-            security_groups=[kafka_security_groud],
-            reserved_concurrent_executions=get_paramter(
-                self.node, P_MAX_CONCURRENCY, 60
-            ),
+            security_groups=security_groups,
+            reserved_concurrent_executions=self.get_max_concurrency(),
             environment={
                 "bootstrap_server": bootstrap_broker,
-                "JAVA_TOOL_OPTIONS": "-XX:+TieredCompilation -XX:TieredStopAtLevel=1",
-                "POWERTOOLS_LOG_LEVEL": "INFO",
-                "POWERTOOLS_SERVICE_NAME": "KafkaProducer",
+                "msk_cluster_arn": msk_arn,
+                "bootstrap_refresh_seconds": str(self.get_bootstrap_refresh_seconds()),
+                "delivery_mode": self.get_delivery_mode(),
+                "record_key": self.get_record_key(),
+                "POWERTOOLS_SERVICE_NAME": SERVICE_NAME,
+                "POWERTOOLS_METRICS_NAMESPACE": METRICS_NAMESPACE,
+                **get_jvm_environment(self.node),
+                **get_logging_environment(self.node),
+                **to_environment(get_producer_config(self.node)),
+                **get_client_metrics_environment(self.node),
+                **get_idempotency_environment(self.node),
+                **get_topic_environment(self.node, topic_name),
+                **get_cluster_environment(self, clusters, get_cluster_routing(self.node)),
             },
-            memory_size=1024,
+            memory_size=self.get_memory_size(),
         )
-        
+
+        if handler == PROXY_HANDLER:
+            self.init_schema_layer(function)
+            if get_flag(self.node, P_IDEMPOTENCY_TABLE):
+                self.init_idempotency_table(function)
+
+        if fast_start:
+            # The priming hook of the handler loads the classes and fetches the topic
+            # metadata before the snapshot is taken
+            cfn_function: f.CfnFunction = function.node.default_child  # type: ignore
+            cfn_function.add_property_override(
+                "SnapStart", {"ApplyOn": "PublishedVersions"}
+            )
 
         access_kafka_policy = iam.PolicyStatement(
             effect=iam.Effect.ALLOW,
             actions=[
                 "kafka-cluster:Connect",
+                # the producer enables idempotence unless P_ENABLE_IDEMPOTENCE=false
+                "kafka-cluster:WriteDataIdempotently",
             ],
-            resources=[msk_arn],
+            resources=cluster_arns,
         )
 
         admin_kafka_topics = iam.PolicyStatement(
@@ -158,22 +477,114 @@ class ServerlessKafkaProducerStack(Stack):
                 "kafka-cluster:DescribeTopic",
             ],
             resources=[
-                get_topic_name(kafka_cluster_arn=msk_arn, topic_name=topic_name)
+                get_topic_name(kafka_cluster_arn=cluster_arn, topic_name=topic)
+                for cluster_arn in cluster_arns
+                for topic in get_topic_names(self.node, topic_name)
             ],
         )
 
         access_to_user_groups = iam.PolicyStatement(
             effect=iam.Effect.ALLOW,
             actions=["kafka-cluster:AlterGroup", "kafka-cluster:DescribeGroup"],
-            resources=[get_group_name(kafka_cluster_arn=msk_arn, group_name="*")],
+            resources=[
+                get_group_name(kafka_cluster_arn=cluster_arn, group_name="*")
+                for cluster_arn in cluster_arns
+            ],
+        )
+        # the bootstrap brokers are read again when they expired or can not be reached
+        read_bootstrap_brokers = iam.PolicyStatement(
+            effect=iam.Effect.ALLOW,
+            actions=["kafka:GetBootstrapBrokers"],
+            resources=cluster_arns,
         )
+
         function.add_to_role_policy(access_kafka_policy)
+        function.add_to_role_policy(read_bootstrap_brokers)
         function.add_to_role_policy(admin_kafka_topics)
         function.add_to_role_policy(access_to_user_groups)
 
         return function
 
-    def build_mvn_package(self):
+    def init_idempotency_table(self, function: f.Function):
+        """Shares the idempotency keys of the producer Lambda between its execution
+        environments, DynamoDB deletes the keys after their time to live"""
+        table = dynamodb.Table(
+            self,
+            "idempotencytable",
+            partition_key=dynamodb.Attribute(
+                name="idempotency_key", type=dynamodb.AttributeType.STRING
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+        table.grant(function, "dynamodb:GetItem", "dynamodb:PutItem")
+        function.add_environment("idempotency_table", table.table_name)
+
+    def init_schema_layer(self, function: f.Function):
+        """Deploys the schema files as a layer if a serialization format is configured,
+        the compiled schemas are cached by the producer Lambda"""
+        schema_directory = get_schema_directory(self.node)
+        if schema_directory is None:
+            return
+
+        schema_layer = f.LayerVersion(
+            self,
+            "schemas",
+            code=f.Code.from_asset(schema_directory),
+            compatible_runtimes=[f.Runtime.JAVA_11, f.Runtime.JAVA_17],  # type: ignore
+            description="Schemas of the messages written to Kafka",
+        )
+        function.add_layers(schema_layer)
+        for name, value in get_serialization_environment(self.node).items():
+            function.add_environment(name, value)
+
+    def get_delivery_mode(self) -> str:
+        return check_delivery_mode(P_DELIVERY_MODE, get_paramter(self.node, P_DELIVERY_MODE, "sync"))
+
+    def get_max_concurrency(self) -> int:
+        return get_int_paramter(self.node, P_MAX_CONCURRENCY, 60)
+
+    def get_memory_size(self) -> int:
+        memory_size = get_int_paramter(self.node, P_MEMORY_SIZE, DEFAULT_MEMORY_SIZE)
+        if not MIN_MEMORY_SIZE <= memory_size <= MAX_MEMORY_SIZE:
+            raise ValueError(
+                f"{P_MEMORY_SIZE} must be between {MIN_MEMORY_SIZE} and {MAX_MEMORY_SIZE} MB, got {memory_size}"
+            )
+        return memory_size
+
+    def get_architecture(self) -> f.Architecture:
+        architecture = get_paramter(self.node, P_ARCHITECTURE, "x86_64")
+        if architecture not in ARCHITECTURES:
+            raise ValueError(
+                f"{P_ARCHITECTURE} must be one of {', '.join(ARCHITECTURES)}, got {architecture}"
+            )
+        return ARCHITECTURES[architecture]
+
+    def get_bootstrap_refresh_seconds(self) -> int:
+        refresh_seconds = get_int_paramter(self.node, P_BOOTSTRAP_REFRESH_SECONDS, 3600)
+        if refresh_seconds < 0:
+            raise ValueError(f"{P_BOOTSTRAP_REFRESH_SECONDS} must not be negative, got {refresh_seconds}")
+        return refresh_seconds
+
+    def get_binary_media_types(self) -> List[str]:
+        """Comma separated list from the context, an empty value disables binary payloads."""
+        binary_media_types = self.node.try_get_context(P_BINARY_MEDIA_TYPES)
+        if binary_media_types is None:
+            return list(BINARY_MEDIA_TYPES)
+        return [media_type.strip() for media_type in binary_media_types.split(",") if media_type.strip()]
+
+    def get_record_key(self) -> str:
+        return check_record_key(P_RECORD_KEY, get_paramter(self.node, P_RECORD_KEY, "request-id"))
+
+    def build_mvn_package(self, appcds: bool = False):
+
+        prebuilt_package = get_paramter(self.node, P_PRODUCER_PACKAGE)
+        if prebuilt_package:
+            if not os.path.isfile(prebuilt_package):
+                raise ValueError(f"{P_PRODUCER_PACKAGE} must be a zip file, got {prebuilt_package}")
+            log.info(f"Using prebuilt package {prebuilt_package}")
+            return f.Code.from_asset(prebuilt_package)
 
         home = str(Path.home())
 
@@ -181,25 +592,53 @@ class ServerlessKafkaProducerStack(Stack):
         m2_home = os.path.join(home, ".m2/")
         log.info(f"M2_home={m2_home}")
 
+        build = "mvn clean install -q -Dmaven.test.skip=true"
+        if appcds:
+            # the training run dumps the archive with the JVM of the bundling image
+            build += " && sh appcds.sh target/ApiGatewayLambdaProxy.zip"
+        # the archive can only be mapped by a JVM of the same CPU architecture
+        platform = self.get_architecture().docker_platform if appcds else None
+
+        # the package only changes with the sources of the Java project and the build options
+        package_hash = source_hash(JAVA_PROJECT_DIRECTORY, [build, platform or ""])
+        cache_directory = os.path.abspath(
+            get_paramter(self.node, P_BUILD_CACHE_DIRECTORY, DEFAULT_CACHE_DIRECTORY)
+        )
+        cached = cached_package(cache_directory, package_hash)
+        if cached:
+            log.info(f"Using cached package {cached}")
+            return f.Code.from_asset(cached)
+        os.makedirs(cache_directory, exist_ok=True)
+
+        package_file = package_file_name(package_hash)
         code = f.Code.from_asset(
-            path=os.path.join("..", "api-gateway-lambda-proxy"),
+            path=JAVA_PROJECT_DIRECTORY,
+            asset_hash=package_hash,
+            asset_hash_type=AssetHashType.CUSTOM,
             bundling=BundlingOptions(
                 image=f.Runtime.JAVA_11.bundling_image,
                 command=[
                     "/bin/sh",
                     "-c",
-                    "mvn clean install -q -Dmaven.test.skip=true && cp /asset-input/target/ApiGatewayLambdaProxy.zip /asset-output/",
+                    f"{build} && cp /asset-input/target/ApiGatewayLambdaProxy.zip /asset-output/"
+                    f" && cp /asset-input/target/ApiGatewayLambdaProxy.zip /asset-cache/{package_file}.tmp"
+                    f" && mv /asset-cache/{package_file}.tmp /asset-cache/{package_file}",
                 ],
                 user="root",
                 output_type=BundlingOutput.ARCHIVED,
-                volumes=[DockerVolume(host_path=m2_home, container_path="/root/.m2/")],
+                volumes=[
+                    DockerVolume(host_path=m2_home, container_path="/root/.m2/"),
+                    DockerVolume(host_path=cache_directory, container_path="/asset-cache"),
+                ],
+                platform=platform,
             ),
         )
         return code
 
-    def get_bootstrap_server(self, msk_arn: str):
+    def get_bootstrap_server(self, msk_arn: str, construct_id: str = "kafkaclicall"):
 
-        
+        # Read on create and on every update of the resource, e.g. when the cluster changes. The
+        # producer Lambda reads the brokers again at runtime when they expire or can not be reached
         sdk_call = cs.AwsSdkCall(
             service="Kafka",
             action="getBootstrapBrokers",  # aws kafka get-bootstrap-brokers --cluster-arn {kafka_cluster_arn} --query "BootstrapBrokerStringSaslIam" --region {region})
@@ -209,14 +648,16 @@ class ServerlessKafkaProducerStack(Stack):
                 f"csgetbootstrapbrokers{msk_arn}"
             ),
         )
-        cs.PhysicalResourceId.of
         kafka_cli_call = cs.AwsCustomResource(
             self,
-            "kafkaclicall",
+            construct_id,
             function_name=CUSTOM_RESOURCE_PHYISCAL_FUNCTION_NAME,
             on_create=sdk_call,
+            on_update=sdk_call,
             log_retention=logs.RetentionDays.ONE_DAY,
-            install_latest_aws_sdk=True,
+            # the SDK of the Lambda runtime supports getBootstrapBrokers, installing the latest
+            # SDK on every deployment is only needed for new API fields
+            install_latest_aws_sdk=get_flag(self.node, P_INSTALL_LATEST_AWS_SDK),
             policy=cs.AwsCustomResourcePolicy.from_sdk_calls(
                 resources=[msk_arn]
             ),
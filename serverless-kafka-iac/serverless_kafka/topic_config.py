@@ -0,0 +1,98 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Topics the producer Lambda writes to, configured through the CDK context, e.g.
+
+    cdk deploy -c P_TOPICS=orders,clicks \\
+        -c 'P_TOPIC_CONFIG={"orders": {"delivery_mode": "sync", "record_key": "json:/customer/id"}}' \\
+        ServerlessKafkaProducerStack
+
+Requests to POST /topics/{topic} and POST /topics/{topic}/batch, or with a Kafka-Topic header,
+are written to the topics of P_TOPICS, all other requests to TOPIC_NAME. Requests for any
+other topic are rejected with 400 and the function is only allowed to write to these topics.
+P_TOPIC_CONFIG overrides the delivery mode and the record key of a topic, all topics share
+the producer of the execution environment and with it the producer settings.
+"""
+import json
+import re
+from typing import Dict, List
+
+from constructs import Node
+
+from .helpers import get_paramter
+
+P_TOPICS = "P_TOPICS"
+P_TOPIC_CONFIG = "P_TOPIC_CONFIG"
+
+# sync: flush and wait for the broker ack, ack-on-send: wait for the ack without flushing,
+# fire-and-forget: return once the record is buffered and report delivery errors later
+DELIVERY_MODES = ("sync", "ack-on-send", "fire-and-forget")
+
+# request-id, header:<name>, json:<JSON pointer> or hash of the message
+RECORD_KEY_PATTERN = re.compile(r"^(request-id|hash|header:[\w-]+|json:(/[^/]*)*)$")
+
+# legal characters and length of Kafka topic names
+TOPIC_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9._-]{1,249}$")
+
+TOPIC_SETTINGS = ("delivery_mode", "record_key")
+
+
+def check_delivery_mode(name: str, delivery_mode: str) -> str:
+    if delivery_mode not in DELIVERY_MODES:
+        raise ValueError(f"{name} must be one of {', '.join(DELIVERY_MODES)}, got {delivery_mode}")
+    return delivery_mode
+
+
+def check_record_key(name: str, record_key: str) -> str:
+    if not RECORD_KEY_PATTERN.match(record_key):
+        raise ValueError(f"{name} must be request-id, hash, header:<name> or json:<pointer>, got {record_key}")
+    return record_key
+
+
+def get_topic_names(node: Node, default_topic: str) -> List[str]:
+    """The default topic followed by the topics of P_TOPICS."""
+    topics = [default_topic]
+    for topic in str(get_paramter(node, P_TOPICS, "")).split(","):
+        topic = topic.strip()
+        if not topic or topic in topics:
+            continue
+        if not TOPIC_NAME_PATTERN.match(topic) or topic in (".", ".."):
+            raise ValueError(f"{P_TOPICS} must be Kafka topic names, got {topic}")
+        topics.append(topic)
+    return topics
+
+
+def get_topic_routes(node: Node, default_topic: str) -> Dict[str, Dict[str, str]]:
+    """Settings per allowed topic, a topic without settings keeps the ones of the function."""
+    topics = get_topic_names(node, default_topic)
+
+    config = get_paramter(node, P_TOPIC_CONFIG, {})
+    if isinstance(config, str):
+        try:
+            config = json.loads(config)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{P_TOPIC_CONFIG} must be a JSON object, got {config}") from e
+    if not isinstance(config, dict):
+        raise ValueError(f"{P_TOPIC_CONFIG} must be a JSON object, got {config}")
+
+    routes: Dict[str, Dict[str, str]] = {topic: {} for topic in topics}
+    for topic, settings in config.items():
+        if topic not in routes:
+            raise ValueError(f"{P_TOPIC_CONFIG} configures {topic}, which is not in {P_TOPICS}")
+        if not isinstance(settings, dict) or set(settings) - set(TOPIC_SETTINGS):
+            raise ValueError(f"{P_TOPIC_CONFIG} of {topic} may only set {', '.join(TOPIC_SETTINGS)}")
+        if "delivery_mode" in settings:
+            check_delivery_mode(f"{P_TOPIC_CONFIG} delivery_mode of {topic}", settings["delivery_mode"])
+        if "record_key" in settings:
+            check_record_key(f"{P_TOPIC_CONFIG} record_key of {topic}", settings["record_key"])
+        routes[topic] = dict(settings)
+    return routes
+
+
+def get_topic_environment(node: Node, default_topic: str) -> Dict[str, str]:
+    """Environment variables read by the TopicRouter of the producer Lambda."""
+    return {
+        "topic_name": default_topic,
+        "topics": json.dumps(get_topic_routes(node, default_topic), separators=(",", ":")),
+    }
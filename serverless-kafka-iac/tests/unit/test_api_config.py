@@ -0,0 +1,49 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import re
+
+import aws_cdk as core
+import pytest
+from serverless_kafka.api_config import (content_length_above,
+                                         get_api_stage_throttling,
+                                         get_max_body_bytes)
+
+
+@pytest.mark.parametrize("max_bytes", [1, 9, 100, 262144, 1048576])
+def test_content_length_above(max_bytes):
+
+    pattern = re.compile(content_length_above(max_bytes))
+
+    for content_length in [0, 1, max_bytes - 1, max_bytes, max_bytes + 1, 10 * max_bytes, 999999999]:
+        assert bool(pattern.match(str(content_length))) == (content_length > max_bytes)
+    assert pattern.match("000" + str(max_bytes + 1))
+
+
+def test_batch_throttling_only_with_batch_resource():
+
+    app = core.App(context={"P_API_RATE_LIMIT": "200", "P_API_BURST_LIMIT": "0"})
+
+    assert get_api_stage_throttling(app.node) == {"throttling_rate_limit": 200}
+    assert "method_options" in get_api_stage_throttling(app.node, batch_resource=True)
+
+
+@pytest.mark.parametrize(
+    "context",
+    [
+        {"P_API_RATE_LIMIT": "100", "P_API_BURST_LIMIT": "200"},
+        {"P_API_BATCH_RATE_LIMIT": "-1"},
+    ],
+)
+def test_invalid_throttling(context):
+
+    app = core.App(context=context)
+
+    with pytest.raises(ValueError):
+        get_api_stage_throttling(app.node, batch_resource=True)
+
+
+def test_max_body_bytes_within_api_gateway_limit():
+
+    with pytest.raises(ValueError):
+        get_max_body_bytes(core.App(context={"P_API_MAX_BODY_BYTES": str(11 * 1024 * 1024)}).node)
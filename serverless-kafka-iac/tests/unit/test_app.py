@@ -0,0 +1,31 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import aws_cdk as core
+from serverless_kafka.serverless_producer_stack import P_PRODUCER_PACKAGE
+
+from app import BACKEND_STACK, PRODUCER_STACK, create_stacks
+
+from .test_helpers import create_stub_package
+
+ENV = core.Environment(account="123456789012", region="eu-west-1")
+
+
+def test_standalone_skips_backend_stack(tmp_path):
+
+    app = core.App(
+        context={
+            P_PRODUCER_PACKAGE: create_stub_package(str(tmp_path)),
+            "MODE": "STANDALONE",
+            "KAFKA_VPC_ID": "vpc-0123abcd",
+            "KAFKA_SECURITY_GROUP_ID": "sg-0123abcd",
+            "MSK_ARN": "arn:aws:kafka:eu-west-1:123456789012:cluster/existing/11111111-aaaa",
+        }
+    )
+
+    create_stacks(app, ENV)
+    app.synth()
+
+    stacks = [child.node.id for child in app.node.children if isinstance(child, core.Stack)]
+    assert BACKEND_STACK not in stacks
+    assert PRODUCER_STACK in stacks
@@ -0,0 +1,87 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import aws_cdk as core
+import pytest
+from serverless_kafka.cluster_config import get_cluster_routing, get_clusters
+
+MSK_ARN = "arn:aws:kafka:eu-west-1:123456789012:cluster/first/11111111-aaaa"
+SECOND_ARN = "arn:aws:kafka:eu-west-1:123456789012:cluster/second/22222222-bbbb"
+
+
+def test_single_cluster_by_default():
+
+    app = core.App()
+
+    assert get_clusters(app.node, MSK_ARN) == [{"arn": MSK_ARN, "weight": 1}]
+    assert get_cluster_routing(app.node) == "key"
+
+
+def test_clusters_with_weights():
+
+    app = core.App(
+        context={
+            "P_MSK_CLUSTERS": f'[{{"arn": "{SECOND_ARN}", "weight": 3, "security_group_id": "sg-0123abcd"}},'
+            f' {{"arn": "{MSK_ARN}", "weight": 0}}]',
+            "P_CLUSTER_ROUTING": "weight",
+        }
+    )
+
+    assert get_clusters(app.node, MSK_ARN) == [
+        {"arn": MSK_ARN, "weight": 0},
+        {"arn": SECOND_ARN, "weight": 3, "security_group_id": "sg-0123abcd"},
+    ]
+    assert get_cluster_routing(app.node) == "weight"
+
+
+def test_self_sets_weight_of_unresolved_cluster_arn():
+
+    app = core.App(context={"P_MSK_CLUSTERS": [{"arn": "self", "weight": 2}, {"arn": SECOND_ARN}]})
+    stack = core.Stack(app, "clusters")
+    msk_arn = core.Fn.import_value("kafka-cluster-arn")
+
+    clusters = get_clusters(stack.node, msk_arn)
+
+    assert [cluster["weight"] for cluster in clusters] == [2, 1]
+    assert clusters[0]["arn"] == msk_arn
+    assert clusters[1]["arn"] == SECOND_ARN
+
+
+@pytest.mark.parametrize(
+    "clusters",
+    [
+        "second",
+        [{"weight": 2}],
+        [{"arn": "arn:aws:sqs:eu-west-1:123456789012:queue"}],
+        [{"arn": SECOND_ARN, "weight": -1}],
+        [{"arn": SECOND_ARN}, {"arn": SECOND_ARN}],
+        [{"arn": SECOND_ARN, "security_group_id": "default"}],
+        [{"arn": SECOND_ARN, "brokers": "b-1:9098"}],
+        [{"arn": SECOND_ARN, "weight": 0}, {"arn": MSK_ARN, "weight": 0}],
+        [{"arn": "self", "security_group_id": "sg-0123abcd"}],
+    ],
+)
+def test_invalid_clusters(clusters):
+
+    app = core.App(context={"P_MSK_CLUSTERS": clusters})
+
+    with pytest.raises(ValueError):
+        get_clusters(app.node, MSK_ARN)
+
+
+def test_security_groups_per_function():
+
+    clusters = [
+        {"arn": SECOND_ARN.replace("second", f"cluster{index}"), "security_group_id": f"sg-{index:08x}"}
+        for index in range(5)
+    ]
+    app = core.App(context={"P_MSK_CLUSTERS": clusters})
+
+    with pytest.raises(ValueError):
+        get_clusters(app.node, MSK_ARN)
+
+
+def test_invalid_cluster_routing():
+
+    with pytest.raises(ValueError):
+        get_cluster_routing(core.App(context={"P_CLUSTER_ROUTING": "round-robin"}).node)
@@ -0,0 +1,21 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from tools.cold_start_report import summarize
+
+
+def test_summarize_cold_starts_per_version():
+
+    reports = [
+        ("2022/12/24/[1]abc", "REPORT RequestId: a\tDuration: 900.00 ms\tBilled Duration: 900 ms\tMemory Size: 1024 MB\tMax Memory Used: 200 MB\tInit Duration: 4000.00 ms"),
+        ("2022/12/24/[1]abc", "REPORT RequestId: b\tDuration: 20.00 ms\tBilled Duration: 20 ms\tMemory Size: 1024 MB\tMax Memory Used: 200 MB"),
+        ("2022/12/24/[2]def", "REPORT RequestId: c\tDuration: 100.00 ms\tBilled Duration: 400 ms\tMemory Size: 1024 MB\tMax Memory Used: 200 MB\tRestore Duration: 300.00 ms\tBilled Restore Duration: 300 ms"),
+    ]
+
+    summary = summarize(reports)
+
+    assert summary["1"]["cold_starts"] == 1
+    assert summary["1"]["cold_start_ms_p50"] == 4000.0
+    assert summary["1"]["invocations"] == 2
+    assert summary["2"]["snapstart_restores"] == 1
+    assert summary["2"]["cold_start_ms_p50"] == 300.0
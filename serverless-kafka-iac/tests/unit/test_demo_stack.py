@@ -75,3 +75,11 @@ def testest_kafka_backend_demo_stack_no_errors(demo_stack):
     log.error(errors)
 
     assert not errors
+
+
+def test_topic_replication_factor_is_bounded_by_brokers():
+
+    app = core.App(context={"P_TOPIC_REPLICATION_FACTOR": 4})
+
+    with pytest.raises(ValueError):
+        KafkaDemoBackendStack(app, "kafkaBackendDemoStack", "messages")
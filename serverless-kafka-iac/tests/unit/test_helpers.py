@@ -1,6 +1,9 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: MIT-0
 
+import os
+import zipfile
+
 from cdk_nag import NagPackSuppression, NagSuppressions
 from constructs import IConstruct
 
@@ -12,3 +15,11 @@ def add_resource_suppressions(cdk_node:IConstruct, list_of_supression_tuples):
         apply_to_children=True,
     )
 
+
+def create_stub_package(directory: str) -> str:
+    """Zip file passed as P_PRODUCER_PACKAGE, so the stacks synthesize without building
+    the Java project in Docker."""
+    path = os.path.join(directory, "ApiGatewayLambdaProxy.zip")
+    with zipfile.ZipFile(path, "w") as package:
+        package.writestr("stub.txt", "Stub package of the unit tests, the Java project is not built")
+    return path
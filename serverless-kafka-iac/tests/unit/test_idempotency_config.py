@@ -0,0 +1,40 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import aws_cdk as core
+import pytest
+from serverless_kafka.idempotency_config import get_idempotency_environment
+
+
+def test_default_idempotency_environment():
+
+    app = core.App()
+
+    assert get_idempotency_environment(app.node) == {
+        "idempotency_header": "Idempotency-Key",
+        "idempotency_cache_size": "10000",
+        "idempotency_ttl_seconds": "600",
+    }
+
+
+def test_idempotency_header_can_be_switched_off():
+
+    app = core.App(context={"P_IDEMPOTENCY_HEADER": "none"})
+
+    assert get_idempotency_environment(app.node)["idempotency_header"] == ""
+
+
+@pytest.mark.parametrize(
+    "context",
+    [
+        {"P_IDEMPOTENCY_HEADER": "Idempotency Key"},
+        {"P_IDEMPOTENCY_CACHE_SIZE": "0"},
+        {"P_IDEMPOTENCY_TTL_SECONDS": "-1"},
+    ],
+)
+def test_invalid_idempotency_config(context):
+
+    app = core.App(context=context)
+
+    with pytest.raises(ValueError):
+        get_idempotency_environment(app.node)
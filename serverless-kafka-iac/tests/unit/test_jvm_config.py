@@ -0,0 +1,52 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import aws_cdk as core
+import pytest
+from serverless_kafka.jvm_config import get_jvm_environment
+
+
+def test_default_profile_stops_at_c1():
+
+    app = core.App()
+
+    assert get_jvm_environment(app.node) == {
+        "JAVA_TOOL_OPTIONS": "-XX:+TieredCompilation -XX:TieredStopAtLevel=1 -XX:+UseSerialGC -Xshare:auto"
+    }
+
+
+def test_throughput_profile_with_extra_options():
+
+    app = core.App(context={"P_JVM_PROFILE": "Throughput", "P_JVM_OPTIONS": "-XX:MaxRAMPercentage=60"})
+
+    options = get_jvm_environment(app.node)["JAVA_TOOL_OPTIONS"].split()
+
+    assert "-XX:TieredStopAtLevel=1" not in options
+    assert "-XX:+UseParallelGC" in options
+    # the extra options come last and override the profile
+    assert options[-1] == "-XX:MaxRAMPercentage=60"
+
+
+@pytest.mark.parametrize(
+    "context",
+    [
+        {"P_JVM_PROFILE": "graal"},
+        {"P_JVM_OPTIONS": "-Xmx256m MaxRAMPercentage=60"},
+    ],
+)
+def test_invalid_jvm_config(context):
+
+    app = core.App(context=context)
+
+    with pytest.raises(ValueError):
+        get_jvm_environment(app.node)
+
+
+def test_appcds_archive_replaces_default_archive():
+
+    app = core.App(context={"P_APPCDS": "true"})
+
+    assert get_jvm_environment(app.node) == {
+        "JAVA_TOOL_OPTIONS": "-XX:+TieredCompilation -XX:TieredStopAtLevel=1 -XX:+UseSerialGC "
+        "-XX:SharedArchiveFile=/var/task/appcds.jsa -Xshare:auto"
+    }
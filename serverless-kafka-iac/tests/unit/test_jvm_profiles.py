@@ -0,0 +1,44 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import pytest
+from tools.jvm_profiles import benchmark_command, compare
+
+
+def report(profile, cold_request_ms, throughput):
+    return {
+        "jvmProfile": profile,
+        "coldRequestMs": cold_request_ms,
+        "results": [
+            {
+                "config": "default",
+                "payloadBytes": 1024,
+                "concurrency": 4,
+                "throughputPerSecond": throughput,
+                "latencyMsP50": 1.5,
+                "latencyMsP99": 4.0,
+                "allocatedBytesPerRequest": 20000,
+            }
+        ],
+    }
+
+
+def test_benchmark_command_passes_profile_options():
+
+    command = benchmark_command("cold-start", ["-Dbenchmark.concurrency=1"])
+
+    assert command[:3] == ["mvn", "-Pbenchmark", "test"]
+    assert "-Dbenchmark.jvmOptions=-XX:+TieredCompilation -XX:TieredStopAtLevel=1 -XX:+UseSerialGC -Xshare:auto" in command
+    assert command[-1] == "-Dbenchmark.concurrency=1"
+
+    with pytest.raises(ValueError):
+        benchmark_command("graal", [])
+
+
+def test_compare_marks_highest_throughput():
+
+    rows = compare([report("cold-start", 900.0, 4000.0), report("throughput", 1400.0, 6500.0)])
+
+    assert [(row["profile"], row["best"]) for row in rows] == [("cold-start", False), ("throughput", True)]
+    assert rows[0]["scenario"] == "default 1024B x4"
+    assert rows[0]["cold_request_ms"] == 900.0
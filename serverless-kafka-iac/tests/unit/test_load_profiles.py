@@ -0,0 +1,64 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+
+from tools.load_profiles import analyze_report, generate_profiles, read_stack_limits
+
+TEMPLATE = {
+    "Resources": {
+        "KafkaProducer": {
+            "Type": "AWS::Lambda::Function",
+            "Properties": {
+                "Handler": "software.amazon.samples.kafka.lambda.SimpleApiGatewayKafkaProxy::handleRequest",
+                "ReservedConcurrentExecutions": 60,
+            },
+        },
+        "ScalingTarget": {
+            "Type": "AWS::ApplicationAutoScaling::ScalableTarget",
+            "Properties": {"MinCapacity": 20, "MaxCapacity": 60},
+        },
+    }
+}
+
+
+def test_generate_profiles_from_template():
+
+    limits = read_stack_limits(TEMPLATE)
+    profiles = generate_profiles(limits, "https://abc.execute-api.eu-central-1.amazonaws.com/prod/", 50, 10)
+
+    assert limits == {"reserved_concurrency": 60, "provisioned_min": 20, "provisioned_max": 60}
+    assert set(profiles) == {"ramp", "soak", "spike", "step-to-saturation"}
+
+    ramp = profiles["ramp"]
+    assert ramp["config"]["target"] == "https://abc.execute-api.eu-central-1.amazonaws.com"
+    assert ramp["config"]["phases"][1]["rampTo"] == 1200
+    assert ramp["config"]["phases"][0]["arrivalRate"] == 400
+    post = ramp["scenarios"][0]["flow"][0]["post"]
+    assert post["url"] == "/prod/"
+    # the request validator of the API requires a Content-Type and a JSON body
+    assert post["headers"] == {"Content-Type": "application/json"}
+    assert json.loads(post["body"]) == "x" * 8
+
+
+def test_analyze_report():
+
+    def window(second, ok, failed=0):
+        return {"period": str(1_000_000 + second * 1000), "counters": {"http.codes.200": ok, "http.codes.502": failed}}
+
+    report = {
+        "intermediate": [
+            window(0, 100),
+            window(10, 200),
+            window(20, 300),
+            window(30, 400),
+            window(40, 450, failed=50),
+        ]
+    }
+
+    result = analyze_report(report)
+
+    assert result["window_seconds"] == 10
+    assert result["sustained_msgs_per_second"] == 20
+    assert result["error_onset"]["seconds_after_start"] == 40
+    assert result["error_onset"]["requests_per_second"] == 50
@@ -0,0 +1,64 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import aws_cdk as core
+import pytest
+from aws_cdk import aws_apigateway as apig
+from serverless_kafka.logging_config import (get_api_stage_logging,
+                                             get_logging_environment)
+
+
+def test_default_logging():
+
+    app = core.App()
+
+    assert get_logging_environment(app.node) == {
+        "POWERTOOLS_LOG_LEVEL": "INFO",
+        "log_appender": "JsonAppender",
+    }
+    assert get_api_stage_logging(app.node) == {
+        "logging_level": apig.MethodLoggingLevel.INFO,
+        "data_trace_enabled": True,
+    }
+
+
+def test_sampled_async_logging():
+
+    app = core.App(
+        context={
+            "P_LOG_LEVEL": "warn",
+            "P_LOG_SAMPLE_RATE": "0.05",
+            "P_LOG_APPENDER": "async",
+            "P_API_LOGGING_LEVEL": "error",
+            "P_API_DATA_TRACE": "false",
+        }
+    )
+
+    assert get_logging_environment(app.node) == {
+        "POWERTOOLS_LOG_LEVEL": "WARN",
+        "POWERTOOLS_LOGGER_SAMPLE_RATE": "0.05",
+        "log_appender": "AsyncJsonAppender",
+    }
+    assert get_api_stage_logging(app.node) == {
+        "logging_level": apig.MethodLoggingLevel.ERROR,
+        "data_trace_enabled": False,
+    }
+
+
+@pytest.mark.parametrize(
+    "context",
+    [
+        {"P_LOG_LEVEL": "TRACE"},
+        {"P_LOG_SAMPLE_RATE": "2"},
+        {"P_LOG_SAMPLE_RATE": "often"},
+        {"P_LOG_APPENDER": "file"},
+        {"P_API_LOGGING_LEVEL": "DEBUG"},
+    ],
+)
+def test_invalid_logging_config(context):
+
+    app = core.App(context=context)
+
+    with pytest.raises(ValueError):
+        get_logging_environment(app.node)
+        get_api_stage_logging(app.node)
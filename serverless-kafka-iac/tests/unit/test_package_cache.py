@@ -0,0 +1,45 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from serverless_kafka.package_cache import (cached_package, package_file_name,
+                                            source_files, source_hash)
+
+
+def java_project(tmp_path):
+    (tmp_path / "src" / "main" / "java").mkdir(parents=True)
+    (tmp_path / "src" / "test").mkdir(parents=True)
+    (tmp_path / "target").mkdir()
+    (tmp_path / "pom.xml").write_text("<project/>")
+    (tmp_path / "src" / "main" / "java" / "Handler.java").write_text("class Handler {}")
+    (tmp_path / "src" / "test" / "HandlerTest.java").write_text("class HandlerTest {}")
+    (tmp_path / "target" / "ApiGatewayLambdaProxy.zip").write_bytes(b"zip")
+    return tmp_path
+
+
+def test_hash_covers_build_inputs_only(tmp_path):
+
+    project = java_project(tmp_path)
+    package_hash = source_hash(str(project), ["mvn install"])
+
+    assert source_files(str(project)) == ["pom.xml", "src/main/java/Handler.java"]
+
+    # tests and build output are not part of the package
+    (project / "src" / "test" / "HandlerTest.java").write_text("class HandlerTest { }")
+    (project / "target" / "ApiGatewayLambdaProxy.zip").write_bytes(b"other zip")
+    assert source_hash(str(project), ["mvn install"]) == package_hash
+
+    assert source_hash(str(project), ["mvn install && sh appcds.sh"]) != package_hash
+
+    (project / "src" / "main" / "java" / "Handler.java").write_text("class Handler { }")
+    assert source_hash(str(project), ["mvn install"]) != package_hash
+
+
+def test_cached_package(tmp_path):
+
+    package_hash = "ab" * 32
+
+    assert cached_package(str(tmp_path), package_hash) is None
+
+    (tmp_path / package_file_name(package_hash)).write_bytes(b"zip")
+
+    assert cached_package(str(tmp_path), package_hash) == str(tmp_path / f"ApiGatewayLambdaProxy-{'ab' * 16}.zip")
@@ -0,0 +1,60 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import pytest
+from tools.power_tuning import (cost_per_million, measure_benchmark,
+                                measure_reports, plan, rank)
+
+
+def test_plan_covers_grid():
+
+    variants = plan([1024, 1769], ["x86_64", "arm64"])
+
+    assert [variant["variant"] for variant in variants] == ["x86_64-1024", "x86_64-1769", "arm64-1024", "arm64-1769"]
+    assert "-c P_MEMORY_SIZE=1769 -c P_ARCHITECTURE=arm64" in variants[3]["deploy"]
+
+    with pytest.raises(ValueError):
+        plan([1024], ["sparc"])
+
+
+def test_cost_per_million():
+
+    # 1M requests at 0.20 USD plus 100000 GB-seconds
+    assert cost_per_million(1024, "x86_64", 100) == pytest.approx(0.2 + 1.66667, rel=1e-4)
+    assert cost_per_million(1024, "arm64", 100) < cost_per_million(1024, "x86_64", 100)
+    assert cost_per_million(1024, "x86_64", 100, messages_per_invocation=10) == pytest.approx(
+        cost_per_million(1024, "x86_64", 100) / 10
+    )
+
+
+def test_measure_reports_per_memory_size():
+
+    reports = [
+        ("s", "REPORT RequestId: a\tDuration: 20.50 ms\tBilled Duration: 21 ms\tMemory Size: 1024 MB\tMax Memory Used: 200 MB"),
+        ("s", "REPORT RequestId: b\tDuration: 30.50 ms\tBilled Duration: 31 ms\tMemory Size: 1024 MB\tMax Memory Used: 200 MB"),
+        ("s", "REPORT RequestId: c\tDuration: 10.00 ms\tBilled Duration: 10 ms\tMemory Size: 2048 MB\tMax Memory Used: 200 MB"),
+    ]
+
+    results = measure_reports(reports, "arm64")
+
+    assert [entry["variant"] for entry in results] == ["arm64-1024", "arm64-2048"]
+    assert results[0]["invocations"] == 2
+    assert results[0]["billed_ms_avg"] == 26
+    # twice the memory at less than half the duration is cheaper
+    assert rank(results)[0]["variant"] == "arm64-2048"
+
+
+def test_measure_benchmark():
+
+    report = {
+        "results": [
+            {"config": "default", "payloadBytes": 100, "concurrency": 1, "requests": 2000, "latencyMsP50": 2.2, "latencyMsP99": 9.0},
+            {"config": "linger5", "payloadBytes": 100, "concurrency": 1, "requests": 2000, "latencyMsP50": 7.1, "latencyMsP99": 12.0},
+        ]
+    }
+
+    results = measure_benchmark(report, 1769, "x86_64", config="default")
+
+    assert len(results) == 1
+    assert results[0]["billed_ms_avg"] == 3
+    assert results[0]["scenario"] == "default 100B x1"
@@ -0,0 +1,56 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from datetime import datetime, timezone
+
+from tools.prewarm_schedule import (cron_expression, derive_schedule,
+                                    format_schedule, hourly_profile,
+                                    required_capacity)
+
+
+def test_hourly_profile_per_hour_of_week():
+
+    datapoints = [
+        # Mondays 08:00 UTC of two weeks
+        (datetime(2022, 12, 19, 8, tzinfo=timezone.utc), 10.0),
+        (datetime(2022, 12, 26, 8, tzinfo=timezone.utc), 30.0),
+        # Sunday 23:00 UTC
+        (datetime(2022, 12, 25, 23, tzinfo=timezone.utc), 4.0),
+    ]
+
+    assert hourly_profile(datapoints, percent=100) == {8: 30.0, 6 * 24 + 23: 4.0}
+
+
+def test_required_capacity_rounds_up_to_step():
+
+    assert required_capacity(14, 0.7, 5, 1, 60) == 20
+    assert required_capacity(15, 0.7, 5, 1, 60) == 25
+    assert required_capacity(0, 0.7, 5, 2, 60) == 2
+    assert required_capacity(100, 0.7, 5, 1, 60) == 60
+
+
+def test_cron_expression_wraps_around_the_week():
+
+    assert cron_expression(8 * 60 - 15) == "cron(45 7 ? * MON *)"
+    assert cron_expression(-15) == "cron(45 23 ? * SUN *)"
+
+
+def test_derive_schedule_pre_warms_weekday_peaks():
+
+    # 14 concurrent executions from 08:00 to 17:59 on weekdays
+    profile = {day * 24 + hour: 14.0 for day in range(5) for hour in range(8, 18)}
+
+    actions = derive_schedule(profile, utilization_target=0.7, min_capacity=1, max_capacity=60, lead_minutes=15)
+
+    assert len(actions) == 10
+    assert actions[0]["expression"] == "cron(45 7 ? * MON *)"
+    assert actions[0]["min_capacity"] == 20
+    # scale-downs are not brought forward
+    assert actions[1]["expression"] == "cron(0 18 ? * MON *)"
+    assert actions[1]["min_capacity"] == 1
+    assert format_schedule(actions[:2], 60) == "cron(45 7 ? * MON *)=20:60;cron(0 18 ? * MON *)=1:60"
+
+
+def test_flat_traffic_needs_no_schedule():
+
+    assert derive_schedule({hour: 3.0 for hour in range(7 * 24)}) == []
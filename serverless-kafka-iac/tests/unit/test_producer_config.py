@@ -0,0 +1,115 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import aws_cdk as core
+import pytest
+from serverless_kafka.producer_config import (DEFAULT_CLIENT_METRICS,
+                                              get_client_metrics,
+                                              get_client_metrics_environment,
+                                              get_producer_config,
+                                              to_environment,
+                                              validate_producer_config)
+
+
+def test_valid_producer_config():
+
+    validate_producer_config(
+        {
+            "acks": "all",
+            "enable.idempotence": "true",
+            "linger.ms": "5",
+            "batch.size": "65536",
+            "compression.type": "lz4",
+            "max.in.flight.requests.per.connection": "5",
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"enable.idempotence": "true", "acks": "1"},
+        {"enable.idempotence": "true", "max.in.flight.requests.per.connection": "10"},
+        {"compression.type": "brotli"},
+        {"linger.ms": "-1"},
+        {"acks": "2"},
+    ],
+)
+def test_invalid_producer_config(config):
+
+    with pytest.raises(ValueError):
+        validate_producer_config(config)
+
+
+def test_producer_config_environment():
+
+    assert to_environment({"linger.ms": "5", "compression.type": "lz4"}) == {
+        "kafka_linger_ms": "5",
+        "kafka_compression_type": "lz4",
+    }
+
+
+def test_partitioner_names_map_to_classes():
+
+    app = core.App(context={"P_PARTITIONER": "round-robin"})
+
+    assert get_producer_config(app.node) == {
+        "partitioner.class": "org.apache.kafka.clients.producer.RoundRobinPartitioner"
+    }
+
+
+def test_idempotence_switched_off_for_weaker_acks():
+
+    app = core.App(context={"P_ACKS": "1"})
+
+    assert get_producer_config(app.node) == {"acks": "1", "enable.idempotence": "false"}
+
+    app = core.App(context={"P_ACKS": "1", "P_ENABLE_IDEMPOTENCE": "true"})
+
+    with pytest.raises(ValueError):
+        get_producer_config(app.node)
+
+
+def test_false_and_zero_from_cdk_json_are_kept():
+
+    app = core.App(context={"P_ENABLE_IDEMPOTENCE": False, "P_LINGER_MS": 0})
+
+    assert to_environment(get_producer_config(app.node)) == {
+        "kafka_enable_idempotence": "false",
+        "kafka_linger_ms": "0",
+    }
+
+
+def test_unknown_partitioner():
+
+    app = core.App(context={"P_PARTITIONER": "random"})
+
+    with pytest.raises(ValueError):
+        get_producer_config(app.node)
+
+
+def test_client_metrics_environment():
+
+    app = core.App(
+        context={
+            "P_CLIENT_METRICS": "record-queue-time-max, batch-size-avg",
+            "P_CLIENT_METRICS_INTERVAL_SECONDS": "0",
+        }
+    )
+
+    assert get_client_metrics_environment(app.node) == {
+        "client_metrics": "record-queue-time-max,batch-size-avg",
+        "client_metrics_interval_seconds": "0",
+    }
+    assert get_client_metrics(core.App().node) == []
+    assert get_client_metrics(core.App(context={"P_CLIENT_METRICS": "default"}).node) == list(
+        DEFAULT_CLIENT_METRICS
+    )
+
+
+def test_invalid_client_metric_name():
+
+    app = core.App(context={"P_CLIENT_METRICS": "batch.size.avg"})
+
+    with pytest.raises(ValueError):
+        get_client_metrics(app.node)
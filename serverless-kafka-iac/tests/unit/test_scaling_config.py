@@ -0,0 +1,70 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import aws_cdk as core
+import pytest
+from serverless_kafka.scaling_config import (get_provisioned_scaling,
+                                             parse_schedule)
+
+
+def test_default_scaling_tracks_utilization():
+
+    app = core.App()
+
+    assert get_provisioned_scaling(app.node, fast_start=False, max_concurrency=60) == {
+        "min_capacity": 20,
+        "max_capacity": 60,
+        "utilization_target": 0.7,
+        "schedule": [],
+    }
+
+
+def test_fast_start_has_no_provisioned_concurrency():
+
+    app = core.App()
+
+    assert get_provisioned_scaling(app.node, fast_start=True, max_concurrency=60) is None
+
+
+def test_schedule_keeps_previous_maximum():
+
+    app = core.App(
+        context={
+            "P_PROVISIONED_CONCURRENCY": "2",
+            "P_PROVISIONED_MAX_CONCURRENCY": "40",
+            "P_PROVISIONED_SCHEDULE": "cron(45 6 ? * MON-FRI *)=30:80; cron(0 20 ? * MON-FRI *)=2",
+        }
+    )
+
+    scaling = get_provisioned_scaling(app.node, fast_start=False, max_concurrency=100)
+
+    assert scaling["schedule"] == [
+        {"expression": "cron(45 6 ? * MON-FRI *)", "min_capacity": 30, "max_capacity": 80},
+        {"expression": "cron(0 20 ? * MON-FRI *)", "min_capacity": 2, "max_capacity": 80},
+    ]
+
+
+def test_parse_schedule_rejects_malformed_entries():
+
+    with pytest.raises(ValueError):
+        parse_schedule("0 7 * * MON=30")
+
+
+@pytest.mark.parametrize(
+    "context, fast_start",
+    [
+        ({"P_PROVISIONED_MAX_CONCURRENCY": "100"}, False),
+        ({"P_PROVISIONED_CONCURRENCY": "70"}, False),
+        ({"P_PROVISIONED_SCHEDULE": "cron(0 7 ? * MON *)=30:100"}, False),
+        ({"P_PROVISIONED_SCHEDULE": "cron(0 7 ? * MON *)=0"}, False),
+        ({"P_PROVISIONED_UTILIZATION_TARGET": "1.5"}, False),
+        ({"P_PROVISIONED_CONCURRENCY": "5"}, True),
+        ({"P_PROVISIONED_SCHEDULE": "cron(0 7 ? * MON *)=30"}, True),
+    ],
+)
+def test_invalid_scaling_config(context, fast_start):
+
+    app = core.App(context=context)
+
+    with pytest.raises(ValueError):
+        get_provisioned_scaling(app.node, fast_start=fast_start, max_concurrency=60)
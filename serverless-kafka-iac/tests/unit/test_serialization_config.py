@@ -0,0 +1,53 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import aws_cdk as core
+import pytest
+from serverless_kafka.serialization_config import (
+    get_schema_directory, get_serialization_environment)
+
+
+def test_serialization_disabled_by_default():
+
+    app = core.App()
+
+    assert get_schema_directory(app.node) is None
+    assert get_serialization_environment(app.node) == {}
+
+
+def test_serialization_environment(tmp_path):
+
+    app = core.App(
+        context={
+            "P_SERIALIZATION": "avro",
+            "P_SCHEMA_DIR": str(tmp_path),
+            "P_SCHEMA_NAME": "order",
+        }
+    )
+
+    assert get_schema_directory(app.node) == str(tmp_path)
+    assert get_serialization_environment(app.node) == {
+        "serialization_format": "avro",
+        "schema_directory": "/opt",
+        "schema_name": "order",
+        "schema_cache_size": "32",
+    }
+
+
+@pytest.mark.parametrize(
+    "context",
+    [
+        {"P_SERIALIZATION": "thrift"},
+        {"P_SERIALIZATION": "avro", "P_SCHEMA_DIR": "does-not-exist"},
+        {"P_SERIALIZATION": "protobuf", "P_SCHEMA_NAME": "../order"},
+        {"P_SERIALIZATION": "avro", "P_SCHEMA_CACHE_SIZE": "0"},
+    ],
+)
+def test_invalid_serialization_config(context, tmp_path):
+
+    context.setdefault("P_SCHEMA_DIR", str(tmp_path))
+    app = core.App(context=context)
+
+    with pytest.raises(ValueError):
+        get_schema_directory(app.node)
+        get_serialization_environment(app.node)
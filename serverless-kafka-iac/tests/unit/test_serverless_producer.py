@@ -3,6 +3,8 @@
 
 
 import logging as log
+import os
+import time
 
 import aws_cdk as core
 import aws_cdk.assertions as assertions
@@ -13,12 +15,22 @@ from cdk_nag import AwsSolutionsChecks
 from constructs import Construct, IConstruct
 from serverless_kafka.demo_stack import KafkaDemoBackendStack
 from serverless_kafka.serverless_producer_stack import (
-    CUSTOM_RESOURCE_PHYISCAL_FUNCTION_NAME, ServerlessKafkaProducerStack)
+    CUSTOM_RESOURCE_PHYISCAL_FUNCTION_NAME, P_PRODUCER_PACKAGE,
+    ServerlessKafkaProducerStack)
 
-from .test_helpers import add_resource_suppressions
+from .test_helpers import add_resource_suppressions, create_stub_package
 
 log.basicConfig(level=log.INFO)
 
+# upper bound of the synth of both stacks with the stub package, guards against slow synths
+SYNTH_TIME_BUDGET_SECONDS = float(os.getenv("SYNTH_TIME_BUDGET_SECONDS", "30"))
+
+
+@pytest.fixture(scope="session")
+def stub_package(tmp_path_factory) -> str:
+    return create_stub_package(str(tmp_path_factory.mktemp("package")))
+
+
 '''
 ServerlessKafkaProducerStack
 ├─ KafkaProducer LambdaFunction
@@ -28,9 +40,9 @@ ServerlessKafkaProducerStack
 ├─ lambda function as part of the CustomResource construct to read the bootstrap url
 '''
 @pytest.fixture(scope="session")
-def demo_stack() -> ServerlessKafkaProducerStack:
+def demo_stack(stub_package) -> ServerlessKafkaProducerStack:
 
-    app = core.App()
+    app = core.App(context={P_PRODUCER_PACKAGE: stub_package})
 
     backend_stack = KafkaDemoBackendStack(app, "kafkaBackendDemoStack", "messages")
 
@@ -71,11 +83,6 @@ def demo_stack() -> ServerlessKafkaProducerStack:
             "AwsSolutions-IAM4",
             "We are using the AWS Managed PushToCloudWatchLogs, LambdaVPCAccessExecutingRole",
         ),
-        ("AwsSolutions-APIG3", "It is a example application, API will only "),
-        (
-            "AwsSolutions-APIG2",
-            "We do not use request validation for the example ping pong application ",
-        ),
         ("AwsSolutions-APIG4", "We do not use authorization for APIGW"),
         (
             "AwsSolutions-COG4",
@@ -169,3 +176,139 @@ def test_serverless_producer_stack_errors(demo_stack):
     log.error(error)
 
     assert not error
+
+
+def test_api_validates_requests(demo_stack):
+
+    template = assertions.Template.from_stack(demo_stack)
+
+    template.has_resource_properties(
+        "AWS::ApiGateway::RequestValidator",
+        {"ValidateRequestBody": True, "ValidateRequestParameters": True},
+    )
+    template.has_resource_properties(
+        "AWS::ApiGateway::Model",
+        {"Schema": assertions.Match.object_like({"type": "array", "minItems": 1, "maxItems": 500})},
+    )
+    methods = template.find_resources(
+        "AWS::ApiGateway::Method", {"Properties": {"HttpMethod": "POST"}}
+    )
+    # POST /, /batch, /topics/{topic} and /topics/{topic}/batch
+    assert len(methods) == 4
+    for method in methods.values():
+        assert method["Properties"]["RequestParameters"] == {"method.request.header.Content-Type": True}
+        assert "application/json" in method["Properties"]["RequestModels"]
+
+
+def test_api_throttles_and_validates_requests(demo_stack):
+
+    template = assertions.Template.from_stack(demo_stack)
+
+    template.has_resource_properties(
+        "AWS::ApiGateway::Stage",
+        {
+            "MethodSettings": assertions.Match.array_with(
+                [
+                    assertions.Match.object_like(
+                        {"HttpMethod": "*", "ThrottlingRateLimit": 1000, "ThrottlingBurstLimit": 500}
+                    ),
+                    assertions.Match.object_like(
+                        {"ResourcePath": "/~1batch", "ThrottlingRateLimit": 100, "ThrottlingBurstLimit": 50}
+                    ),
+                    assertions.Match.object_like(
+                        {
+                            "ResourcePath": "/~1topics~1{topic}~1batch",
+                            "ThrottlingRateLimit": 100,
+                            "ThrottlingBurstLimit": 50,
+                        }
+                    ),
+                ]
+            )
+        },
+    )
+    # the web ACL is opt-in
+    template.resource_count_is("AWS::WAFv2::WebACL", 0)
+
+
+def test_api_blocks_oversized_requests(stub_package):
+
+    app = core.App(context={P_PRODUCER_PACKAGE: stub_package, "P_API_MAX_BODY_BYTES": "6291456"})
+    backend_stack = KafkaDemoBackendStack(app, "kafkaBackendDemoStack", "messages")
+    kafka_producer = ServerlessKafkaProducerStack(
+        app,
+        "teststack",
+        backend_stack.kafka_vpc,
+        backend_stack.kafka_security_group,
+        backend_stack.msk_arn,
+        "messages",
+    )
+
+    template = assertions.Template.from_stack(kafka_producer)
+    template.has_resource_properties(
+        "AWS::WAFv2::WebACL",
+        {
+            "Scope": "REGIONAL",
+            "Rules": [
+                assertions.Match.object_like(
+                    {
+                        "Action": {"Block": {}},
+                        "Statement": {
+                            "RegexMatchStatement": assertions.Match.object_like(
+                                {"FieldToMatch": {"SingleHeader": {"Name": "content-length"}}}
+                            )
+                        },
+                    }
+                )
+            ],
+        },
+    )
+    template.resource_count_is("AWS::WAFv2::WebACLAssociation", 1)
+
+
+def test_kinesis_buffer_has_dead_letter_queue(stub_package):
+
+    app = core.App(context={P_PRODUCER_PACKAGE: stub_package, "P_INGEST_MODE": "kinesis"})
+    backend_stack = KafkaDemoBackendStack(app, "kafkaBackendDemoStack", "messages")
+    kafka_producer = ServerlessKafkaProducerStack(
+        app,
+        "teststack",
+        backend_stack.kafka_vpc,
+        backend_stack.kafka_security_group,
+        backend_stack.msk_arn,
+        "messages",
+    )
+
+    template = assertions.Template.from_stack(kafka_producer)
+    template.has_resource_properties(
+        "AWS::Lambda::EventSourceMapping",
+        {
+            "MaximumRetryAttempts": 10,
+            "DestinationConfig": {
+                "OnFailure": {
+                    "Destination": {"Fn::GetAtt": [assertions.Match.string_like_regexp("ingestdeadletterqueue"), "Arn"]}
+                }
+            },
+        },
+    )
+
+
+def test_synth_time_budget(stub_package):
+
+    started = time.perf_counter()
+
+    app = core.App(context={P_PRODUCER_PACKAGE: stub_package})
+    backend_stack = KafkaDemoBackendStack(app, "kafkaBackendDemoStack", "messages")
+    ServerlessKafkaProducerStack(
+        app,
+        "teststack",
+        backend_stack.kafka_vpc,
+        backend_stack.kafka_security_group,
+        backend_stack.msk_arn,
+        "messages",
+    )
+    app.synth()
+
+    elapsed = time.perf_counter() - started
+    log.info(f"Synthesized both stacks in {elapsed:.1f} s")
+
+    assert elapsed < SYNTH_TIME_BUDGET_SECONDS
@@ -0,0 +1,60 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+
+import aws_cdk as core
+import pytest
+from serverless_kafka.topic_config import (get_topic_environment,
+                                           get_topic_names, get_topic_routes)
+
+
+def test_default_topic_only():
+
+    app = core.App()
+
+    assert get_topic_environment(app.node, "messages") == {"topic_name": "messages", "topics": '{"messages":{}}'}
+
+
+def test_topics_with_settings():
+
+    app = core.App(
+        context={
+            "P_TOPICS": "orders, clicks,messages",
+            "P_TOPIC_CONFIG": '{"orders": {"delivery_mode": "sync", "record_key": "json:/customer/id"}}',
+        }
+    )
+
+    assert get_topic_names(app.node, "messages") == ["messages", "orders", "clicks"]
+    assert json.loads(get_topic_environment(app.node, "messages")["topics"]) == {
+        "messages": {},
+        "orders": {"delivery_mode": "sync", "record_key": "json:/customer/id"},
+        "clicks": {},
+    }
+
+
+def test_topic_config_from_context_object():
+
+    app = core.App(context={"P_TOPICS": "clicks", "P_TOPIC_CONFIG": {"clicks": {"delivery_mode": "fire-and-forget"}}})
+
+    assert get_topic_routes(app.node, "messages")["clicks"] == {"delivery_mode": "fire-and-forget"}
+
+
+@pytest.mark.parametrize(
+    "context",
+    [
+        {"P_TOPICS": "orders/eu"},
+        {"P_TOPICS": ".."},
+        {"P_TOPIC_CONFIG": '{"orders": {}}'},
+        {"P_TOPIC_CONFIG": "orders"},
+        {"P_TOPICS": "orders", "P_TOPIC_CONFIG": '{"orders": {"delivery_mode": "eventually"}}'},
+        {"P_TOPICS": "orders", "P_TOPIC_CONFIG": '{"orders": {"record_key": "cookie:session"}}'},
+        {"P_TOPICS": "orders", "P_TOPIC_CONFIG": '{"orders": {"linger.ms": "5"}}'},
+    ],
+)
+def test_invalid_topic_config(context):
+
+    app = core.App(context=context)
+
+    with pytest.raises(ValueError):
+        get_topic_routes(app.node, "messages")
@@ -0,0 +1,88 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Reports the cold start duration of the producer Lambda per published version.
+
+Deploy the stack without and with -c P_FAST_START=true, put some load on both versions
+and compare the init (on demand) and restore (SnapStart) durations:
+
+    python -m tools.cold_start_report --function-name <KafkaProducer function name> --hours 24
+"""
+import argparse
+import json
+import re
+import time
+from statistics import median
+from typing import Dict, Iterable, List, Tuple
+
+INIT_DURATION = re.compile(r"Init Duration: ([0-9.]+) ms")
+RESTORE_DURATION = re.compile(r"Restore Duration: ([0-9.]+) ms")
+DURATION = re.compile(r"\tDuration: ([0-9.]+) ms")
+# log stream names look like 2022/12/24/[12]0123456789abcdef
+LOG_STREAM_VERSION = re.compile(r"\[([^\]]+)\]")
+
+
+def percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(reports: Iterable[Tuple[str, str]]) -> Dict[str, dict]:
+    """Aggregates Lambda REPORT log lines, given as (log stream name, message), per version."""
+    versions: Dict[str, Dict[str, List[float]]] = {}
+
+    for log_stream, message in reports:
+        match = LOG_STREAM_VERSION.search(log_stream)
+        version = match.group(1) if match else "unknown"
+        stats = versions.setdefault(version, {"init": [], "restore": [], "duration": []})
+
+        for key, pattern in (("init", INIT_DURATION), ("restore", RESTORE_DURATION), ("duration", DURATION)):
+            value = pattern.search(message)
+            if value:
+                stats[key].append(float(value.group(1)))
+
+    summary = {}
+    for version, stats in versions.items():
+        cold_starts = stats["init"] + stats["restore"]
+        summary[version] = {
+            "invocations": len(stats["duration"]),
+            "cold_starts": len(cold_starts),
+            "snapstart_restores": len(stats["restore"]),
+            "cold_start_ms_p50": median(cold_starts) if cold_starts else None,
+            "cold_start_ms_p99": percentile(cold_starts, 99) if cold_starts else None,
+        }
+        if stats["duration"]:
+            summary[version]["duration_ms_p50"] = median(stats["duration"])
+            summary[version]["duration_ms_p99"] = percentile(stats["duration"], 99)
+    return summary
+
+
+def read_reports(function_name: str, hours: float):
+    import boto3  # only required when reading from CloudWatch
+
+    client = boto3.client("logs")
+    paginator = client.get_paginator("filter_log_events")
+    start = int((time.time() - hours * 3600) * 1000)
+
+    for page in paginator.paginate(
+        logGroupName=f"/aws/lambda/{function_name}",
+        filterPattern='"REPORT RequestId"',
+        startTime=start,
+    ):
+        for event in page["events"]:
+            yield event["logStreamName"], event["message"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--function-name", required=True)
+    parser.add_argument("--hours", type=float, default=24)
+    args = parser.parse_args()
+
+    print(json.dumps(summarize(read_reports(args.function_name, args.hours)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
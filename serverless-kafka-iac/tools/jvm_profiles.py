@@ -0,0 +1,124 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Runs the offline benchmark of the producer Lambda once per JVM profile of the producer stack
+and compares the results, to pick the P_JVM_PROFILE of a workload.
+
+    python -m tools.jvm_profiles benchmark --profiles cold-start,throughput,low-memory \\
+        -Dbenchmark.concurrency=1 -Dbenchmark.payloadSizes=1024
+    python -m tools.jvm_profiles compare ../api-gateway-lambda-proxy/target/benchmark/jvm-*.json
+
+The benchmark JVM is started with the JAVA_TOOL_OPTIONS of the profile. coldRequestMs is the
+first request of the JVM, which loads the classes and runs interpreted, the throughput and
+latency of the scenarios are measured after the warmup requests. The benchmark JVM gets the
+memory of the build host, heap sizes relative to the memory of the Lambda function are not
+reproduced.
+"""
+import argparse
+import json
+import os
+import subprocess
+from typing import Dict, List
+
+from serverless_kafka.jvm_config import JVM_PROFILES
+
+PROJECT_DIRECTORY = os.path.join("..", "api-gateway-lambda-proxy")
+
+
+def output_file(profile: str) -> str:
+    return os.path.join("target", "benchmark", f"jvm-{profile}.json")
+
+
+def benchmark_command(profile: str, maven_arguments: List[str]) -> List[str]:
+    """Maven command which runs the benchmark with the options of a JVM profile."""
+    if profile not in JVM_PROFILES:
+        raise ValueError(f"profile must be one of {', '.join(JVM_PROFILES)}, got {profile}")
+    return [
+        "mvn",
+        "-Pbenchmark",
+        "test",
+        f"-Dbenchmark.jvmProfile={profile}",
+        f"-Dbenchmark.jvmOptions={' '.join(JVM_PROFILES[profile])}",
+        f"-Dbenchmark.output={output_file(profile)}",
+        *maven_arguments,
+    ]
+
+
+def compare(reports: List[dict]) -> List[dict]:
+    """Lines the results of the profiles up per scenario, the profile with the highest
+    throughput of a scenario is marked as best."""
+    scenarios: Dict[str, List[dict]] = {}
+    for report in reports:
+        profile = report.get("jvmProfile") or report.get("label") or "unknown"
+        for result in report.get("results", []):
+            scenario = f"{result.get('config')} {result.get('payloadBytes')}B x{result.get('concurrency')}"
+            scenarios.setdefault(scenario, []).append(
+                {
+                    "scenario": scenario,
+                    "profile": profile,
+                    "cold_request_ms": report.get("coldRequestMs"),
+                    "throughput_per_second": result["throughputPerSecond"],
+                    "latency_ms_p50": result["latencyMsP50"],
+                    "latency_ms_p99": result["latencyMsP99"],
+                    "allocated_bytes_per_request": result.get("allocatedBytesPerRequest"),
+                    "best": False,
+                }
+            )
+
+    rows = []
+    for entries in scenarios.values():
+        max(entries, key=lambda entry: entry["throughput_per_second"])["best"] = True
+        rows.extend(entries)
+    return rows
+
+
+def print_table(rows: List[dict]):
+    print(f"{'scenario':<28}{'profile':<13}{'cold ms':>9}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    for row in rows:
+        cold = row["cold_request_ms"]
+        print(
+            f"{row['scenario']:<28}{row['profile']:<13}{cold if cold is not None else float('nan'):>9.1f}"
+            f"{row['throughput_per_second']:>10.0f}{row['latency_ms_p50']:>9.2f}{row['latency_ms_p99']:>9.2f}"
+            f"{'  best' if row['best'] else ''}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    options = subparsers.add_parser("options", help="print the JVM options of a profile")
+    options.add_argument("profile", choices=list(JVM_PROFILES))
+
+    benchmark = subparsers.add_parser("benchmark", help="run the offline benchmark once per profile")
+    benchmark.add_argument("--profiles", default=",".join(JVM_PROFILES))
+    benchmark.add_argument("--project", default=PROJECT_DIRECTORY, help="directory of the Java project")
+
+    compare_parser = subparsers.add_parser("compare", help="compare the benchmark results of the profiles")
+    compare_parser.add_argument("reports", nargs="+")
+
+    # arguments which are not known, e.g. -Dbenchmark.concurrency=1, are passed to Maven
+    args, maven_arguments = parser.parse_known_args()
+    if maven_arguments and args.command != "benchmark":
+        parser.error(f"unrecognized arguments: {' '.join(maven_arguments)}")
+
+    if args.command == "options":
+        print(" ".join(JVM_PROFILES[args.profile]))
+    elif args.command == "benchmark":
+        reports = []
+        for profile in args.profiles.split(","):
+            subprocess.run(benchmark_command(profile, maven_arguments), cwd=args.project, check=True)
+            with open(os.path.join(args.project, output_file(profile))) as report_file:
+                reports.append(json.load(report_file))
+        print_table(compare(reports))
+    else:
+        reports = []
+        for path in args.reports:
+            with open(path) as report_file:
+                reports.append(json.load(report_file))
+        print_table(compare(reports))
+
+
+if __name__ == "__main__":
+    main()
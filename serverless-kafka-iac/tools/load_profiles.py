@@ -0,0 +1,212 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Generates Artillery load profiles sized to the synthesized producer stack and
+analyzes the Artillery reports.
+
+    cdk synth ServerlessKafkaProducerStack
+    cdk deploy ServerlessKafkaProducerStack --outputs-file outputs.json
+    python -m tools.load_profiles generate --outputs outputs.json --out-dir ../load-testing/profiles
+    artillery run --output report.json ../load-testing/profiles/step-to-saturation.json
+    python -m tools.load_profiles analyze report.json
+
+The throughput ceiling is estimated from the reserved concurrency of the producer
+Lambda and the expected request latency, the warm rate from the minimum provisioned
+concurrency of the prod alias.
+"""
+import argparse
+import json
+import os
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+DEFAULT_TEMPLATE = os.path.join("cdk.out", "ServerlessKafkaProducerStack.template.json")
+PRODUCER_HANDLER = "SimpleApiGatewayKafkaProxy"
+API_OUTPUT_PREFIX = "messagesapiendpointEndpoint"
+
+
+def read_stack_limits(template: dict) -> Dict[str, int]:
+    """Reads the reserved concurrency and the provisioned concurrency bounds from a synthesized template."""
+    limits = {"reserved_concurrency": 0, "provisioned_min": 0, "provisioned_max": 0}
+
+    for resource in template.get("Resources", {}).values():
+        properties = resource.get("Properties", {})
+        if resource["Type"] == "AWS::Lambda::Function" and PRODUCER_HANDLER in str(properties.get("Handler", "")):
+            limits["reserved_concurrency"] = int(properties.get("ReservedConcurrentExecutions", 0))
+        elif resource["Type"] == "AWS::ApplicationAutoScaling::ScalableTarget":
+            limits["provisioned_min"] = int(properties.get("MinCapacity", 0))
+            limits["provisioned_max"] = int(properties.get("MaxCapacity", 0))
+
+    if not limits["reserved_concurrency"]:
+        raise ValueError("Could not find the reserved concurrency of the producer Lambda in the template")
+    return limits
+
+
+def read_api_url(outputs: dict) -> Optional[str]:
+    """Reads the API endpoint from the file written by cdk deploy --outputs-file."""
+    for stack_outputs in outputs.values():
+        for key, value in stack_outputs.items():
+            if key.startswith(API_OUTPUT_PREFIX):
+                return value
+    return None
+
+
+def profile(url: str, name: str, phases: List[dict], max_vusers: int, payload: str) -> dict:
+    parsed = urlparse(url)
+    return {
+        "config": {
+            "target": f"{parsed.scheme}://{parsed.netloc}",
+            "phases": [dict(phase, maxVusers=max_vusers) for phase in phases],
+        },
+        "scenarios": [
+            {
+                "name": name,
+                "flow": [
+                    {
+                        "post": {
+                            "url": parsed.path or "/",
+                            # API Gateway rejects requests without Content-Type
+                            "headers": {"Content-Type": "application/json"},
+                            "body": payload,
+                        }
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def generate_profiles(limits: Dict[str, int], url: str, latency_ms: float, payload_bytes: int) -> Dict[str, dict]:
+    """Creates ramp, soak, spike and step-to-saturation profiles.
+
+    Every virtual user sends a single request, so the arrival rate equals the request rate.
+    """
+    ceiling = max(1, int(limits["reserved_concurrency"] * 1000 / latency_ms))
+    warm = max(1, int(limits["provisioned_min"] * 1000 / latency_ms)) if limits["provisioned_min"] else max(1, ceiling // 10)
+    max_vusers = limits["reserved_concurrency"] * 2
+    # a JSON string, the request validator of the API rejects bodies which are not JSON
+    payload = '"' + "x" * max(0, payload_bytes - 2) + '"'
+
+    def rate(fraction: float) -> int:
+        return max(1, int(ceiling * fraction))
+
+    steps = [
+        {"duration": 60, "arrivalRate": rate(fraction / 10), "name": f"step {fraction * 10}%"}
+        for fraction in range(2, 16)
+    ]
+
+    phases = {
+        "ramp": [
+            {"duration": 60, "arrivalRate": warm, "name": "warm"},
+            {"duration": 300, "arrivalRate": warm, "rampTo": ceiling, "name": "ramp to ceiling"},
+        ],
+        "soak": [
+            {"duration": 120, "arrivalRate": warm, "rampTo": rate(0.7), "name": "ramp"},
+            {"duration": 1800, "arrivalRate": rate(0.7), "name": "soak at 70% of ceiling"},
+        ],
+        "spike": [
+            {"duration": 120, "arrivalRate": rate(0.3), "name": "baseline"},
+            {"duration": 60, "arrivalRate": rate(2.0), "name": "spike"},
+            {"duration": 120, "arrivalRate": rate(0.3), "name": "recovery"},
+        ],
+        "step-to-saturation": steps,
+    }
+
+    return {name: profile(url, name, profile_phases, max_vusers, payload) for name, profile_phases in phases.items()}
+
+
+def analyze_report(report: dict, error_threshold: float = 0.01, sustain_windows: int = 3) -> dict:
+    """Computes the sustained successful messages per second and the onset of errors
+    from an Artillery (v2) JSON report."""
+    windows = []
+    for intermediate in report.get("intermediate", []):
+        counters = intermediate.get("counters", {})
+        ok = sum(v for k, v in counters.items() if k.startswith("http.codes.2"))
+        failed = sum(v for k, v in counters.items() if k.startswith("http.codes.") and not k.startswith("http.codes.2"))
+        failed += sum(v for k, v in counters.items() if k.startswith("errors."))
+        windows.append({"period": int(intermediate.get("period", 0)), "ok": ok, "failed": failed})
+
+    if not windows:
+        raise ValueError("The report does not contain intermediate results")
+
+    windows.sort(key=lambda window: window["period"])
+    periods = [b["period"] - a["period"] for a, b in zip(windows, windows[1:]) if b["period"] > a["period"]]
+    window_seconds = min(periods) / 1000 if periods else 10
+
+    start = windows[0]["period"]
+    clean = []
+    error_onset = None
+    for window in windows:
+        total = window["ok"] + window["failed"]
+        error_rate = window["failed"] / total if total else 0
+        window["ok_per_second"] = window["ok"] / window_seconds
+        if error_rate > error_threshold:
+            if error_onset is None:
+                error_onset = {
+                    "seconds_after_start": (window["period"] - start) / 1000,
+                    "requests_per_second": total / window_seconds,
+                    "error_rate": error_rate,
+                }
+            clean.append(None)
+        else:
+            clean.append(window["ok_per_second"])
+
+    # highest rate held without errors over sustain_windows consecutive windows
+    sustained = 0.0
+    for i in range(len(clean) - sustain_windows + 1):
+        run = clean[i:i + sustain_windows]
+        if None not in run:
+            sustained = max(sustained, min(run))
+
+    return {
+        "window_seconds": window_seconds,
+        "sustained_msgs_per_second": sustained,
+        "peak_msgs_per_second": max(window["ok_per_second"] for window in windows),
+        "error_onset": error_onset,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="write Artillery profiles for the synthesized stack")
+    generate.add_argument("--template", default=DEFAULT_TEMPLATE)
+    generate.add_argument("--outputs", help="outputs file of cdk deploy --outputs-file")
+    generate.add_argument("--url", help="API endpoint, overrides --outputs")
+    generate.add_argument("--latency-ms", type=float, default=50, help="expected request latency")
+    generate.add_argument("--payload-bytes", type=int, default=100)
+    generate.add_argument("--out-dir", default=os.path.join("..", "load-testing", "profiles"))
+
+    analyze = subparsers.add_parser("analyze", help="analyze an Artillery JSON report")
+    analyze.add_argument("report")
+    analyze.add_argument("--error-threshold", type=float, default=0.01)
+    analyze.add_argument("--sustain-windows", type=int, default=3)
+
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        with open(args.template) as template_file:
+            limits = read_stack_limits(json.load(template_file))
+
+        url = args.url
+        if not url and args.outputs:
+            with open(args.outputs) as outputs_file:
+                url = read_api_url(json.load(outputs_file))
+        if not url:
+            parser.error("the API endpoint is required, pass --outputs or --url")
+
+        os.makedirs(args.out_dir, exist_ok=True)
+        for name, artillery_profile in generate_profiles(limits, url, args.latency_ms, args.payload_bytes).items():
+            path = os.path.join(args.out_dir, f"{name}.json")
+            with open(path, "w") as profile_file:
+                json.dump(artillery_profile, profile_file, indent=2)
+            print(f"wrote {path}")
+    else:
+        with open(args.report) as report_file:
+            print(json.dumps(analyze_report(json.load(report_file), args.error_threshold, args.sustain_windows), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Finds the memory size and architecture of the producer Lambda with the lowest cost and
+latency. Lambda assigns CPU in proportion to the memory, and the JVM start and the TLS
+handshakes with the brokers are CPU bound, so more memory can be faster and cheaper.
+
+Print the variants of the grid with the commands to deploy and measure them:
+
+    python -m tools.power_tuning plan --memory 512,1024,1769,3008 --architecture x86_64,arm64
+
+Deploy every variant in turn, put load on it, e.g. with the profiles of tools.load_profiles,
+and measure the REPORT logs of the load test window:
+
+    cdk deploy -c P_MEMORY_SIZE=1769 -c P_ARCHITECTURE=arm64 ServerlessKafkaProducerStack
+    python -m tools.power_tuning measure --function-name <KafkaProducer function name> \\
+        --architecture arm64 --minutes 30 --results tuning.json
+
+Without an AWS account the results of the offline benchmark can be used instead, the
+latency is measured on the local CPU and not scaled with the memory:
+
+    python -m tools.power_tuning benchmark ../api-gateway-lambda-proxy/target/benchmark/results.json \\
+        --memory 1024 --architecture x86_64 --results tuning.json
+
+Rank the measured variants by cost per million messages:
+
+    python -m tools.power_tuning report tuning.json
+"""
+import argparse
+import json
+import math
+import os
+import re
+import time
+from itertools import product
+from statistics import mean, median
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tools.cold_start_report import DURATION, percentile, read_reports
+
+STACK_NAME = "ServerlessKafkaProducerStack"
+
+ARCHITECTURES = ("x86_64", "arm64")
+
+# On demand prices of us-east-1 in USD, Graviton is billed 20% lower per GB-second
+PRICE_PER_GB_SECOND = {"x86_64": 0.0000166667, "arm64": 0.0000133334}
+PRICE_PER_REQUEST = 0.20 / 1_000_000
+
+BILLED_DURATION = re.compile(r"Billed Duration: ([0-9.]+) ms")
+MEMORY_SIZE = re.compile(r"Memory Size: ([0-9]+) MB")
+
+
+def variant_name(memory: int, architecture: str) -> str:
+    return f"{architecture}-{memory}"
+
+
+def plan(memory_sizes: List[int], architectures: List[str]) -> List[dict]:
+    """Returns the variants of the grid with the commands to deploy and measure them."""
+    for architecture in architectures:
+        if architecture not in ARCHITECTURES:
+            raise ValueError(f"architecture must be one of {', '.join(ARCHITECTURES)}, got {architecture}")
+
+    return [
+        {
+            "variant": variant_name(memory, architecture),
+            "memory": memory,
+            "architecture": architecture,
+            "deploy": f"cdk deploy -c P_MEMORY_SIZE={memory} -c P_ARCHITECTURE={architecture} {STACK_NAME}",
+            "measure": (
+                "python -m tools.power_tuning measure --function-name <KafkaProducer function name> "
+                f"--architecture {architecture} --minutes 30"
+            ),
+        }
+        for architecture, memory in product(architectures, memory_sizes)
+    ]
+
+
+def cost_per_million(memory: int, architecture: str, billed_ms: float, messages_per_invocation: float = 1) -> float:
+    """Cost in USD of the invocations which write one million messages."""
+    invocation = PRICE_PER_REQUEST + PRICE_PER_GB_SECOND[architecture] * memory / 1024 * billed_ms / 1000
+    return invocation * 1_000_000 / messages_per_invocation
+
+
+def measure_reports(
+    reports: Iterable[Tuple[str, str]], architecture: str, messages_per_invocation: float = 1
+) -> List[dict]:
+    """Summarizes Lambda REPORT log lines, given as (log stream name, message), per memory size."""
+    durations: Dict[int, List[float]] = {}
+    billed: Dict[int, List[float]] = {}
+
+    for _, message in reports:
+        memory = MEMORY_SIZE.search(message)
+        duration = DURATION.search(message)
+        billed_duration = BILLED_DURATION.search(message)
+        if not (memory and duration and billed_duration):
+            continue
+        durations.setdefault(int(memory.group(1)), []).append(float(duration.group(1)))
+        billed.setdefault(int(memory.group(1)), []).append(float(billed_duration.group(1)))
+
+    return [
+        result(
+            memory,
+            architecture,
+            invocations=len(durations[memory]),
+            p50=median(durations[memory]),
+            p99=percentile(durations[memory], 99),
+            billed_ms=mean(billed[memory]),
+            messages_per_invocation=messages_per_invocation,
+            source="lambda",
+        )
+        for memory in sorted(durations)
+    ]
+
+
+def measure_benchmark(report: dict, memory: int, architecture: str, config: Optional[str] = None) -> List[dict]:
+    """Estimates the cost of a variant from the results of the offline benchmark, one result per
+    scenario. Lambda bills every started millisecond, so the p50 latency is rounded up."""
+    results = []
+    for scenario in report.get("results", []):
+        if config is not None and scenario.get("config") != config:
+            continue
+        entry = result(
+            memory,
+            architecture,
+            invocations=scenario["requests"],
+            p50=scenario["latencyMsP50"],
+            p99=scenario["latencyMsP99"],
+            billed_ms=math.ceil(scenario["latencyMsP50"]),
+            messages_per_invocation=1,
+            source="benchmark",
+        )
+        entry["scenario"] = f"{scenario.get('config')} {scenario.get('payloadBytes')}B x{scenario.get('concurrency')}"
+        results.append(entry)
+    return results
+
+
+def result(
+    memory: int,
+    architecture: str,
+    invocations: int,
+    p50: float,
+    p99: float,
+    billed_ms: float,
+    messages_per_invocation: float,
+    source: str,
+) -> dict:
+    return {
+        "variant": variant_name(memory, architecture),
+        "memory": memory,
+        "architecture": architecture,
+        "source": source,
+        "invocations": invocations,
+        "duration_ms_p50": p50,
+        "duration_ms_p99": p99,
+        "billed_ms_avg": billed_ms,
+        "cost_per_million_messages": round(
+            cost_per_million(memory, architecture, billed_ms, messages_per_invocation), 4
+        ),
+    }
+
+
+def rank(results: List[dict]) -> List[dict]:
+    """Orders the variants by cost, variants with the same cost by p99 latency."""
+    return sorted(results, key=lambda entry: (entry["cost_per_million_messages"], entry["duration_ms_p99"]))
+
+
+def append_results(path: str, results: List[dict]):
+    existing = []
+    if os.path.exists(path):
+        with open(path) as results_file:
+            existing = json.load(results_file)
+    with open(path, "w") as results_file:
+        json.dump(existing + results, results_file, indent=2)
+
+
+def print_table(results: List[dict]):
+    print(f"{'variant':<14}{'source':<11}{'p50 ms':>9}{'p99 ms':>9}{'USD / 1M msgs':>15}  scenario")
+    for entry in results:
+        print(
+            f"{entry['variant']:<14}{entry['source']:<11}{entry['duration_ms_p50']:>9.1f}"
+            f"{entry['duration_ms_p99']:>9.1f}{entry['cost_per_million_messages']:>15.4f}  {entry.get('scenario', '')}"
+        )
+
+
+def int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = subparsers.add_parser("plan", help="print the variants of the memory and architecture grid")
+    plan_parser.add_argument("--memory", type=int_list, default=[512, 1024, 1769, 3008])
+    plan_parser.add_argument("--architecture", default=",".join(ARCHITECTURES))
+
+    measure = subparsers.add_parser("measure", help="measure a deployed variant from its REPORT logs")
+    measure.add_argument("--function-name", required=True)
+    measure.add_argument("--architecture", choices=ARCHITECTURES, required=True)
+    measure.add_argument("--minutes", type=float, default=30)
+    measure.add_argument("--messages-per-invocation", type=float, default=1, help="records per invocation, e.g. of /batch")
+    measure.add_argument("--results", default="tuning.json")
+
+    benchmark = subparsers.add_parser("benchmark", help="estimate a variant from the offline benchmark results")
+    benchmark.add_argument("report")
+    benchmark.add_argument("--memory", type=int, required=True)
+    benchmark.add_argument("--architecture", choices=ARCHITECTURES, required=True)
+    benchmark.add_argument("--config", help="only use the scenarios of this benchmark configuration")
+    benchmark.add_argument("--results", default="tuning.json")
+
+    report = subparsers.add_parser("report", help="rank the measured variants")
+    report.add_argument("results")
+
+    args = parser.parse_args()
+
+    if args.command == "plan":
+        print(json.dumps(plan(args.memory, args.architecture.split(",")), indent=2))
+    elif args.command == "measure":
+        started = time.time()
+        results = measure_reports(
+            read_reports(args.function_name, args.minutes / 60), args.architecture, args.messages_per_invocation
+        )
+        if not results:
+            parser.error(f"no REPORT logs of {args.function_name} in the last {args.minutes} minutes")
+        for entry in results:
+            entry["measured_at"] = int(started)
+        append_results(args.results, results)
+        print_table(results)
+    elif args.command == "benchmark":
+        with open(args.report) as report_file:
+            results = measure_benchmark(json.load(report_file), args.memory, args.architecture, args.config)
+        append_results(args.results, results)
+        print_table(results)
+    else:
+        with open(args.results) as results_file:
+            print_table(rank(json.load(results_file)))
+
+
+if __name__ == "__main__":
+    main()
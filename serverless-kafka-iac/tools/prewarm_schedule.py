@@ -0,0 +1,156 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Derives the P_PROVISIONED_SCHEDULE of the producer stack from the traffic of the past weeks,
+so the provisioned concurrency is raised before the recurring peaks instead of after the
+utilization tracking noticed them.
+
+    python -m tools.prewarm_schedule --function-name <KafkaProducer function name> --weeks 4
+
+The maximum ConcurrentExecutions of the prod alias per hour is reduced to a percentile per hour
+of the week. Every hour gets the execution environments which keep that concurrency at the
+utilization target, rounded up to --step so small variations do not create scheduled actions.
+Scale-ups fire --lead-minutes before the hour, which covers the time Lambda needs to initialize
+the execution environments, scale-downs fire at the hour. The schedule is printed as the -c
+arguments of cdk deploy, the times are UTC.
+"""
+import argparse
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from tools.cold_start_report import percentile
+
+# cron day of week of datetime.weekday()
+DAYS = ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")
+HOURS_PER_WEEK = 7 * 24
+MINUTES_PER_WEEK = HOURS_PER_WEEK * 60
+
+# the defaults of the producer stack, see serverless_kafka/scaling_config.py
+DEFAULT_UTILIZATION_TARGET = 0.7
+DEFAULT_MAX_CAPACITY = 60
+MAX_SCHEDULED_ACTIONS = 200
+
+
+def hour_of_week(timestamp: datetime) -> int:
+    timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.weekday() * 24 + timestamp.hour
+
+
+def hourly_profile(datapoints: Iterable[Tuple[datetime, float]], percent: float = 90) -> Dict[int, float]:
+    """Percentile of the hourly maximum concurrency per hour of the week."""
+    hours: Dict[int, List[float]] = {}
+    for timestamp, value in datapoints:
+        hours.setdefault(hour_of_week(timestamp), []).append(value)
+    return {hour: percentile(values, percent) for hour, values in hours.items()}
+
+
+def required_capacity(
+    concurrency: float, utilization_target: float, step: int, min_capacity: int, max_capacity: int
+) -> int:
+    """Provisioned execution environments which keep the concurrency at the utilization target."""
+    capacity = math.ceil(concurrency / utilization_target / step) * step
+    return max(min_capacity, min(max_capacity, capacity))
+
+
+def cron_expression(minute_of_week: int) -> str:
+    minute_of_week %= MINUTES_PER_WEEK
+    day, minute_of_day = divmod(minute_of_week, 24 * 60)
+    return f"cron({minute_of_day % 60} {minute_of_day // 60} ? * {DAYS[day]} *)"
+
+
+def derive_schedule(
+    profile: Dict[int, float],
+    utilization_target: float = DEFAULT_UTILIZATION_TARGET,
+    min_capacity: int = 1,
+    max_capacity: int = DEFAULT_MAX_CAPACITY,
+    step: int = 5,
+    lead_minutes: int = 15,
+) -> List[dict]:
+    """Scheduled actions for the hours of the week in which the required capacity changes,
+    hours without traffic get the minimum capacity. A flat week needs no actions."""
+    capacities = [
+        required_capacity(profile.get(hour, 0), utilization_target, step, min_capacity, max_capacity)
+        for hour in range(HOURS_PER_WEEK)
+    ]
+
+    actions = []
+    for hour, capacity in enumerate(capacities):
+        # the week wraps around, Monday 00:00 follows Sunday 23:00
+        previous = capacities[hour - 1]
+        if capacity == previous:
+            continue
+        lead = lead_minutes if capacity > previous else 0
+        actions.append(
+            {
+                "expression": cron_expression(hour * 60 - lead),
+                "min_capacity": capacity,
+                "hour_of_week": hour,
+            }
+        )
+
+    if len(actions) > MAX_SCHEDULED_ACTIONS:
+        raise ValueError(
+            f"{len(actions)} scheduled actions exceed the limit of {MAX_SCHEDULED_ACTIONS}, increase --step"
+        )
+    return actions
+
+
+def format_schedule(actions: List[dict], max_capacity: int) -> str:
+    return ";".join(f"{action['expression']}={action['min_capacity']}:{max_capacity}" for action in actions)
+
+
+def read_concurrency(function_name: str, alias: str, weeks: int):
+    import boto3  # only required when reading from CloudWatch
+
+    client = boto3.client("cloudwatch")
+    end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    # one week of hourly datapoints per request, below the limit of 1440 datapoints
+    for week in range(weeks, 0, -1):
+        response = client.get_metric_statistics(
+            Namespace="AWS/Lambda",
+            MetricName="ConcurrentExecutions",
+            Dimensions=[
+                {"Name": "FunctionName", "Value": function_name},
+                {"Name": "Resource", "Value": f"{function_name}:{alias}"},
+            ],
+            StartTime=end - timedelta(weeks=week),
+            EndTime=end - timedelta(weeks=week - 1),
+            Period=3600,
+            Statistics=["Maximum"],
+        )
+        for datapoint in response["Datapoints"]:
+            yield datapoint["Timestamp"], datapoint["Maximum"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--function-name", required=True)
+    parser.add_argument("--alias", default="prod")
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--percentile", type=float, default=90)
+    parser.add_argument("--utilization-target", type=float, default=DEFAULT_UTILIZATION_TARGET)
+    parser.add_argument("--min-capacity", type=int, default=1)
+    parser.add_argument("--max-capacity", type=int, default=DEFAULT_MAX_CAPACITY)
+    parser.add_argument("--step", type=int, default=5)
+    parser.add_argument("--lead-minutes", type=int, default=15)
+    args = parser.parse_args()
+
+    profile = hourly_profile(read_concurrency(args.function_name, args.alias, args.weeks), args.percentile)
+    actions = derive_schedule(
+        profile, args.utilization_target, args.min_capacity, args.max_capacity, args.step, args.lead_minutes
+    )
+
+    for action in actions:
+        day, hour = divmod(action["hour_of_week"], 24)
+        print(f"{DAYS[day]} {hour:02d}:00  {action['min_capacity']:>4}  {action['expression']}")
+    print(
+        f"-c P_PROVISIONED_CONCURRENCY={args.min_capacity} -c P_PROVISIONED_MAX_CONCURRENCY={args.max_capacity} "
+        f"-c P_PROVISIONED_UTILIZATION_TARGET={args.utilization_target} "
+        f"-c \"P_PROVISIONED_SCHEDULE={format_schedule(actions, args.max_capacity)}\""
+    )
+
+
+if __name__ == "__main__":
+    main()